@@ -0,0 +1,83 @@
+from typing import List, Optional, Dict
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+from tabulate import tabulate
+import hidet
+from hidet.ir.func import IRModule
+from hidet.transforms import lower, PassContext
+from hidet.transforms.explicit_unroll_for_stmt import explicit_unroll_for_stmt_pass, count_stmts
+from hidet.backend import codegen, compile_source
+from hidet.tos.ops.definitions.utils import input_like
+from hidet.tos.ops.definitions.matmul.matmul import MatmulTask
+from hidet.tos.ops.schedules.cuda.matmul.bmm import MatmulSchedule, batched_matmul_cuda_with_given_schedule
+
+
+"""
+The code size of the cuda matmul kernels over the whole schedule space, under different unroll budgets (see
+PassContext.unroll_budget). The explicit unroll pass is the last pass of lower, thus each schedule is lowered once
+without budget and the pass is applied for each budget. Pass --compile to also measure the nvcc compilation time
+(requires nvcc).
+"""
+
+
+def kernel_stmts(ir_module: IRModule) -> int:
+    return sum(count_stmts(func.body) for func in ir_module.functions.values() if func.kind == 'cuda_kernel')
+
+
+def compile_seconds(ir_module: IRModule) -> float:
+    out_dir = tempfile.mkdtemp()
+    try:
+        src_path = os.path.join(out_dir, 'source.cu')
+        codegen(ir_module, src_out_path=src_path)
+        start = time.time()
+        compile_source(src_path, os.path.join(out_dir, 'lib.so'))
+        return time.time() - start
+    finally:
+        shutil.rmtree(out_dir)
+
+
+def main(space_level: int, budgets: List[Optional[int]], compile: bool):
+    a = hidet.symbol([1, 1024, 1024], device='cuda')
+    b = hidet.symbol([1, 1024, 1024], device='cuda')
+    task = MatmulTask(input_like(a, 'a'), input_like(b, 'b'))
+    schedules = MatmulSchedule.schedules(space_level=space_level)
+    print('Lowering {} schedules of {} (space level {})...'.format(len(schedules), task.name, space_level))
+    with PassContext():
+        lowered = [lower(batched_matmul_cuda_with_given_schedule(task, sch)) for sch in schedules]
+
+    headers = ['budget', 'stmts min', 'stmts median', 'stmts max', 'over budget', 'full unroll', 'partial unroll', 'kept']
+    if compile:
+        headers += ['nvcc seconds (total)']
+    rows = []
+    baseline = [kernel_stmts(m) for m in lowered]
+    rows.append(['no unroll pass', np.min(baseline), np.median(baseline), np.max(baseline), '-', '-', '-', '-']
+                + (['{:.1f}'.format(sum(compile_seconds(m) for m in lowered))] if compile else []))
+    for budget in budgets:
+        stmts = []
+        counts: Dict[str, int] = {'full': 0, 'partial': 0, 'kept': 0}
+        seconds = 0.0
+        with PassContext():
+            for ir_module in lowered:
+                unroll_pass = explicit_unroll_for_stmt_pass(unroll_budget=budget)
+                unrolled = unroll_pass(ir_module)
+                stmts.append(kernel_stmts(unrolled))
+                for name, value in unroll_pass.unroll_counts.items():
+                    counts[name] += value
+                if compile:
+                    seconds += compile_seconds(unrolled)
+        over = sum(1 for v in stmts if budget is not None and v > budget)
+        rows.append([str(budget), np.min(stmts), np.median(stmts), np.max(stmts), over, counts['full'], counts['partial'], counts['kept']]
+                    + (['{:.1f}'.format(seconds)] if compile else []))
+    print(tabulate(rows, headers=headers))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--space', type=int, default=2, help='The space level of matmul schedules.')
+    parser.add_argument('--compile', action='store_true', help='Measure the nvcc compilation time.')
+    args = parser.parse_args()
+    main(space_level=args.space, budgets=[None, 4000, 2000, 1000, 500], compile=args.compile)
@@ -0,0 +1,19 @@
+from artifact import bench
+
+
+def main():
+    for executor in [
+        '--exec numpy',
+        '--exec hidet --device cpu',
+    ]:
+        for model in [
+            '--model op_matmul_nn_0',   # 128x128x64
+            '--model op_matmul_nn_1',   # 128x768x2304
+            '--model op_matmul_nn_4',   # 2048x2048x2048
+            '--model op_matmul_nn_5',   # 2039x2039x2039
+        ]:
+            bench('{} {}'.format(executor, model))
+
+
+if __name__ == '__main__':
+    main()
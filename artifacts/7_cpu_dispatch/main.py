@@ -0,0 +1,18 @@
+from artifact import bench
+
+
+def main():
+    # the difference between the two executors is the python overhead of dispatching the operators
+    for executor in [
+        '--exec hidet --device cpu --cpu_executor graph',
+        '--exec hidet --device cpu --cpu_executor plan',
+    ]:
+        for model in [
+            '--model resnet50',
+            '--model bert',
+        ]:
+            bench('{} {}'.format(executor, model))
+
+
+if __name__ == '__main__':
+    main()
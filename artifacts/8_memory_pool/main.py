@@ -0,0 +1,121 @@
+from typing import List, Tuple
+import time
+import numpy as np
+from tabulate import tabulate
+from hidet.runtime.storage import StorageDevice, CpuStorageDevice, MemoryPool, CachingMemoryPool, nbytes2str
+
+
+class CountingDevice(StorageDevice):
+    # count the calls to the underlying device, which are expensive on cuda (cudaMallocAsync, cudaDeviceSynchronize)
+    def __init__(self, device: StorageDevice):
+        super().__init__()
+        self.device = device
+        self.num_allocate = 0
+        self.num_free = 0
+        self.num_synchronize = 0
+
+    def name(self):
+        return self.device.name()
+
+    def allocate(self, nbytes) -> int:
+        self.num_allocate += 1
+        return self.device.allocate(nbytes)
+
+    def free(self, addr):
+        self.num_free += 1
+        self.device.free(addr)
+
+    def synchronize(self):
+        self.num_synchronize += 1
+        self.device.synchronize()
+
+    def allocated_memory(self) -> int:
+        return self.device.allocated_memory()
+
+    def peak_allocated_memory(self) -> int:
+        return self.device.peak_allocated_memory()
+
+    def free_memory(self) -> int:
+        return self.device.free_memory()
+
+    def total_memory(self) -> int:
+        return self.device.total_memory()
+
+
+def synthetic_trace(num_requests: int = 200, num_layers: int = 12, hidden_size: int = 768, seed: int = 0) -> List[Tuple[str, int, int]]:
+    """
+    The allocations of a transformer serving requests with dynamic batch sizes and sequence lengths. Each layer
+    allocates the activations of attention and feed-forward, which are freed after their consumers.
+    The trace is a list of ('alloc', tensor id, nbytes) and ('free', tensor id, 0).
+    """
+    rng = np.random.default_rng(seed)
+    trace = []
+    next_id = 0
+
+    def alloc(nbytes):
+        nonlocal next_id
+        trace.append(('alloc', next_id, int(nbytes)))
+        next_id += 1
+        return next_id - 1
+
+    for _ in range(num_requests):
+        batch_size = int(rng.integers(1, 33))
+        seq_length = int(rng.integers(16, 513))
+        tokens = batch_size * seq_length
+        x = alloc(tokens * hidden_size * 4)
+        for _ in range(num_layers):
+            qkv = alloc(tokens * hidden_size * 3 * 4)
+            scores = alloc(batch_size * 12 * seq_length * seq_length * 4)
+            trace.append(('free', qkv, 0))
+            attn = alloc(tokens * hidden_size * 4)
+            trace.append(('free', scores, 0))
+            hidden = alloc(tokens * hidden_size * 4 * 4)
+            trace.append(('free', attn, 0))
+            y = alloc(tokens * hidden_size * 4)
+            trace.append(('free', hidden, 0))
+            trace.append(('free', x, 0))
+            x = y
+        logits = alloc(batch_size * 2 * 4)
+        trace.append(('free', x, 0))
+        trace.append(('free', logits, 0))
+    return trace
+
+
+def replay(pool: MemoryPool, trace: List[Tuple[str, int, int]]) -> float:
+    storages = {}
+    start = time.time()
+    for kind, tensor_id, nbytes in trace:
+        if kind == 'alloc':
+            storages[tensor_id] = pool.allocate(nbytes)
+        else:
+            del storages[tensor_id]
+    return time.time() - start
+
+
+def main():
+    trace = synthetic_trace()
+    num_allocs = sum(1 for kind, _, _ in trace if kind == 'alloc')
+    max_reserve_size = 512 * 1024 ** 2
+    rows = []
+    for name, pool_cls, block_size in [
+        ('exact size (MemoryPool)', MemoryPool, 4096),
+        ('caching (CachingMemoryPool)', CachingMemoryPool, 512),
+    ]:
+        device = CountingDevice(CpuStorageDevice())
+        pool = pool_cls(device, block_size=block_size, max_reserve_size=max_reserve_size)
+        elapsed = replay(pool, trace)
+        rows.append([
+            name,
+            '{:.2f}'.format(elapsed / num_allocs * 1e6),
+            '{:.1f}%'.format((1.0 - device.num_allocate / num_allocs) * 100),
+            device.num_allocate,
+            device.num_synchronize,
+            nbytes2str(device.peak_allocated_memory())
+        ])
+        pool.clear()
+    print('Replay {} allocations of a synthetic transformer serving trace'.format(num_allocs))
+    print(tabulate(rows, headers=['Pool', 'us / alloc', 'Hit rate', 'Device allocs', 'Device syncs', 'Peak memory']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import pickle
+import argparse
+import subprocess
+from tabulate import tabulate
+import hidet
+from hidet.tos import ops
+from hidet.utils import hidet_cache_file
+
+parser = argparse.ArgumentParser('Compare the pickle and binary formats of flow graph files.')
+parser.add_argument('--layers', type=int, default=48)
+parser.add_argument('--hidden', type=int, default=1024)
+parser.add_argument('--load', type=str, default=None, help='Load the given graph file, used in the subprocess.')
+
+
+def synthetic_graph(layers: int, hidden: int) -> hidet.FlowGraph:
+    # a multi-layer perceptron, whose weights dominate the size of the graph
+    x = hidet.symbol([16, hidden], device='cpu')
+    y = x
+    for _ in range(layers):
+        w = hidet.randn([hidden, hidden], device='cpu')
+        b = hidet.randn([hidden], device='cpu')
+        y = ops.relu(ops.matmul(y, w) + b)
+    return hidet.trace_from(y, [x])
+
+
+def save_pickle(graph: hidet.FlowGraph, fname: str):
+    # the format used by FlowGraph.save before the binary format
+    for node in graph.nodes:
+        node.task_func = None
+    with open(fname, 'wb') as f:
+        pickle.dump(graph, f)
+
+
+def memory_status(key: str) -> int:
+    # the resident memory (VmRSS) or its peak (VmHWM) of this process in bytes
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(key + ':'):
+                return int(line.split()[1]) * 1024
+    raise ValueError(key)
+
+
+def load(fname: str):
+    # report the load time, and the resident memory before loading and its peak during loading in the subprocess
+    with open('/proc/self/clear_refs', 'w') as f:
+        # reset the peak resident memory to the current one, so that the peak of importing hidet is excluded
+        f.write('5')
+    base_rss = memory_status('VmRSS')
+    start = time.time()
+    graph = hidet.load_graph(fname)
+    elapsed = time.time() - start
+    peak_rss = memory_status('VmHWM')
+    print(elapsed, base_rss, peak_rss, len(graph.nodes))
+
+
+def main():
+    args = parser.parse_args()
+    if args.load:
+        load(args.load)
+        return
+    graph = synthetic_graph(args.layers, args.hidden)
+    paths = {
+        'pickle': hidet_cache_file('graphs', 'mlp_{}x{}.pkl'.format(args.layers, args.hidden)),
+        'binary': hidet_cache_file('graphs', 'mlp_{}x{}.hidet'.format(args.layers, args.hidden))
+    }
+    save_pickle(graph, paths['pickle'])
+    graph.save(paths['binary'])
+    rows = []
+    for name, path in paths.items():
+        output = subprocess.check_output([sys.executable, __file__, '--load', path]).decode('utf-8').strip().split('\n')[-1]
+        elapsed, base_rss, peak_rss, num_nodes = output.split()
+        rows.append([
+            name,
+            '{:.1f}'.format(os.path.getsize(path) / 1024 ** 2),
+            '{:.1f}'.format(float(elapsed) * 1000),
+            '{:.1f}'.format(int(base_rss) / 1024 ** 2),
+            '{:.1f}'.format(int(peak_rss) / 1024 ** 2),
+            num_nodes
+        ])
+    print('Load a {}-layer perceptron with hidden size {}'.format(args.layers, args.hidden))
+    print(tabulate(rows, headers=['Format', 'File (MiB)', 'Load (ms)', 'RSS before (MiB)', 'Peak RSS (MiB)', 'Nodes']))
+
+
+if __name__ == '__main__':
+    main()
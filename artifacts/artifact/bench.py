@@ -6,6 +6,7 @@ import os
 import time
 import numpy as np
 import argparse
+import platform
 import hidet as hi
 import hidet
 from hidet import Tensor
@@ -32,6 +33,18 @@ short2long = {
 
 
 def environment_info(args) -> str:
+    if args.device == 'cpu':
+        return str(tabulate(
+            headers=[
+                'Name', 'Value'
+            ],
+            tabular_data=[
+                ['Commit', get_repo_sha()],
+                ['CPU', platform.processor() or platform.machine()],
+                ['Cores', hidet.utils.cpu.query_num_cores()],
+                ['Warmup/Number/Repeat', '{} / {} / {}'.format(args.warmup, args.number, args.repeat)]
+            ]
+        ))
     return str(tabulate(
         headers=[
             'Name', 'Value'
@@ -61,19 +74,22 @@ def run_with_onnx(model_path: str, input_names: List[str], input_tensors: List[h
     return onnx_outputs
 
 
-def benchmark_run(run_func, warmup, number, repeat) -> List[float]:
+def benchmark_run(run_func, warmup, number, repeat, device='cuda') -> List[float]:
+    def synchronize():
+        if device == 'cuda':
+            cuda.device_synchronize()
     results = []
     with nvtx_annotate('warmup'):
         for i in range(warmup):
             run_func()
-            cuda.device_synchronize()
+            synchronize()
     for i in range(repeat):
         with nvtx_annotate(f'repeat {i}'):
-            cuda.device_synchronize()
+            synchronize()
             start_time = time.time()
             for j in range(number):
                 run_func()
-            cuda.device_synchronize()
+            synchronize()
             end_time = time.time()
         results.append((end_time - start_time) * 1000 / number)
     return results
@@ -104,10 +120,13 @@ def bench_hidet(args, out_dir) -> BenchResult:
     graph_path = hidet_cache_file(
         'hidet_graph',
         args.model,
-        'bs_{}_{}'.format(args.bs, result.configs),
+        'bs_{}_{}_{}'.format(args.bs, args.device, result.configs),
         'graph.pickle'
     )
     onnx_path, input_names, input_tensors = get_onnx_model(name=args.model, batch_size=args.bs)
+    if args.device == 'cpu':
+        input_tensors = [tensor.cpu() for tensor in input_tensors]
+        result.configs += '_{}'.format(args.cpu_executor)
 
     hidet.space_level(args.hidet_space)
 
@@ -145,10 +164,33 @@ def bench_hidet(args, out_dir) -> BenchResult:
         with open(os.path.join(os.path.dirname(graph_path), 'tuning_time.txt'), 'w') as f:
             f.write(str((t2 - t1) / 60.0) + ' minutes')
 
-    cuda_graph = graph.cuda_graph()
-    result.outputs = cuda_graph.run_with_inputs(input_tensors)
-    result.latencies = benchmark_run(lambda: cuda_graph.run(), args.warmup, args.number, args.repeat)
+    if args.device == 'cpu':
+        if args.cpu_executor == 'plan':
+            # run with the prepared kernels and argument arrays, which removes most of the dispatch overhead
+            executor = graph.execution_plan()
+        else:
+            executor = graph
+        result.outputs = executor(*input_tensors)
+        result.outputs = result.outputs if isinstance(result.outputs, (list, tuple)) else [result.outputs]
+        result.latencies = benchmark_run(lambda: executor(*input_tensors), args.warmup, args.number, args.repeat, device='cpu')
+    else:
+        cuda_graph = graph.cuda_graph()
+        result.outputs = cuda_graph.run_with_inputs(input_tensors)
+        result.latencies = benchmark_run(lambda: cuda_graph.run(), args.warmup, args.number, args.repeat)
+
+    return result
+
 
+def bench_numpy(args, out_dir) -> BenchResult:
+    # the numpy baseline of the operator workloads, the matrix multiplication is dispatched to the blas library
+    result = BenchResult()
+    if not args.model.startswith('op_matmul_'):
+        raise ValueError('The numpy executor only supports the matmul operators, got {}.'.format(args.model))
+    result.configs = 'blas_{}'.format(np.__version__)
+    onnx_path, input_names, input_tensors = get_onnx_model(name=args.model, batch_size=args.bs)
+    x, y = [tensor.numpy() for tensor in input_tensors]
+    result.outputs = [hidet.array(np.matmul(x, y))]
+    result.latencies = benchmark_run(lambda: np.matmul(x, y), args.warmup, args.number, args.repeat, device='cpu')
     return result
 
 
@@ -266,11 +308,13 @@ def bench(command_line_args: Optional[str] = None):
     # output dir
     out_dir = os.path.join(args.out_dir,
                            '{}_{}'.format(get_repo_commit_date(), get_repo_sha(short=True)),
-                           cuda.query_device_name(short=True),
+                           cuda.query_device_name(short=True) if args.device == 'cuda' else 'cpu_{}'.format(platform.machine()),
                            'models')
     exec_name = 'bs{}_{}_{}_{}_{}'.format(args.bs, args.model, args.exec, args.precision, args.reduce_precision)
     if args.exec == 'hidet':
         exec_name += '_space{}_pk_{}'.format(args.hidet_space, args.parallel_k)
+        if args.device == 'cpu':
+            exec_name += '_{}'.format(args.cpu_executor)
     elif args.exec in ['autotvm', 'ansor']:
         trial = args.autotvm_trial if args.exec == 'autotvm' else args.ansor_trial
         exec_name += '_trial{}'.format(trial)
@@ -286,6 +330,7 @@ def bench(command_line_args: Optional[str] = None):
         'ansor': bench_tvm,
         'tvm': bench_tvm,
         'torch': bench_torch,
+        'numpy': bench_numpy,
     }
     bench_func = bench_dict[args.exec]
     with nvtx_annotate(message=args.exec):
@@ -339,8 +384,10 @@ parser.add_argument('--model', type=str,
                     # choices=['resnet50', 'inception_v3', 'mobilenet_v2', 'bert', 'bart'],
                     required=True,
                     help='The model to benchmark.')
-parser.add_argument('--exec', type=str, choices=['hidet', 'trt', 'ort', 'tvm', 'autotvm', 'ansor', 'tf', 'tf_xla', 'torch'], required=True,
+parser.add_argument('--exec', type=str, choices=['hidet', 'trt', 'ort', 'tvm', 'autotvm', 'ansor', 'tf', 'tf_xla', 'torch', 'numpy'], required=True,
                     help='Executor.')
+parser.add_argument('--device', type=str, choices=['cuda', 'cpu'], default='cuda',
+                    help='The device to run the hidet executor on. The numpy executor always runs on cpu.')
 parser.add_argument('--out_dir', type=str, default='./results/',
                     help='Output directory.')
 parser.add_argument('--warmup', type=int, default=10, help='Number of warmups.')
@@ -357,6 +404,7 @@ parser.add_argument('--mma', choices=['simt', 'wmma', 'mma'], default='simt')
 parser.add_argument('--hidet_space', type=int, choices=[0, 1, 2], default=2, help='The space level of each operator in the model. Large space level means longer compilation time and better performance.')
 parser.add_argument('--parallel_k', choices=['disabled', 'default', 'search', '2', '4', '6', '8'], default='default')
 parser.add_argument('--disable-graph-cache', action='store_true')
+parser.add_argument('--cpu_executor', choices=['graph', 'plan'], default='graph', help='Run the graph on cpu with FlowGraph.forward or an execution plan.')
 
 # tvm number of trial per task
 parser.add_argument('--ansor_trial', type=int, default=800, help='Number of trial per task in autotvm and ansor, default 800.')
@@ -12,6 +12,10 @@ python ./2_input_sensitivity/main.py
 python ./3_batch_size/main.py
 python ./4_prologue_epilogue_fusion/main.py
 python ./5_tensorrt/main.py
+python ./6_cpu_matmul/main.py
+python ./7_cpu_dispatch/main.py
+python ./8_memory_pool/main.py
+python ./9_graph_format/main.py
 
 # The second run would use the cached results and take a short time
 # The output would be clear (not scattered with logs)
@@ -21,3 +25,8 @@ python ./2_input_sensitivity/main.py
 python ./3_batch_size/main.py
 python ./4_prologue_epilogue_fusion/main.py
 python ./5_tensorrt/main.py
+python ./6_cpu_matmul/main.py
+python ./7_cpu_dispatch/main.py
+python ./8_memory_pool/main.py
+python ./9_graph_format/main.py
+python ./10_unroll_budget/main.py
@@ -13,6 +13,7 @@ from .tos import Tensor, Operator, Module, FlowGraph
 
 from .tos import ops
 from .tos import empty, randn, zeros, ones, full, symbol, array, empty_like, randn_like, zeros_like, ones_like, symbol_like, full_like
+from .tos import from_numpy, from_dlpack
 from .tos import space_level, get_space_level
 from .tos import trace_from, load_graph, save_graph
 from .tos import jit
@@ -1,2 +1,3 @@
 from .codegen import codegen
-from .build import compile_source, load_task_func, BuildInstance, batch_build_ir_modules, load_lib_func
+from .build import compile_source, load_task_func, BuildInstance, batch_build_ir_modules, iter_build_ir_modules, load_lib_func
+from .build import has_host_kernels, enable_march_native, host_isa
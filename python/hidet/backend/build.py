@@ -1,14 +1,17 @@
 from __future__ import annotations
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterator, Tuple
 import contextlib
 import psutil
 import multiprocessing
 from tqdm import tqdm
 import ctypes
+import logging
 import os
+import platform
 import subprocess
 import tempfile
 from subprocess import PIPE
+from hashlib import sha256
 
 from hidet.libinfo import get_include_dir
 from hidet.ir.func import IRModule
@@ -22,6 +25,42 @@ from hidet.utils import cuda, Timer
 from hidet.backend import codegen
 
 
+logger = logging.Logger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler())
+
+# whether to compile the host kernels for the instruction set of the building machine (-march=native). The libraries
+# built this way crash with illegal instruction on older cpus, thus it is opt-in, and the host isa is part of the cache
+# key of the tasks when it is enabled (see host_isa).
+march_native = False
+
+
+def enable_march_native(enable: bool = True):
+    global march_native
+    march_native = enable
+
+
+def host_isa() -> str:
+    """
+    Get the tag of the instruction set that the host kernels are compiled for: 'generic' by default, or the machine
+    and a hash of the cpu flags when -march=native is enabled.
+    """
+    if not march_native:
+        return 'generic'
+    flags = ''
+    if os.path.exists('/proc/cpuinfo'):
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    flags = line
+                    break
+    return '{}_{}'.format(platform.machine(), sha256(flags.encode()).hexdigest()[:8])
+
+
+def has_host_kernels(ir_module: IRModule) -> bool:
+    return any(func.kind == 'host_kernel' for func in ir_module.functions.values())
+
+
 dlclose = ctypes.CDLL(None).dlclose
 dlclose.argtypes = [ctypes.c_void_p]
 dlclose.rettype = ctypes.c_int
@@ -58,7 +97,7 @@ class LoadedSharedLibrary:
             dlclose(self.cdll._handle)
 
 
-def compile_source(src_path: str, out_lib_path: str, keep_ptx=False) -> None:
+def compile_source(src_path: str, out_lib_path: str, keep_ptx=False, host_kernels=False) -> None:
     """
     Compile the source code in 'src_path' file and output the library to 'out_lib_path'.
 
@@ -70,6 +109,9 @@ def compile_source(src_path: str, out_lib_path: str, keep_ptx=False) -> None:
         The path to output library.
     keep_ptx: bool, default False
         Whether to keep the ptx code in the same directory of output library.
+    host_kernels: bool, default False
+        Whether the source code contains host kernels, which are compiled with openmp (and -march=native if enabled
+        by enable_march_native).
     """
     src_path = os.path.abspath(src_path)
     out_lib_path = os.path.abspath(out_lib_path)
@@ -94,6 +136,9 @@ def compile_source(src_path: str, out_lib_path: str, keep_ptx=False) -> None:
         '--shared', src_path,
         '-o', out_lib_path,
     ]
+    if host_kernels:
+        # the host kernels use openmp for parallel loops and simd for vectorized loops
+        command += ['-Xcompiler', '-fopenmp,-march=native' if march_native else '-fopenmp', '-lgomp']
 
     try:
         with tempfile.TemporaryDirectory() as working_dir:
@@ -171,7 +216,7 @@ def load_lib_func(lib_path: str, func_name: str, func_type: FuncType) -> Compile
 
 
 class BuildInstance:
-    def __init__(self, ir_module, output_dir, keep_ir=False, nvcc_keep=True, verbose=True):
+    def __init__(self, ir_module, output_dir, keep_ir=False, nvcc_keep=True, verbose=True, unroll_budget=None):
         """
         The build instance.
 
@@ -189,12 +234,15 @@ class BuildInstance:
             Whether to
         verbose: bool
             Reserved.
+        unroll_budget: Optional[int]
+            The code size budget of explicit loop unrolling when lowering, see PassContext. Default None.
         """
         self.ir_module = ir_module
         self.output_dir = output_dir
         self.keep_ir = keep_ir
         self.nvcc_keep = nvcc_keep
         self.verbose = verbose
+        self.unroll_budget = unroll_budget
 
 
 def build_ir_module_job(build_instance: BuildInstance) -> Optional[str]:
@@ -216,19 +264,75 @@ def build_ir_module_job(build_instance: BuildInstance) -> Optional[str]:
     os.makedirs(build_instance.output_dir, exist_ok=True)
     if build_instance.keep_ir:
         instruments.append(SaveIRInstrument(out_dir=os.path.join(build_instance.output_dir, 'ir')))
-    with PassContext(instruments=instruments):
+    with PassContext(instruments=instruments, unroll_budget=build_instance.unroll_budget):
         ir_module = lower(build_instance.ir_module)
     src_path = os.path.join(build_instance.output_dir, 'source.cu')
     lib_path = os.path.join(build_instance.output_dir, 'lib.so')
     codegen(ir_module, src_out_path=src_path)
     try:
-        compile_source(src_path, lib_path)
+        compile_source(src_path, lib_path, host_kernels=has_host_kernels(ir_module))
     except subprocess.CalledProcessError:
         print('Compilation failed for an instance')
         return None
     return lib_path
 
 
+def _build_ir_module_job_indexed(args) -> Tuple[int, Optional[str]]:
+    idx, build_instance = args
+    try:
+        return idx, build_ir_module_job(build_instance)
+    except Exception:
+        # the failed instance is skipped by the caller, but the reason should not be lost
+        logger.warning('Failed to build the ir module in {}:'.format(build_instance.output_dir), exc_info=True)
+        return idx, None
+
+
+def _num_build_workers() -> int:
+    # Set the affinity of current process. Some package such as numpy will change affinity of current process,
+    # which might limit the parallelism of compilation.
+    os.sched_setaffinity(0, range(os.cpu_count()))
+    mem_for_worker = 1.5 * 1024 * 1024 * 1024  # 1.5 GiB
+    return min(max(int(psutil.virtual_memory().available // mem_for_worker), 1), psutil.cpu_count())
+
+
+def iter_build_ir_modules(build_instances, parallel=True, verbose=False) -> Iterator[Tuple[int, Optional[CompiledFunction]]]:
+    """
+    Build a batch of ir modules and yield each compiled function as soon as it is ready.
+
+    The ir modules are built by a pool of worker processes in background, thus the consumer (e.g., measuring the
+    compiled functions) overlaps with the building of remaining ir modules.
+
+    Parameters
+    ----------
+    build_instances: List[BuildInstance]
+        The batch of build instances to build.
+
+    parallel: bool
+        Whether build in parallel. Default True.
+
+    verbose: bool
+        Whether show the progress and summary. Default False.
+
+    Returns
+    -------
+    ret: Iterator[Tuple[int, Optional[CompiledFunction]]]
+        The (index in build_instances, compiled function) pairs in the order of completion. When the build for a
+        build instance failed, None is given as its compiled function.
+    """
+    jobs = list(enumerate(build_instances))
+    with Timer() as timer:
+        if parallel:
+            with multiprocessing.Pool(processes=_num_build_workers()) as pool:
+                for idx, lib_path in tqdm(pool.imap_unordered(_build_ir_module_job_indexed, jobs), total=len(jobs), disable=not verbose):
+                    yield idx, load_task_func(lib_path, build_instances[idx].ir_module.task) if lib_path else None
+        else:
+            for idx, lib_path in map(_build_ir_module_job_indexed, jobs):
+                yield idx, load_task_func(lib_path, build_instances[idx].ir_module.task) if lib_path else None
+    if verbose and len(jobs) > 0:
+        print('Build {} modules within {:.3f} seconds (overlapped with the consumer), on average {:.1f} seconds per module.'.format(
+            len(jobs), timer.elapsed_seconds(), timer.elapsed_seconds() / len(jobs)))
+
+
 def batch_build_ir_modules(build_instances, parallel=True, verbose=False) -> List[Optional[CompiledFunction]]:
     """
     Build a batch of ir modules.
@@ -253,16 +357,11 @@ def batch_build_ir_modules(build_instances, parallel=True, verbose=False) -> Lis
     with Timer() as timer:
         lib_paths = []
         if parallel:
-            # Set the affinity of current process. Some package such as numpy will change affinity of current process,
-            # which might limit the parallelism of compilation.
-            os.sched_setaffinity(0, range(os.cpu_count()))
-            mem_for_worker = 1.5 * 1024 * 1024 * 1024  # 1.5 GiB
-            num_workers = min(max(int(psutil.virtual_memory().available // mem_for_worker), 1), psutil.cpu_count())
-            with multiprocessing.Pool(processes=num_workers) as pool:
+            with multiprocessing.Pool(processes=_num_build_workers()) as pool:
                 for lib_path in tqdm(pool.imap(build_ir_module_job, build_instances), total=len(build_instances), disable=not verbose):
                     lib_paths.append(lib_path)
         else:
-            lib_paths = map(build_ir_module_job, build_instances)
+            lib_paths = list(map(build_ir_module_job, build_instances))
         assert len(lib_paths) == len(build_instances)
         funcs = [load_task_func(lib_path, instance.ir_module.task) if lib_path else None for lib_path, instance in zip(lib_paths, build_instances)]
     if verbose:
@@ -3,7 +3,7 @@ from hidet.ir.func import *
 from hidet.ir.stmt import *
 from hidet.ir.expr import *
 from hidet.ir.dialects.compute import TensorNode, ScalarNode
-from hidet.ir.functors import StmtExprFunctor, TypeFunctor, TypeInfer
+from hidet.ir.functors import StmtExprFunctor, StmtExprVisitor, TypeFunctor, TypeInfer
 from hidet.ir.dialects.lowlevel import VoidType, PointerType, Dereference, Address, ReferenceType, Reference, TensorPointerType
 from hidet.utils.doc import Doc, NewLine, Text, doc_join
 from hidet.ir.utils.call_graph import CallGraph
@@ -18,6 +18,8 @@ class Codegen(StmtExprFunctor, TypeFunctor):
         self.ir_module: Optional[IRModule] = None
         self.namer = Namer()
         self.type_infer = TypeInfer()
+        self.func_local_vars: List[Var] = []
+        self.func_body: Optional[Stmt] = None
 
     @staticmethod
     def canonize_funcname(name: str):
@@ -156,6 +158,8 @@ class Codegen(StmtExprFunctor, TypeFunctor):
 
     def visit_Function(self, func: Function) -> Doc:
         self.namer.clear()
+        self.func_local_vars = func.local_vars
+        self.func_body = func.body
 
         doc = NewLine()
 
@@ -392,12 +396,67 @@ class Codegen(StmtExprFunctor, TypeFunctor):
         doc += self(stmt.body)
         return doc
 
+    def private_vars(self, loop: ForStmt) -> Tuple[List[Var], List[Var]]:
+        # the scalars and register tensors declared in the function are private to each thread of a parallel loop.
+        # the ones that are also used outside the loop are firstprivate to keep their values before the loop, unless
+        # they are scalars assigned before any read of them in the loop body.
+        from hidet.ir.functors import collect
+        used_vars = set(collect(loop.body, Var))
+        outside_vars = _OutsideVarCollector(loop).collect(self.func_body)
+        private_vars, firstprivate_vars = [], []
+        for v in self.func_local_vars:
+            if v not in used_vars:
+                continue
+            if not (isinstance(v.type, ScalarType) or (isinstance(v.type, TensorType) and v.type.scope.name == 'register')):
+                continue
+            if v not in outside_vars or (isinstance(v.type, ScalarType) and self.assigned_before_read(loop.body, v)):
+                private_vars.append(v)
+            else:
+                firstprivate_vars.append(v)
+        return private_vars, firstprivate_vars
+
+    @staticmethod
+    def assigned_before_read(stmt: Stmt, v: Var) -> bool:
+        # only the statements executed unconditionally at the beginning of the body are checked, conservatively
+        from hidet.ir.functors import collect
+        if isinstance(stmt, SeqStmt):
+            stmts = list(stmt.seq)
+        elif isinstance(stmt, LetStmt):
+            if any(v in collect(value, Var) for value in stmt.bind_values):
+                return False
+            stmts = [stmt.body]
+        else:
+            stmts = [stmt]
+        for s in stmts:
+            if isinstance(s, AssignStmt) and s.var is v:
+                return v not in collect(s.value, Var)
+            if isinstance(s, (SeqStmt, LetStmt)):
+                if Codegen.assigned_before_read(s, v):
+                    return True
+            if v in collect(s, Var):
+                return False
+        return False
+
     def visit_ForStmt(self, stmt: ForStmt):
         v = stmt.loop_var
         init_doc = self(v.type) + ' ' + self(v) + ' = ' + self(convert(0))
-        cond_doc = self(v < stmt.extent)
-        update_doc = self(v) + ' = ' + self(v + 1)
+        if stmt.parallel or stmt.vectorize:
+            # openmp requires the loop in canonical form
+            cond_doc = self(v) + ' < ' + self(stmt.extent)
+            update_doc = self(v) + '++'
+        else:
+            cond_doc = self(v < stmt.extent)
+            update_doc = self(v) + ' = ' + self(v + 1)
         doc = Text('')
+        if stmt.parallel:
+            private_vars, firstprivate_vars = self.private_vars(stmt)
+            doc += NewLine() + ('#pragma omp parallel for simd' if stmt.vectorize else '#pragma omp parallel for') + ' schedule(static)'
+            if len(private_vars) > 0:
+                doc += ' private(' + doc_join([self(pv) for pv in private_vars], ', ') + ')'
+            if len(firstprivate_vars) > 0:
+                doc += ' firstprivate(' + doc_join([self(pv) for pv in firstprivate_vars], ', ') + ')'
+        elif stmt.vectorize:
+            doc += NewLine() + '#pragma omp simd'
         if stmt.unroll is not None:
             if isinstance(stmt.unroll, bool):
                 if stmt.unroll:
@@ -504,6 +563,25 @@ class Codegen(StmtExprFunctor, TypeFunctor):
         raise ValueError()
 
 
+class _OutsideVarCollector(StmtExprVisitor):
+    # collect the variables used in a function body, except the ones only used in the given loop
+    def __init__(self, loop: ForStmt):
+        super().__init__()
+        self.loop = loop
+        self.used_vars = set()
+
+    def collect(self, stmt: Stmt):
+        self.visit(stmt)
+        return self.used_vars
+
+    def visit_ForStmt(self, stmt: ForStmt):
+        if stmt is not self.loop:
+            StmtExprVisitor.visit_ForStmt(self, stmt)
+
+    def visit_Var(self, e: Var):
+        self.used_vars.add(e)
+
+
 def codegen(ir_module: IRModule, src_out_path: Optional[str] = None) -> Optional[str]:
     gen = Codegen()
     doc = gen(ir_module)
@@ -4,7 +4,7 @@ import multiprocessing
 import logging
 from hashlib import sha256
 from hidet.transforms import lower, PassContext, SaveIRInstrument, ProfileInstrument
-from hidet.backend import codegen, compile_source, load_task_func, load_lib_func
+from hidet.backend import codegen, compile_source, load_task_func, load_lib_func, has_host_kernels, host_isa
 from hidet.utils import COLORS, hidet_cache_dir
 from hidet.utils.py import cyan, green
 from hidet.ir.task import Task, TaskContext
@@ -23,11 +23,30 @@ def disable_cache(disable: bool = False):
     cache_disabled = not disable
 
 
+def task_target(task: Task) -> str:
+    """
+    Get the target to implement a task on: 'cpu' if all its tensor parameters are in the host scope, otherwise
+    'cuda'.
+    """
+    from hidet.ir.type import TensorType
+    scopes = [param.data_type.scope.name for param in task.parameters if isinstance(param.data_type, TensorType)]
+    if len(scopes) > 0 and all(scope == 'host' for scope in scopes):
+        return 'cpu'
+    return 'cuda'
+
+
 def build_task(task: Task, space_level, use_cache=True, cache_dir=None, load=True):
     # resolve task dir
     if cache_dir is None:
         cache_dir = os.path.join(hidet_cache_dir(), 'ops')
+    target = task_target(task)
     config_str = 'space_{}'.format(space_level)
+    if target == 'cpu' and host_isa() != 'generic':
+        # the host kernels compiled with -march=native can only run on the cpus with the same instruction set
+        config_str += '_{}'.format(host_isa())
+    unroll_budget = PassContext.current().unroll_budget
+    if unroll_budget is not None:
+        config_str += '_unroll_{}'.format(unroll_budget)
     task_string = str(task)
     task_hash = sha256(task_string.encode()).hexdigest()[:16]
     task_dir = os.path.join(cache_dir, config_str, task.name, task_hash)
@@ -51,18 +70,20 @@ def build_task(task: Task, space_level, use_cache=True, cache_dir=None, load=Tru
     with open(os.path.join(task_dir, 'task.txt'), 'w') as f:
         f.write(task_string)
     # implement task
-    with TaskContext(space_level=space_level, resolve_out_dir=task_dir):
-        ir_module = task.implement(target='cuda')
+    ctx = TaskContext.current()
+    with TaskContext(space_level=space_level, resolve_out_dir=task_dir, top_k=ctx.top_k, measurer=ctx.measurer,
+                     max_candidates=ctx.max_candidates, max_seconds=ctx.max_seconds, budget=ctx.budget):
+        ir_module = task.implement(target=target)
     # lower ir module
     with PassContext(instruments=[
                          # SaveIRInstrument(out_dir=os.path.join('./outs/ir', task.name, task_hash)),
                          # ProfileInstrument(log_file=os.path.join('./outs/ir', task.name, task_hash, 'lower_time.txt'))
-                     ]):
+                     ], unroll_budget=unroll_budget):
         ir_module = lower(ir_module)
     # code generation
     codegen(ir_module, src_out_path=src_path)
     # compile source code
-    compile_source(src_path, out_lib_path=lib_path, keep_ptx=False)
+    compile_source(src_path, out_lib_path=lib_path, keep_ptx=False, host_kernels=has_host_kernels(ir_module))
     # load function
     if not load:
         return None
@@ -93,12 +114,12 @@ def build_ir_module(ir_module: IRModule, func_name: str, keep_ptx=False, working
     with PassContext(instruments=[
                          SaveIRInstrument(out_dir=working_dir),
                          ProfileInstrument(log_file=os.path.join(working_dir, 'lower_time.txt'))
-                     ]):
+                     ], unroll_budget=PassContext.current().unroll_budget):
         ir_module = lower(ir_module)
     # code generation
     codegen(ir_module, src_out_path=src_path)
     # compile source code
-    compile_source(src_path, out_lib_path=lib_path, keep_ptx=keep_ptx)
+    compile_source(src_path, out_lib_path=lib_path, keep_ptx=keep_ptx, host_kernels=has_host_kernels(ir_module))
     func = ir_module.lookup(func_name + '_grid')
     return load_lib_func(lib_path, func_name, func_type=FuncType.from_func(func))
 
@@ -3,5 +3,6 @@ from .packedfunc import PackedFunc
 from .packedfunc import ArgType
 
 from .cuda_api import cuda
+from .cpu_api import cpu
 from .runtime_api import runtime_api
 from .cuda_kernels import cuda_kernels
@@ -0,0 +1,30 @@
+from ctypes import c_uint64, c_int32
+from hidet.ffi.ffi import get_func
+
+
+class CpuAPI:
+    # memory related apis
+    _malloc_aligned = get_func('hidet_cpu_malloc_aligned', [c_uint64, c_uint64], c_uint64)
+    _free_aligned = get_func('hidet_cpu_free_aligned', [c_uint64], None)
+    _mmap = get_func('hidet_cpu_mmap', [c_uint64, c_int32], c_uint64)
+    _munmap = get_func('hidet_cpu_munmap', [c_uint64, c_uint64], None)
+
+    @classmethod
+    def malloc_aligned(cls, num_bytes: int, alignment: int = 64) -> int:
+        return cls._malloc_aligned(num_bytes, alignment)
+
+    @classmethod
+    def free_aligned(cls, addr: int) -> None:
+        return cls._free_aligned(addr)
+
+    @classmethod
+    def mmap(cls, num_bytes: int, huge_page: bool = False) -> int:
+        # the returned memory is page aligned and filled with zeros
+        return cls._mmap(num_bytes, 1 if huge_page else 0)
+
+    @classmethod
+    def munmap(cls, addr: int, num_bytes: int) -> None:
+        return cls._munmap(addr, num_bytes)
+
+
+cpu = CpuAPI()
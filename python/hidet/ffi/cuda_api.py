@@ -1,5 +1,5 @@
 from typing import Tuple
-from ctypes import c_uint64, c_uint32, c_float, c_uint8, byref, POINTER, c_char_p
+from ctypes import c_uint64, c_uint32, c_int32, c_float, c_uint8, byref, POINTER, c_char_p
 from hidet.ffi.ffi import get_func
 
 
@@ -39,6 +39,7 @@ class CudaAPI:
     _generate_normal = get_func('hidet_curand_generate_normal', [c_uint64, c_uint64, c_float, c_float], None)
     # get device property
     _device_property = get_func('hidet_cuda_get_device_property', [c_uint64, c_char_p], c_uint64)
+    _device_count = get_func('hidet_cuda_device_count', [], c_int32)
 
     @classmethod
     def mem_info(cls) -> Tuple[int, int]:
@@ -170,6 +171,11 @@ class CudaAPI:
     def device_property(name: str, device_id: int = 0) -> int:
         return CudaAPI._device_property(device_id, name.encode('utf-8'))
 
+    @staticmethod
+    def device_count() -> int:
+        # 0 when there is no cuda driver or device
+        return CudaAPI._device_count()
+
     @staticmethod
     def compute_capability() -> Tuple[int, int]:
         return (CudaAPI.device_property(CudaAPI.PropertyMajor),
@@ -1,7 +1,7 @@
 from typing import Dict, Sequence, Union, Type
 import ctypes
 
-from .ffi import _LIB
+from .ffi import _LIB, get_func
 from ctypes import c_int32, c_void_p, pointer, c_float, cast, c_bool
 from ctypes import POINTER, Structure
 from hidet.ir.type import TypeNode, ScalarType, TensorType
@@ -23,6 +23,10 @@ class CPackedFunc(Structure):
                 ("func_pointer", c_void_p)]
 
 
+# void CallPackedFuncs(int num_funcs, PackedFunc* funcs, void*** args), see src/hidet/packedfunc.cpp
+call_packed_funcs = get_func('CallPackedFuncs', [c_int32, POINTER(CPackedFunc), POINTER(POINTER(c_void_p))], None)
+
+
 class PackedFunc:
     def __init__(self, param_types, c_func_pointer, ret_type=None, default_args: Dict[int, object] = None):
         self.param_types = param_types
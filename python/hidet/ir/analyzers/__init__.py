@@ -1,3 +1,4 @@
 from . import bound_analyzer
 
 from .bound_analyzer import BoundInfo, BoundAnalyzer, infer_bound
+from .resource_analyzer import ResourceUsage, ResourceLimits, analyze_resource_usage
@@ -0,0 +1,258 @@
+from typing import Dict, List, Optional, Tuple, Union
+from collections import defaultdict
+
+from hidet.ir.type import ScalarType, TensorType
+from hidet.ir.expr import Expr, Var, Constant, TensorElement, TensorSlice, Call, BinaryOp
+from hidet.ir.expr import Add, Sub, Multiply, Div, Mod, FloorDiv
+from hidet.ir.dialects.lowlevel import PointerType, TensorPointerType
+from hidet.ir.func import Function, IRModule
+from hidet.ir.functors import FuncStmtExprVisitor, simplify_to_int
+from hidet.ir.stmt import ForStmt, LetStmt, IfStmt, BufferStoreStmt, AssignStmt
+
+
+class ResourceUsage:
+    """
+    The statically estimated resource usage of a cuda kernel.
+
+    Attributes
+    ----------
+    num_regs: int
+        The estimated number of 32-bit registers used by each thread, rounded up to a multiple of 8.
+    smem_bytes: int
+        The number of bytes of shared memory used by each thread block (static and dynamic).
+    block_size: int
+        The number of threads in each thread block.
+    inst_mix: Dict[str, int]
+        The estimated number of executed instructions of each thread, grouped by category:
+        'ld.global', 'st.global', 'ld.shared', 'st.shared', 'arith', 'sync' and 'branch'.
+    """
+    def __init__(self, num_regs: int, smem_bytes: int, block_size: int, inst_mix: Dict[str, int]):
+        self.num_regs: int = num_regs
+        self.smem_bytes: int = smem_bytes
+        self.block_size: int = block_size
+        self.inst_mix: Dict[str, int] = dict(inst_mix)
+
+    def __str__(self):
+        items = ['regs={}'.format(self.num_regs), 'smem={}'.format(self.smem_bytes), 'block={}'.format(self.block_size)]
+        items.extend('{}={}'.format(name, count) for name, count in sorted(self.inst_mix.items()))
+        return 'ResourceUsage({})'.format(', '.join(items))
+
+    def num_insts(self) -> int:
+        return sum(self.inst_mix.values())
+
+    def resident_blocks(self, limits: 'ResourceLimits') -> int:
+        """
+        The number of thread blocks that can reside on one streaming multiprocessor at the same time.
+        """
+        blocks = limits.max_num_regs_per_sm // max(self.num_regs * self.block_size, 1)
+        if self.smem_bytes > 0:
+            blocks = min(blocks, limits.max_smem_bytes_per_sm // self.smem_bytes)
+        return blocks
+
+    def violations(self, limits: 'ResourceLimits') -> List[str]:
+        """
+        Get the list of hardware limits exceeded by this resource usage. An empty list means the kernel is
+        expected to launch (and not to spill registers).
+        """
+        msgs = []
+        if self.num_regs > limits.max_num_regs_per_thread:
+            msgs.append('registers per thread {} exceeds {}'.format(self.num_regs, limits.max_num_regs_per_thread))
+        if self.num_regs * self.block_size > limits.max_num_regs_per_block:
+            msgs.append('registers per block {} exceeds {}'.format(self.num_regs * self.block_size, limits.max_num_regs_per_block))
+        if self.smem_bytes > limits.max_smem_bytes_per_block:
+            msgs.append('shared memory per block {} exceeds {}'.format(self.smem_bytes, limits.max_smem_bytes_per_block))
+        return msgs
+
+
+class ResourceLimits:
+    def __init__(self, max_num_regs_per_thread: int, max_num_regs_per_block: int, max_num_regs_per_sm: int,
+                 max_smem_bytes_per_block: int, max_smem_bytes_per_sm: int):
+        self.max_num_regs_per_thread = max_num_regs_per_thread
+        self.max_num_regs_per_block = max_num_regs_per_block
+        self.max_num_regs_per_sm = max_num_regs_per_sm
+        self.max_smem_bytes_per_block = max_smem_bytes_per_block
+        self.max_smem_bytes_per_sm = max_smem_bytes_per_sm
+
+    # the compute capabilities known by the resource tables in hidet.utils.cuda
+    known_compute_capabilities: List[Tuple[int, int]] = [(6, 0), (6, 1), (6, 2), (7, 0), (7, 2), (7, 5), (8, 0), (8, 6)]
+
+    @staticmethod
+    def from_compute_capability(cc: Optional[Tuple[int, int]] = None) -> 'ResourceLimits':
+        """
+        Get the resource limits of given compute capability. When cc is None, the compute capability of the current
+        device is queried. An unknown compute capability (e.g., a newer architecture) uses the limits of the nearest
+        known one: the newest known one that is not newer than it, or the oldest known one.
+        """
+        from hidet.utils import cuda
+        if cc is None:
+            cc = cuda.query_compute_capability()
+        cc = tuple(cc)
+        known = ResourceLimits.known_compute_capabilities
+        if cc not in known:
+            older = [v for v in known if v <= cc]
+            cc = max(older) if len(older) > 0 else min(known)
+        return ResourceLimits(
+            max_num_regs_per_thread=cuda.max_num_regs_per_thread(),
+            max_num_regs_per_block=cuda.max_num_regs_per_block(cc),
+            max_num_regs_per_sm=cuda.max_num_regs_per_sm(cc),
+            max_smem_bytes_per_block=cuda.max_smem_bytes_per_block(cc),
+            max_smem_bytes_per_sm=cuda.max_smem_bytes_per_sm(cc)
+        )
+
+
+def _scope_of(v: Expr) -> str:
+    while isinstance(v, (TensorSlice, TensorElement)):
+        v = v.base
+    if isinstance(v, Var):
+        tp = v.type
+        if isinstance(tp, TensorType):
+            return tp.scope.name
+        elif isinstance(tp, TensorPointerType):
+            return tp.tensor_type.scope.name
+        elif isinstance(tp, PointerType):
+            return 'shared' if '__shared__' in tp.specifiers else 'global'
+    return 'unknown'
+
+
+def _num_regs_of_type(tp) -> int:
+    if isinstance(tp, ScalarType):
+        return (tp.nbytes() + 3) // 4
+    elif isinstance(tp, TensorType):
+        if tp.scope.name == 'register':
+            return (simplify_to_int(tp.storage_bytes()) + 3) // 4
+        return 0
+    elif isinstance(tp, (PointerType, TensorPointerType)):
+        return 2
+    else:
+        return 1
+
+
+class ResourceAnalyzer(FuncStmtExprVisitor):
+    arith_ops = (Add, Sub, Multiply, Div, Mod, FloorDiv)
+
+    def __init__(self):
+        super().__init__(use_memo=False)
+        self.weight: int = 1
+        self.live_scalars: int = 0
+        self.max_live_scalars: int = 0
+        self.inst_mix: Dict[str, int] = defaultdict(int)
+
+    def analyze(self, func: Function, reserved_regs: int = 16) -> ResourceUsage:
+        # registers: register tensors and scalars declared in function, plus the peak number of live loop/let vars
+        num_regs = sum(_num_regs_of_type(v.type) for v in func.local_vars)
+        self.visit(func.body)
+        num_regs += self.max_live_scalars + reserved_regs
+        num_regs = (num_regs + 7) // 8 * 8
+
+        # shared memory: static shared tensors plus dynamic shared memory
+        smem_bytes = 0
+        for v in func.local_vars:
+            if isinstance(v.type, TensorType) and v.type.scope.name == 'shared':
+                smem_bytes += simplify_to_int(v.type.storage_bytes())
+        smem_bytes += int(func.get_attr('cuda_dynamic_smem_bytes', 0))
+
+        block_dim = func.get_attr('cuda_block_dim', 1)
+        block_dims = block_dim if isinstance(block_dim, (list, tuple)) else [block_dim]
+        block_size = 1
+        for d in block_dims:
+            block_size *= simplify_to_int(d)
+        return ResourceUsage(num_regs, smem_bytes, block_size, self.inst_mix)
+
+    def count(self, category: str, n: int = 1):
+        self.inst_mix[category] += n * self.weight
+
+    def bind_scalars(self, n: int):
+        self.live_scalars += n
+        self.max_live_scalars = max(self.max_live_scalars, self.live_scalars)
+
+    def visit_ForStmt(self, stmt: ForStmt):
+        self.visit(stmt.extent)
+        extent = stmt.extent
+        trip_count = int(extent.value) if isinstance(extent, Constant) else 1
+        self.count('branch')
+        self.bind_scalars(1)
+        orig_weight = self.weight
+        self.weight *= max(trip_count, 1)
+        self.visit(stmt.body)
+        self.weight = orig_weight
+        self.live_scalars -= 1
+
+    def visit_LetStmt(self, stmt: LetStmt):
+        for bind_value in stmt.bind_values:
+            self.visit(bind_value)
+        self.bind_scalars(len(stmt.bind_vars))
+        self.visit(stmt.body)
+        self.live_scalars -= len(stmt.bind_vars)
+
+    def visit_IfStmt(self, stmt: IfStmt):
+        self.count('branch')
+        FuncStmtExprVisitor.visit_IfStmt(self, stmt)
+
+    def visit_BufferStoreStmt(self, stmt: BufferStoreStmt):
+        scope = _scope_of(stmt.buf)
+        if scope in ['global', 'shared']:
+            self.count('st.' + scope)
+        for idx in stmt.indices:
+            self.visit(idx)
+        self.visit(stmt.value)
+
+    def visit_AssignStmt(self, stmt: AssignStmt):
+        self.visit(stmt.value)
+
+    def visit_TensorElement(self, e: TensorElement):
+        scope = _scope_of(e.base)
+        if scope in ['global', 'shared']:
+            self.count('ld.' + scope)
+        for idx in e.indices:
+            self.visit(idx)
+
+    def visit_Call(self, e: Call):
+        name = e.func_var.name if e.func_var.name else e.func_var.hint
+        if name and 'syncthreads' in name:
+            self.count('sync')
+        for arg in e.args:
+            self.visit(arg)
+
+    def visit_Binary(self, e: BinaryOp):
+        if isinstance(e, self.arith_ops):
+            self.count('arith')
+        self.visit(e.a)
+        self.visit(e.b)
+
+    visit_Add = visit_Binary
+    visit_Sub = visit_Binary
+    visit_Multiply = visit_Binary
+    visit_Div = visit_Binary
+    visit_Mod = visit_Binary
+    visit_FloorDiv = visit_Binary
+
+
+def analyze_resource_usage(node: Union[IRModule, Function], reserved_regs: int = 16) -> ResourceUsage:
+    """
+    Statically estimate the resource usage of a cuda kernel without compiling it.
+
+    The analysis works on both scheduled and lowered ir. The number of registers is estimated from the register
+    tensors and scalar variables declared in the kernel, the peak number of simultaneously live loop and let
+    variables, and the reserved registers for intermediate results. The instruction mix counts each instruction
+    weighted by the trip counts of its enclosing loops with constant extents.
+
+    Parameters
+    ----------
+    node: Union[IRModule, Function]
+        The cuda kernel function, or an ir module that contains exactly one cuda kernel.
+    reserved_regs: int
+        The number of registers reserved for intermediate results and addressing.
+
+    Returns
+    -------
+    ret: ResourceUsage
+        The estimated resource usage.
+    """
+    if isinstance(node, IRModule):
+        kernels = [func for func in node.functions.values() if func.kind == 'cuda_kernel']
+        if len(kernels) != 1:
+            raise ValueError('Expect exactly one cuda kernel in the ir module, got {}.'.format(len(kernels)))
+        node = kernels[0]
+    if not isinstance(node, Function):
+        raise ValueError('Expect a Function or IRModule, got {}.'.format(type(node)))
+    return ResourceAnalyzer().analyze(node, reserved_regs)
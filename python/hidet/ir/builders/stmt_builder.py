@@ -47,10 +47,10 @@ class StmtBuilder:
         seq_let_stmt = LetStmt(bind_vars, bind_values, body=1)
         return StmtScope(self, stmts=seq_let_stmt, ret=bind_vars)
 
-    def for_loop(self, v: Union[str, Var], extent: Union[int, Expr], unroll: Optional[bool] = None) -> StmtScope:
+    def for_loop(self, v: Union[str, Var], extent: Union[int, Expr], unroll: Optional[bool] = None, parallel: bool = False, vectorize: bool = False) -> StmtScope:
         if isinstance(v, str):
             v = var(v)
-        return StmtScope(self, stmts=ForStmt(v, extent, unroll), ret=v)
+        return StmtScope(self, stmts=ForStmt(v, extent, unroll, parallel=parallel, vectorize=vectorize), ret=v)
 
     def if_then(self, cond: Union[bool, Expr]) -> StmtScope:
         return StmtScope(self, stmts=[IfStmt(cond)], ret=None)
@@ -63,8 +63,8 @@ class StmtBuilder:
         assert if_stmt.else_body is None
         return StmtScope(self, stmts=if_stmt, ret=None)
 
-    def for_task(self, worker_index: Expr, task_layout: TaskLayout):
-        expander = TaskLayoutExpander()
+    def for_task(self, worker_index: Expr, task_layout: TaskLayout, unroll_limit: int = 1024):
+        expander = TaskLayoutExpander(unroll_limit)
         fields = expander.expand(worker_index, task_layout)
         return StmtScope(self, stmts=expander.stmts, ret=fields)
 
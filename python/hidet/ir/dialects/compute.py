@@ -125,8 +125,10 @@ def compute(name, shape, fcompute, scope=None, layout=None) -> TensorNode:
     axes = [var() for _ in shape]
     value = convert(fcompute(*axes))
     if scope is None:
-        # todo: automatic determine scope by checking inputs' scope
-        scope = 'global'
+        # the computed tensor stays on host when it is computed from host tensors
+        from hidet.ir.functors import collect
+        input_scopes = [node.data_type.scope.name for node in collect(value, TensorNode)]
+        scope = 'host' if 'host' in input_scopes else 'global'
     return TensorNode(
         name=name,
         data_type=tensor_type(scope, dtype=infer_type(value), shape=shape, layout=layout),
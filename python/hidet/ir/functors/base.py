@@ -665,7 +665,7 @@ class StmtRewriter(StmtFunctor):
         if loop_var is stmt.loop_var and body is stmt.body:
             return stmt
         else:
-            return ForStmt(loop_var, extent, stmt.unroll, body)
+            return ForStmt(loop_var, extent, stmt.unroll, body, stmt.parallel, stmt.vectorize)
 
     def visit_IfStmt(self, stmt: IfStmt):
         cond = self.visit_expr(stmt.cond)
@@ -244,6 +244,10 @@ class IRPrinter(StmtExprFunctor, TypeFunctor):
                 doc += '[unroll]'
             else:
                 doc += '[no-unroll]'
+        if stmt.parallel:
+            doc += '[parallel]'
+        if stmt.vectorize:
+            doc += '[vectorize]'
         doc += self(stmt.body).indent(4)
         return doc
 
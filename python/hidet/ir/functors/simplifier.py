@@ -120,7 +120,7 @@ class Simplifier(StmtExprRewriter):
             if loop_var is stmt.loop_var and body is stmt.body:
                 return stmt
             else:
-                return ForStmt(loop_var, extent, stmt.unroll, body)
+                return ForStmt(loop_var, extent, stmt.unroll, body, stmt.parallel, stmt.vectorize)
 
 
 def simplify(node: Union[Stmt, Expr], repeat_limit=10):
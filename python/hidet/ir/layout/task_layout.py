@@ -135,9 +135,11 @@ class ComposedTaskLayout(TaskLayout):
 
 
 class TaskLayoutExpander:
-    def __init__(self):
+    def __init__(self, unroll_limit: int = 1024):
         from hidet.ir.stmt import ForStmt, LetStmt
         self.stmts: List[Union[LetStmt, ForStmt]] = []
+        # the full layouts with fewer tasks than this limit are unrolled, otherwise expanded as for loops
+        self.unroll_limit = unroll_limit
 
     def variablize(self, e):
         from hidet.ir import LetStmt
@@ -184,8 +186,7 @@ class TaskLayoutExpander:
         return [[self.variablize(v) for v in layout(w)[0]]]
 
     def expand_full(self, w: Int, layout: FullTaskLayout):
-        unroll_limit = 1024
-        if prod(layout.task_shape) < unroll_limit:
+        if prod(layout.task_shape) < self.unroll_limit:
             # unroll automatically
             return layout(w)
         else:
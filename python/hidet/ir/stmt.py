@@ -60,13 +60,35 @@ class LetStmt(Stmt):
 class ForStmt(Stmt):
     DEFAULT_UNROLL_LIMIT = 32
 
-    def __init__(self, loop_var, extent, unroll: Optional[Union[int, bool]] = None, body=None):
+    def __init__(self, loop_var, extent, unroll: Optional[Union[int, bool]] = None, body=None, parallel: bool = False, vectorize: bool = False):
+        """
+        A for loop.
+
+        Parameters
+        ----------
+        loop_var: Var
+            The loop variable, iterates from 0 to extent - 1.
+        extent: Union[Expr, int]
+            The extent of the loop.
+        unroll: Optional[Union[int, bool]]
+            The unroll hint. None means no hint, True means unrolling completely, False means not unrolling, and an
+            integer means the unroll factor.
+        body: Stmt
+            The loop body.
+        parallel: bool
+            Whether the iterations are distributed to cpu threads (with openmp). The scalars and register tensors
+            declared in the function are private to each thread in the loop, while other tensors are shared.
+        vectorize: bool
+            Whether the iterations are independent and can be executed with simd instructions.
+        """
         from hidet.ir.functors import simplify
         super().__init__()
         self.loop_var: Var = loop_var
         self.extent = simplify(convert(extent))
         self.unroll = unroll
         self.body = body
+        self.parallel = parallel
+        self.vectorize = vectorize
 
 
 class IfStmt(Stmt):
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Any
 import copy
 import os
+import time
 import pickle
 from typing import Dict, List, Union, Optional, Sequence, Type, Tuple, Callable, TypeVar
 from hidet.ir.node import Node
@@ -43,12 +44,65 @@ class Epilogue(Node):
         self.out_tensor: TensorNode = out_tensor
 
 
+class TuningBudget:
+    """
+    A tuning budget shared by all the tasks of a model. The time budget starts counting when it is created.
+    """
+    def __init__(self, max_seconds: Optional[float] = None, max_candidates: Optional[int] = None):
+        self.max_seconds = max_seconds
+        self.max_candidates = max_candidates
+        self.start_time = time.time()
+        self.used_candidates = 0
+
+    def deadline(self) -> Optional[float]:
+        return self.start_time + self.max_seconds if self.max_seconds is not None else None
+
+    def remaining_candidates(self) -> Optional[int]:
+        return max(self.max_candidates - self.used_candidates, 0) if self.max_candidates is not None else None
+
+    def consume(self, num_candidates: int):
+        self.used_candidates += num_candidates
+
+    def exhausted(self) -> bool:
+        deadline = self.deadline()
+        return (deadline is not None and time.time() >= deadline) or self.remaining_candidates() == 0
+
+
 class TaskContext:
     contexts = []
 
-    def __init__(self, space_level: int = 0, resolve_out_dir: str = None):
+    def __init__(self, space_level: int = 0, resolve_out_dir: str = None, top_k: Optional[int] = None, measurer=None,
+                 max_candidates: Optional[int] = None, max_seconds: Optional[float] = None, budget: Optional[TuningBudget] = None):
+        """
+        The context of implementing tasks.
+
+        Parameters
+        ----------
+        space_level: int
+            The level of schedule space to search.
+        resolve_out_dir: str
+            The directory to store the resolving results.
+        top_k: Optional[int]
+            The number of candidates selected by the cost model to build and measure.
+        measurer: Optional[hidet.tos.ops.schedules.measure.Measurer]
+            The measurer of candidates. None means measuring on cuda device.
+        max_candidates: Optional[int]
+            The maximum number of candidates to build and measure for each task.
+        max_seconds: Optional[float]
+            The maximum wall time in seconds to build and measure the candidates of each task.
+        budget: Optional[TuningBudget]
+            The budget shared by all tasks (e.g., of a model).
+
+        When a budget runs out, the best candidate found so far is used, and the tuning record is marked as partial
+        so that the tuning of the task can be resumed later.
+        """
         self.space_level = space_level
         self.resolve_out_dir = resolve_out_dir
+        self.top_k = top_k
+        self.measurer = measurer
+        self.max_candidates = max_candidates
+        self.max_seconds = max_seconds
+        self.budget = budget
 
     def __enter__(self):
         self.contexts.append(self)
@@ -248,6 +302,58 @@ def is_elementwise_task(task: Task) -> bool:
     return is_unary_injective_task(task) and len(task.inverse_map) > 0
 
 
+def _collect_accesses(value: Expr, axes: Sequence[Var], aligned: bool, accesses: Dict[TensorNode, bool]):
+    # record whether each input tensor is only accessed at the given axes, through the chain of grid computes
+    from hidet.ir.functors import collect
+    for te in collect(value, TensorElement, stop_when_found=True):
+        for index in te.indices:
+            _collect_accesses(index, axes, False, accesses)
+        same_axes = aligned and len(te.indices) == len(axes) and all(a is b for a, b in zip(te.indices, axes))
+        base = te.base
+        if isinstance(base, TensorNode) and base.grid_compute is not None:
+            _collect_accesses(base.grid_compute.value, base.grid_compute.axes, same_axes, accesses)
+        else:
+            accesses[base] = accesses.get(base, True) and same_axes
+
+
+def inplace_parameters(task: Task) -> List[TensorNode]:
+    """
+    Get the input parameters of a task whose memory can be reused by the output parameter. The task must have a
+    single output, and the input parameter must have the same shape and data type as the output and is only accessed
+    at the same indices as the element of output being computed (e.g., the inputs of elementwise tasks). Thus, each
+    element of the input is read before the same element of the output is written.
+
+    Parameters
+    ----------
+    task: Task
+        The task to check.
+
+    Returns
+    -------
+    ret: List[TensorNode]
+        The input parameters that the output parameter can be written to.
+    """
+    if len(task.outputs) != 1 or not is_injective_task(task):
+        return []
+    out = task.outputs[0]
+    if out.grid_compute is None:
+        return []
+    accesses: Dict[TensorNode, bool] = {}
+    _collect_accesses(out.grid_compute.value, out.grid_compute.axes, True, accesses)
+    for x, prologue in task.prologues.items():
+        _collect_accesses(prologue.value, prologue.indices, accesses.pop(x, True), accesses)
+    if out in task.epilogues:
+        epilogue = task.epilogues[out]
+        out = epilogue.out_tensor
+        aligned = len(epilogue.out_indices) == len(epilogue.indices) and all(a is b for a, b in zip(epilogue.out_indices, epilogue.indices))
+        if not aligned:
+            return []
+        _collect_accesses(epilogue.value, epilogue.indices, True, accesses)
+    num_inputs = len(task.parameters) - len(task.outputs)
+    return [p for p in task.parameters[:num_inputs] if accesses.get(p, False)
+            and p.const_shape() == out.const_shape() and p.data_type.scalar_type.name == out.data_type.scalar_type.name]
+
+
 def save_task(task: Task, fname: str):
     task.save(fname)
 
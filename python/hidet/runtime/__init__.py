@@ -2,7 +2,7 @@ from . import module
 from . import cuda_event
 
 from .module import CompiledModule, CompiledFunction
-from .storage import Storage
+from .storage import Storage, allocation_tracer
 from .cuda_event import cuda_event_pool, CudaEventPool, CudaEvent
 
 
@@ -61,6 +61,8 @@ class CudaGraph:
             block_size=4096,
             max_reserve_size=10 * 1024 ** 3
         )
+        # the capture runs on its own stream, it must reuse the blocks cached by the warm-up runs on the default stream
+        self.mem_pool.pin_stream(0)
         self.cuda_graph_impl = CudaGraphImpl()
         with self.mem_pool:
             self.inputs = [dummy_input_like(tensor) for tensor in flow_graph.inputs]
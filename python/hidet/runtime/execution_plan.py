@@ -0,0 +1,124 @@
+from typing import List, Dict, Tuple, Union, Any
+import ctypes
+from ctypes import c_int32, c_void_p, POINTER, cast
+
+from hidet.ffi.packedfunc import CPackedFunc, call_packed_funcs
+from hidet.tos import Tensor, FlowGraph
+from hidet.runtime.memory_planner import MemoryPlan
+from hidet.utils import tracer
+
+
+"""
+An execution plan runs a flow graph with (almost) no python overhead per operator. Everything that FlowGraph.forward
+computes for each node in each run is prepared once when the plan is created:
+    1. the memory of intermediate tensors is planned in an arena (see hidet.runtime.memory_planner),
+    2. the kernel of each node is converted to a ctypes function pointer with the packed function signature,
+    3. the void** argument array of each node is filled with the addresses of its tensors in the arena and constants.
+Only the slots of graph inputs in the argument arrays are updated when the plan is run. Then all kernels are launched by
+a single call to the native run loop (CallPackedFuncs in src/hidet/packedfunc.cpp), which releases the GIL during the
+whole graph, like the replay of a cuda graph. An execution plan owns its arena and argument arrays, thus the python
+threads that serve requests concurrently should use one plan for each thread.
+"""
+
+# void (*PackedFunc_t)(int num_args, int *arg_types, void** args), see include/hidet/packedfunc.h
+PackedFuncType = ctypes.CFUNCTYPE(None, c_int32, POINTER(c_int32), POINTER(c_void_p))
+
+
+class ExecutionPlan:
+    def __init__(self, flow_graph: FlowGraph, policy: str = 'greedy_by_size'):
+        self.memory_plan = MemoryPlan(flow_graph, policy=policy)
+        self.flow_graph: FlowGraph = flow_graph
+        graph_inputs: Dict[Tensor, int] = {x: idx for idx, x in enumerate(flow_graph.inputs)}
+        self.input_signatures: List[Tuple[List[int], str, str]] = [(x.shape, x.dtype, x.device) for x in flow_graph.inputs]
+
+        # (kernel, number of arguments, argument types, argument array) of each node
+        self.calls: List[Tuple[Any, c_int32, Any, Any]] = []
+        # (argument array, slot, index of graph input) of the arguments that are graph inputs
+        self.input_slots: List[Tuple[Any, int, int]] = []
+        # the converted arguments (e.g., scalars) referenced by the argument arrays
+        self.keep_alive: List[Any] = []
+        # the names and trace arguments of nodes, used when tracing
+        self.trace_args: List[Tuple[str, Dict[str, Any]]] = []
+        for node, node_outputs in zip(flow_graph.nodes, self.memory_plan.node_outputs):
+            packed_func = node.get_task_func().packed_func
+            if packed_func.ret_type is not None:
+                raise NotImplementedError('Can not plan the kernel of {} with return value.'.format(node.name))
+            node_args = []
+            for x in node.inputs:
+                if x.storage is not None:
+                    node_args.append(x)
+                elif x in graph_inputs:
+                    node_args.append(graph_inputs[x])
+                else:
+                    node_args.append(self.memory_plan.tensor_map[x])
+            node_args = packed_func._apply_default_args(node_args + node_outputs)
+            arg_array = (c_void_p * len(node_args))()
+            for slot, (param_type, arg) in enumerate(zip(packed_func.param_types, node_args)):
+                if slot not in packed_func.default_args and isinstance(arg, int):
+                    # the slot of a graph input, filled when running
+                    self.input_slots.append((arg_array, slot, arg))
+                else:
+                    converted = packed_func._convert_arg(param_type, arg)
+                    self.keep_alive.append(converted)
+                    arg_array[slot] = converted.value
+            c_packed_func = packed_func.c_packed_func
+            kernel = PackedFuncType(c_packed_func.func_pointer)
+            self.calls.append((kernel, c_packed_func.num_args, c_packed_func.arg_types, arg_array))
+            self.keep_alive.append(packed_func)
+
+            args = {f'input_{idx}': f'{tensor.dtype}{tensor.shape}' for idx, tensor in enumerate(node.inputs)}
+            args.update(node.attrs)
+            self.trace_args.append((node.name, args))
+
+        # the packed functions and argument arrays passed to the native run loop
+        self.num_calls = c_int32(len(self.calls))
+        self.c_packed_funcs = (CPackedFunc * len(self.calls))(*[CPackedFunc(num_args, arg_types, cast(kernel, c_void_p))
+                                                               for kernel, num_args, arg_types, _ in self.calls])
+        self.c_arg_arrays = (POINTER(c_void_p) * len(self.calls))(*[cast(arg_array, POINTER(c_void_p)) for _, _, _, arg_array in self.calls])
+
+        # the graph outputs, which are either views of the arena or graph inputs
+        self.outputs: List[Union[Tensor, int]] = [graph_inputs[x] if x in graph_inputs else self.memory_plan.tensor_map[x]
+                                                  for x in flow_graph.outputs]
+
+    def __call__(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        return self.run(*inputs)
+
+    def run(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        """
+        Run the flow graph with the prepared kernels and argument arrays. Same as MemoryPlan.forward, the output
+        tensors are views of the arena and overwritten by the next run.
+        """
+        # the kernels take raw addresses, an input on another device would be read from the wrong address space
+        if [(x.shape, x.dtype, x.device) for x in inputs] != self.input_signatures:
+            raise ValueError('The execution plan expects inputs with signature {}, but got {}.'.format(
+                self.input_signatures, [(x.shape, x.dtype, x.device) for x in inputs]))
+        for arg_array, slot, idx in self.input_slots:
+            arg_array[slot] = inputs[idx].storage.addr
+        if tracer.tracing:
+            for (kernel, num_args, arg_types, arg_array), (name, args) in zip(self.calls, self.trace_args):
+                with tracer.profile(name, category='op', args=args, trace_cuda=True):
+                    kernel(num_args, arg_types, arg_array)
+        else:
+            call_packed_funcs(self.num_calls, self.c_packed_funcs, self.c_arg_arrays)
+        ret = [inputs[x] if isinstance(x, int) else x for x in self.outputs]
+        return ret[0] if len(ret) == 1 else ret
+
+
+def create_execution_plan(flow_graph: FlowGraph, policy: str = 'greedy_by_size') -> ExecutionPlan:
+    """
+    Create an execution plan of the flow graph, which prepares the kernels, memory and arguments of all operators,
+    such that running the graph has little python overhead.
+
+    Parameters
+    ----------
+    flow_graph: FlowGraph
+        The flow graph to run.
+    policy: str
+        The memory planning policy, see hidet.runtime.memory_planner.plan_memory.
+
+    Returns
+    -------
+    ret: ExecutionPlan
+        The execution plan, which can be called with the graph inputs as FlowGraph.forward.
+    """
+    return ExecutionPlan(flow_graph, policy)
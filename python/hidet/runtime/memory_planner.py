@@ -0,0 +1,210 @@
+from typing import List, Dict, Optional, Union
+from collections import defaultdict
+
+from hidet.tos import Tensor, FlowGraph, Operator
+from hidet.runtime.storage import Storage, MemoryPool, CpuMemoryPool, CudaMemoryPool, nbytes2str
+from hidet.utils import tracer
+
+
+"""
+Plan the memory of all intermediate tensors of a flow graph ahead of time.
+
+The lifetime of a tensor is the range of node indices in the topological order from the node that produces it to the
+last node that consumes it (the graph outputs live until the end). Two tensors can share memory when their lifetimes
+do not overlap, thus we assign each tensor an offset in a single arena per device such that the tensors alive at the
+same time do not overlap in the arena (the offset calculation problem). The arena is allocated once, and the forward
+of the planned graph does not allocate any memory. When an elementwise operator can write its output to the memory of an
+input that is not used after it (see Operator.inplace_inputs), the two tensors share the same buffer.
+
+Two policies are supported:
+    greedy_by_size: place the tensors from the largest to the smallest, each at the lowest offset that fits.
+    best_fit: place the tensors from the largest to the smallest, each in the smallest gap that fits.
+"""
+
+
+class TensorLifetime:
+    def __init__(self, tensor: Tensor, start: int, end: int, nbytes: int):
+        # the tensors written in place share the memory (see Operator.inplace_inputs)
+        self.tensors: List[Tensor] = [tensor]
+        self.start: int = start
+        self.end: int = end
+        self.nbytes: int = nbytes
+        self.offset: Optional[int] = None
+
+    def overlap(self, other: 'TensorLifetime') -> bool:
+        return self.start <= other.end and other.start <= self.end
+
+
+def analyze_lifetimes(flow_graph: FlowGraph, alignment: int) -> List[TensorLifetime]:
+    """
+    Get the lifetimes of the outputs of all nodes in the flow graph, in the order of their producers.
+    """
+    nodes: List[Operator] = flow_graph.nodes
+    last_use: Dict[Tensor, int] = {}
+    for idx, node in enumerate(nodes):
+        for x in node.inputs:
+            last_use[x] = idx
+    for x in flow_graph.outputs:
+        last_use[x] = len(nodes)
+    lifetimes = []
+    tensor_lifetime: Dict[Tensor, TensorLifetime] = {}
+    for idx, node in enumerate(nodes):
+        inplace_input = None
+        for i in node.inplace_inputs():
+            x = node.inputs[i]
+            if x in tensor_lifetime and last_use[x] == idx:
+                inplace_input = x
+                break
+        for y in node.outputs:
+            if inplace_input is not None:
+                # the output is written to the memory of an input that is not used after this node
+                lifetime = tensor_lifetime[inplace_input]
+                lifetime.tensors.append(y)
+                lifetime.end = last_use.get(y, idx)
+            else:
+                nbytes = (y.nbytes + alignment - 1) // alignment * alignment
+                lifetime = TensorLifetime(y, start=idx, end=last_use.get(y, idx), nbytes=nbytes)
+                lifetimes.append(lifetime)
+            tensor_lifetime[y] = lifetime
+    return lifetimes
+
+
+def assign_offsets(lifetimes: List[TensorLifetime], policy: str) -> int:
+    """
+    Assign the offset of each tensor and return the size of the arena.
+    """
+    if policy not in ['greedy_by_size', 'best_fit']:
+        raise ValueError("Unrecognized memory planning policy '{}', candidates: {}".format(policy, ['greedy_by_size', 'best_fit']))
+    arena_size = 0
+    placed: List[TensorLifetime] = []
+    for lifetime in sorted(lifetimes, key=lambda v: (-v.nbytes, v.start)):
+        # the gaps between the tensors that are alive at the same time
+        prev_end = 0
+        best_offset, best_gap = None, None
+        for other in sorted([v for v in placed if v.overlap(lifetime)], key=lambda v: v.offset):
+            gap = other.offset - prev_end
+            if gap >= lifetime.nbytes and (best_gap is None or (policy == 'best_fit' and gap < best_gap)):
+                best_offset, best_gap = prev_end, gap
+            prev_end = max(prev_end, other.offset + other.nbytes)
+        lifetime.offset = best_offset if best_offset is not None else prev_end
+        arena_size = max(arena_size, lifetime.offset + lifetime.nbytes)
+        placed.append(lifetime)
+    return arena_size
+
+
+def current_pool(device: str) -> MemoryPool:
+    if device == 'cpu':
+        return CpuMemoryPool.current()
+    elif device == 'cuda':
+        return CudaMemoryPool.current()
+    else:
+        raise ValueError("Unrecognized device '{}', candidates: {}".format(device, ['cpu', 'cuda']))
+
+
+def arena_view(arena: Storage, offset: int, nbytes: int) -> Storage:
+    # the arena is kept alive as long as any view of it is alive
+    return Storage.wrap(device=arena.device, addr=arena.addr + offset, num_bytes=nbytes, owner=arena)
+
+
+class MemoryPlan:
+    def __init__(self, flow_graph: FlowGraph, policy: str = 'greedy_by_size', alignment: int = 256):
+        flow_graph.update_nodes()
+        flow_graph.build()
+        self.flow_graph: FlowGraph = flow_graph
+        self.policy: str = policy
+        self.alignment: int = alignment
+
+        # plan the tensors of each device in its own arena
+        self.lifetimes: Dict[str, List[TensorLifetime]] = defaultdict(list)
+        for lifetime in analyze_lifetimes(flow_graph, alignment):
+            self.lifetimes[lifetime.tensors[0].device].append(lifetime)
+        self.arena_size: Dict[str, int] = {device: assign_offsets(lifetimes, policy) for device, lifetimes in self.lifetimes.items()}
+
+        # allocate the arenas and create the output tensors of each node
+        self.arenas: Dict[str, Storage] = {}
+        for device, size in self.arena_size.items():
+            pool = current_pool(device)
+            self.arenas[device] = pool.allocate(size)
+            pool.planned_peak = max(pool.planned_peak, size)
+        self.tensor_map: Dict[Tensor, Tensor] = {}
+        for device, lifetimes in self.lifetimes.items():
+            for lifetime in lifetimes:
+                storage = arena_view(self.arenas[device], lifetime.offset, lifetime.nbytes)
+                for x in lifetime.tensors:
+                    self.tensor_map[x] = Tensor(x.shape, x.dtype, x.device, storage, x.layout)
+        self.node_outputs: List[List[Tensor]] = [[self.tensor_map[y] for y in node.outputs] for node in flow_graph.nodes]
+
+    def __call__(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        return self.forward(*inputs)
+
+    def forward(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        """
+        Run the flow graph without allocating memory. The output tensors are views of the arena, thus they are
+        overwritten by the next run. Please copy them if they are needed after that.
+        """
+        graph = self.flow_graph
+        if len(inputs) != len(graph.inputs):
+            raise ValueError('FlowGraph expects {} inputs, but got {}.'.format(len(graph.inputs), len(inputs)))
+        for idx, tensor in enumerate(inputs):
+            if tensor.storage is None:
+                raise ValueError('FlowGraph expects all input tensors are non-symbolic, '
+                                 'but the input {} ({}) is a symbol tensor.'.format(idx, tensor.signature()))
+        tensor_map = self.tensor_map.copy()
+        for st, at in zip(graph.inputs, inputs):
+            tensor_map[st] = at
+        for node, node_outputs in zip(graph.nodes, self.node_outputs):
+            node_inputs = [tensor_map[x] if x.storage is None else x for x in node.inputs]
+            args = {f'input_{idx}': f'{tensor.dtype}{tensor.shape}' for idx, tensor in enumerate(node.inputs)}
+            args.update(node.attrs)
+            with tracer.profile(node.name, category='op', args=args, trace_cuda=True):
+                node.imperative_run(node_inputs, node_outputs)
+        ret = [tensor_map[st] for st in graph.outputs]
+        return ret[0] if len(ret) == 1 else ret
+
+    def peak_memory(self, device: Optional[str] = None) -> int:
+        """
+        Get the planned peak memory, which is the total size of the arenas (or the arena of given device).
+        """
+        if device is not None:
+            return self.arena_size.get(device, 0)
+        return sum(self.arena_size.values())
+
+    def status(self) -> str:
+        lines = ['Memory plan of {} nodes ({})'.format(len(self.flow_graph.nodes), self.policy)]
+        for device, lifetimes in self.lifetimes.items():
+            # the lower bound of the arena size is the maximum total size of the tensors alive at the same time
+            num_steps = len(self.flow_graph.nodes) + 1
+            lower_bound = max(sum(v.nbytes for v in lifetimes if v.start <= t <= v.end) for t in range(num_steps))
+            items = [
+                ['Tensors', sum(v.nbytes for v in lifetimes)],
+                ['Live peak', lower_bound],
+                ['Planned', self.arena_size[device]],
+            ]
+            lines.append('{:>12}: {} tensors in {} buffers'.format(device, sum(len(v.tensors) for v in lifetimes), len(lifetimes)))
+            lines.extend('{:>12}: {}'.format(name, nbytes2str(nbytes)) for name, nbytes in items)
+            lines.append(current_pool(device).status())
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.status()
+
+
+def plan_memory(flow_graph: FlowGraph, policy: str = 'greedy_by_size', alignment: int = 256) -> MemoryPlan:
+    """
+    Plan the memory of the intermediate tensors of the flow graph in a single arena per device.
+
+    Parameters
+    ----------
+    flow_graph: FlowGraph
+        The flow graph to plan.
+    policy: str
+        The policy to assign the offsets of tensors in the arena, candidates: 'greedy_by_size' and 'best_fit'.
+    alignment: int
+        The alignment of the offsets in bytes.
+
+    Returns
+    -------
+    ret: MemoryPlan
+        The memory plan with allocated arenas. It can be called with the graph inputs as FlowGraph.forward.
+    """
+    return MemoryPlan(flow_graph, policy, alignment)
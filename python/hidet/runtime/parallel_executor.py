@@ -0,0 +1,162 @@
+from typing import List, Dict, Optional, Tuple, Union
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from hidet.tos import Tensor, FlowGraph, Operator
+from hidet.utils import tracer, cpu
+
+
+"""
+Execute the operators of a flow graph on a pool of inter-operator threads. Each operator still parallelizes its own
+loops with openmp (intra-operator threads), so the cores are split into inter_op_threads x intra_op_threads.
+
+The main thread owns all the bookkeeping (the mapping from graph tensors to runtime tensors, the usage count used to
+release tensors and the dependency count of each operator), and the worker threads only run the kernels, which release
+the GIL during their execution. Ready operators are dispatched in the order of the topological sort of the graph, and
+each operator reads the same inputs as in FlowGraph.forward, so the results do not depend on the thread scheduling.
+"""
+
+
+class ParallelExecutor:
+    def __init__(self, flow_graph: FlowGraph, inter_op_threads: Optional[int] = None, intra_op_threads: Optional[int] = None):
+        flow_graph.update_nodes()
+        flow_graph.build()
+        self.flow_graph: FlowGraph = flow_graph
+        self.nodes: List[Operator] = flow_graph.nodes
+
+        # load the compiled functions before the workers use them
+        for node in self.nodes:
+            node.get_task_func()
+
+        # the dependency dag: the distinct consumers of each node and the number of distinct producers of each node
+        node_index: Dict[Operator, int] = {node: idx for idx, node in enumerate(self.nodes)}
+        self.consumers: List[List[int]] = [[] for _ in self.nodes]
+        self.num_producers: List[int] = [0 for _ in self.nodes]
+        for idx, node in enumerate(self.nodes):
+            producers = sorted(set(node_index[x.op] for x in node.inputs if x.op is not None and x.storage is None))
+            for producer in producers:
+                self.consumers[producer].append(idx)
+            self.num_producers[idx] = len(producers)
+
+        num_cores = cpu.query_num_cores()
+        if inter_op_threads is None:
+            inter_op_threads = max(1, min(self.max_width(), num_cores))
+        if intra_op_threads is None:
+            intra_op_threads = max(1, num_cores // inter_op_threads)
+        self.inter_op_threads: int = inter_op_threads
+        self.intra_op_threads: int = intra_op_threads
+
+        self.worker_ids = threading.local()
+        self.worker_lock = threading.Lock()
+        self.num_workers = 0
+        self.pool = ThreadPoolExecutor(max_workers=inter_op_threads, thread_name_prefix='hidet-inter-op', initializer=self._init_worker)
+
+    def __call__(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        return self.run(*inputs)
+
+    def __del__(self):
+        if hasattr(self, 'pool'):
+            self.pool.shutdown(wait=True)
+
+    def _init_worker(self):
+        # each worker launches the kernels with its share of the cores
+        with self.worker_lock:
+            self.worker_ids.idx = self.num_workers
+            self.num_workers += 1
+        cpu.set_omp_num_threads(self.intra_op_threads)
+
+    def max_width(self) -> int:
+        """
+        Get the maximum number of operators in the same level of the dependency dag, where the level of an operator
+        is the length of the longest path from the graph inputs to it. It is the number of inter-operator threads that
+        the graph can keep busy.
+        """
+        levels = [0 for _ in self.nodes]
+        for idx in range(len(self.nodes)):
+            for consumer in self.consumers[idx]:
+                levels[consumer] = max(levels[consumer], levels[idx] + 1)
+        width: Dict[int, int] = {}
+        for level in levels:
+            width[level] = width.get(level, 0) + 1
+        return max(width.values()) if width else 1
+
+    def _run_node(self, idx: int, node_inputs: List[Tensor]) -> Tuple[int, List[Tensor]]:
+        node = self.nodes[idx]
+        args = {f'input_{i}': f'{tensor.dtype}{tensor.shape}' for i, tensor in enumerate(node.inputs)}
+        args.update(node.attrs)
+        # tid 0 and 1 are used by the main thread and cuda events
+        with tracer.profile(node.name, category='op', args=args, tid=2 + self.worker_ids.idx):
+            node_outputs = node.imperative_run(node_inputs)
+        return idx, node_outputs
+
+    def run(self, *inputs: Tensor) -> Union[List[Tensor], Tensor]:
+        graph = self.flow_graph
+        if len(inputs) != len(graph.inputs):
+            raise ValueError('FlowGraph expects {} inputs, but got {}.'.format(len(graph.inputs), len(inputs)))
+        for idx, tensor in enumerate(inputs):
+            if tensor.storage is None:
+                raise ValueError('FlowGraph expects all input tensors are non-symbolic, '
+                                 'but the input {} ({}) is a symbol tensor.'.format(idx, tensor.signature()))
+        usage_count = graph.usage_count.copy()
+        tensor_map: Dict[Tensor, Tensor] = {}
+        for st, at in zip(graph.inputs, inputs):
+            tensor_map[st] = at
+
+        num_producers = self.num_producers.copy()
+        ready: List[int] = [idx for idx in range(len(self.nodes)) if num_producers[idx] == 0]
+        heapq.heapify(ready)
+        running: Dict[Future, int] = {}
+        while len(ready) > 0 or len(running) > 0:
+            # dispatch the ready nodes in topological order
+            while len(ready) > 0 and len(running) < self.inter_op_threads:
+                idx = heapq.heappop(ready)
+                node_inputs = []
+                for node_input in self.nodes[idx].inputs:
+                    if node_input.storage is None:
+                        # symbolic input
+                        node_inputs.append(tensor_map[node_input])
+                        usage_count[node_input] -= 1
+                        if usage_count[node_input] == 0:
+                            # the memory is freed once the node finishes
+                            del tensor_map[node_input]
+                    else:
+                        # constant input
+                        node_inputs.append(node_input)
+                running[self.pool.submit(self._run_node, idx, node_inputs)] = idx
+            # wait for any running node, and release its consumers
+            done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: running[f]):
+                del running[future]
+                idx, node_outputs = future.result()
+                for st, at in zip(self.nodes[idx].outputs, node_outputs):
+                    tensor_map[st] = at
+                for consumer in self.consumers[idx]:
+                    num_producers[consumer] -= 1
+                    if num_producers[consumer] == 0:
+                        heapq.heappush(ready, consumer)
+        ret = [tensor_map[st] for st in graph.outputs]
+        return ret[0] if len(ret) == 1 else ret
+
+
+def create_parallel_executor(flow_graph: FlowGraph, inter_op_threads: Optional[int] = None, intra_op_threads: Optional[int] = None) -> ParallelExecutor:
+    """
+    Create an executor that runs the independent operators of the flow graph concurrently.
+
+    Parameters
+    ----------
+    flow_graph: FlowGraph
+        The flow graph to execute.
+    inter_op_threads: Optional[int]
+        The number of operators that run at the same time. By default, it is the maximum number of independent
+        operators in the same level of the graph, limited by the number of cores.
+    intra_op_threads: Optional[int]
+        The number of openmp threads used by each operator. By default, the cores are evenly split among the
+        inter-operator threads.
+
+    Returns
+    -------
+    ret: ParallelExecutor
+        The executor, which can be called with the graph inputs as FlowGraph.forward.
+    """
+    return ParallelExecutor(flow_graph, inter_op_threads, intra_op_threads)
@@ -1,10 +1,16 @@
 from __future__ import annotations
-from typing import Callable, Dict, List, Type
+from typing import Callable, Dict, List, Optional, Tuple, Type, Any, ContextManager
+import os
+import bisect
 import warnings
+import threading
+from contextlib import nullcontext, contextmanager
 from collections import defaultdict
+from time import time_ns
 import ctypes
 import numpy as np
-from hidet.ffi import cuda
+from hidet.ffi import cuda, cpu
+from hidet.utils.profile_utils import tracer
 
 
 def nbytes2str(nbytes: int) -> str:
@@ -36,6 +42,10 @@ class StorageDevice:
     def free(self, addr):
         raise NotImplementedError()
 
+    def synchronize(self):
+        # wait for the pending operations (e.g., asynchronous copies and kernels) on the memory of this device
+        pass
+
     def allocated_memory(self) -> int:
         raise NotImplementedError()
 
@@ -79,6 +89,9 @@ class CudaStorageDevice(StorageDevice):
         cuda.free_async(addr)
         self._allocated_memory -= self.addr2nbytes.pop(addr)
 
+    def synchronize(self):
+        cuda.device_synchronize()
+
     def allocated_memory(self) -> int:
         return self._allocated_memory
 
@@ -93,6 +106,69 @@ class CudaStorageDevice(StorageDevice):
 
 
 class CpuStorageDevice(StorageDevice):
+    """
+    The host memory allocated by posix_memalign, which does not depend on cuda. The large allocations are mapped
+    with mmap directly, optionally backed by (transparent) huge pages to reduce the tlb misses of large weights.
+    """
+    def __init__(self, alignment: int = 64, huge_page: bool = False, mmap_threshold: int = 2 * 1024 ** 2):
+        super().__init__()
+        self.alignment: int = alignment
+        self.huge_page: bool = huge_page
+        self.mmap_threshold: int = mmap_threshold
+        self.addr2nbytes = {}
+        self.mapped = set()
+        self._allocated_memory = 0
+        self._peak_allocated_memory = 0
+
+    def name(self):
+        return 'cpu'
+
+    def allocate(self, nbytes):
+        if self.froze:
+            raise MemoryError('Should not allocate when the device is frozen.')
+
+        if nbytes >= self.mmap_threshold:
+            addr = cpu.mmap(nbytes, huge_page=self.huge_page)
+            if addr != 0:
+                self.mapped.add(addr)
+        else:
+            addr = cpu.malloc_aligned(nbytes, self.alignment)
+        if addr == 0 and nbytes != 0:
+            return 0
+        self._allocated_memory += nbytes
+        self._peak_allocated_memory = max(self._peak_allocated_memory, self._allocated_memory)
+        self.addr2nbytes[addr] = nbytes
+        return addr
+
+    def free(self, addr):
+        if self.froze:
+            raise MemoryError('Should not free when the device is frozen.')
+
+        nbytes = self.addr2nbytes.pop(addr)
+        if addr in self.mapped:
+            self.mapped.remove(addr)
+            cpu.munmap(addr, nbytes)
+        else:
+            cpu.free_aligned(addr)
+        self._allocated_memory -= nbytes
+
+    def allocated_memory(self) -> int:
+        return self._allocated_memory
+
+    def peak_allocated_memory(self) -> int:
+        return self._peak_allocated_memory
+
+    def free_memory(self) -> int:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+    def total_memory(self) -> int:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+
+class PinnedStorageDevice(StorageDevice):
+    """
+    The page-locked host memory allocated by cuda, which can be copied from and to the cuda device asynchronously.
+    """
     def __init__(self):
         super().__init__()
         self.addr2nbytes = {}
@@ -121,6 +197,9 @@ class CpuStorageDevice(StorageDevice):
         cuda.free_host(addr)
         self._allocated_memory -= self.addr2nbytes.pop(addr)
 
+    def synchronize(self):
+        cuda.device_synchronize()
+
     def allocated_memory(self) -> int:
         return self._allocated_memory
 
@@ -128,19 +207,21 @@ class CpuStorageDevice(StorageDevice):
         return self._peak_allocated_memory
 
     def free_memory(self) -> int:
-        raise NotImplementedError()
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
 
     def total_memory(self) -> int:
-        raise NotImplementedError()
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
 
 
 class Storage:
 
-    def __init__(self, device, addr, num_bytes, free_handler):
+    def __init__(self, device, addr, num_bytes, free_handler, owner=None):
         self.device: str = device
         self.addr: int = addr
         self.num_bytes: int = num_bytes
         self.free_handler: Callable[[Storage], None] = free_handler
+        # the object that owns the memory (e.g., a numpy array), which is kept alive as long as this storage
+        self.owner = owner
 
     def __del__(self):
         if self.addr != 0:
@@ -156,7 +237,8 @@ class Storage:
         if self.device == 'cpu':
             return self
         elif self.device == 'cuda':
-            host_storage = self.new('cpu', self.num_bytes)
+            # copy to the pinned staging memory, which is faster than pageable memory
+            host_storage = PinnedMemoryPool.current().allocate(nbytes=self.num_bytes)
             cuda.memcpy_async(src_addr=self.addr, dst_addr=host_storage.addr, num_bytes=self.num_bytes, kind=cuda.DeviceToHost)
             return host_storage
         else:
@@ -172,6 +254,14 @@ class Storage:
         else:
             raise NotImplementedError()
 
+    @staticmethod
+    def wrap(device: str, addr: int, num_bytes: int, owner) -> 'Storage':
+        """
+        Wrap the memory owned by another object (e.g., a numpy array or a dlpack tensor) without copying. The memory is
+        released by its owner, after this storage is freed.
+        """
+        return Storage(device, addr, num_bytes, free_handler=lambda storage: None, owner=owner)
+
     @staticmethod
     def new(device: str, num_bytes: int) -> 'Storage':
         if device == 'cpu':
@@ -202,8 +292,10 @@ class Storage:
         dtype2ctype = {
             'float32': ctypes.c_float,
             'float16': ctypes.c_uint16,
+            'bfloat16': ctypes.c_uint16,    # numpy does not support bfloat16, we expose its bits
             'int32': ctypes.c_int32,
             'int64': ctypes.c_int64,
+            'uint8': ctypes.c_uint8,
             'bool': ctypes.c_bool
         }
         dtype2nptype = {
@@ -226,7 +318,116 @@ class Storage:
         return array
 
 
+class AllocationRecord:
+    def __init__(self, pool: str, nbytes: int, allocated: int, op_name: Optional[str], start: int):
+        self.pool: str = pool
+        self.nbytes: int = nbytes
+        self.allocated: int = allocated
+        self.op_name: Optional[str] = op_name
+        # the timestamps of allocation and free in nanoseconds
+        self.start: int = start
+        self.end: Optional[int] = None
+
+    @property
+    def lifetime(self) -> Optional[int]:
+        return self.end - self.start if self.end is not None else None
+
+    def export(self) -> Dict[str, Any]:
+        return {
+            'pool': self.pool,
+            'nbytes': self.nbytes,
+            'allocated': self.allocated,
+            'op': self.op_name,
+            'start': self.start,
+            'lifetime': self.lifetime
+        }
+
+
+class AllocationTracer:
+    """
+    Record the allocations of all memory pools, including the requested size, the operator that allocates the memory
+    (see AllocationTracer.scope), and the lifetime of the storage. Usage:
+
+        allocation_tracer.turn_on()
+        ... # run the model
+        print(allocation_tracer.summary())
+        allocation_tracer.turn_on(False)
+    """
+    def __init__(self):
+        self.tracing: bool = False
+        self.records: List[AllocationRecord] = []
+        # (device, addr) -> the record of the storage that is alive
+        self.live: Dict[Tuple[str, int], AllocationRecord] = {}
+        self.scopes = threading.local()
+
+    def turn_on(self, turn_on=True):
+        self.tracing = turn_on
+
+    def clear(self):
+        self.records.clear()
+        self.live.clear()
+
+    def scope(self, op_name: str) -> ContextManager:
+        # the allocations in this scope are attributed to the given operator
+        if self.tracing:
+            return self._scope(op_name)
+        else:
+            return nullcontext()
+
+    @contextmanager
+    def _scope(self, op_name: str):
+        if not hasattr(self.scopes, 'stack'):
+            self.scopes.stack = []
+        self.scopes.stack.append(op_name)
+        try:
+            yield
+        finally:
+            self.scopes.stack.pop()
+
+    def current_scope(self) -> Optional[str]:
+        stack = getattr(self.scopes, 'stack', None)
+        return stack[-1] if stack else None
+
+    def on_allocate(self, pool: str, storage: Storage, nbytes: int):
+        record = AllocationRecord(pool, nbytes, storage.num_bytes, self.current_scope(), time_ns())
+        self.records.append(record)
+        self.live[(storage.device, storage.addr)] = record
+
+    def on_free(self, storage: Storage):
+        record = self.live.pop((storage.device, storage.addr), None)
+        if record is not None:
+            record.end = time_ns()
+
+    def export(self) -> List[Dict[str, Any]]:
+        return [record.export() for record in self.records]
+
+    def summary(self, top: int = 10) -> str:
+        """
+        Summarize the recorded allocations of each operator, sorted by the total requested bytes.
+        """
+        groups: Dict[Optional[str], List[AllocationRecord]] = defaultdict(list)
+        for record in self.records:
+            groups[record.op_name].append(record)
+        lines = ['{:>40} {:>8} {:>12} {:>12} {:>14}'.format('Operator', 'Count', 'Requested', 'Allocated', 'Lifetime (us)')]
+        for op_name, records in sorted(groups.items(), key=lambda item: -sum(r.nbytes for r in item[1]))[:top]:
+            lifetimes = [r.lifetime for r in records if r.lifetime is not None]
+            lines.append('{:>40} {:>8} {:>12} {:>12} {:>14}'.format(
+                op_name if op_name else '<none>',
+                len(records),
+                nbytes2str(sum(r.nbytes for r in records)),
+                nbytes2str(sum(r.allocated for r in records)),
+                '{:.1f}'.format(sum(lifetimes) / len(lifetimes) / 1000.0) if lifetimes else '-'
+            ))
+        return '\n'.join(lines)
+
+
+allocation_tracer = AllocationTracer()
+
+
 class MemoryPool:
+    """
+    A memory pool that reuses a freed block only for the requests with exactly the same size (rounded up to block_size).
+    """
     def __init__(self, storage_device: StorageDevice, block_size: int, max_reserve_size: int):
         self.storage_device = storage_device
         self.block_size: int = block_size
@@ -235,18 +436,62 @@ class MemoryPool:
         self.reserved_size: int = 0
         self.active_blocks = 0
         self.memory_blocks: Dict[int, List[Storage]] = defaultdict(list)
+        # the largest arena planned by hidet.runtime.memory_planner on this pool
+        self.planned_peak: int = 0
+        # the pool may be used by the worker threads of a parallel executor
+        self.lock = threading.RLock()
+
+        # telemetry: the requests served from the cached memory (hits) and from the device (misses), the clears
+        # triggered by out of memory and by exceeding max_reserve_size, and the requested bytes of active storages
+        self.num_hits: int = 0
+        self.num_misses: int = 0
+        self.num_oom_clears: int = 0
+        self.num_reserve_clears: int = 0
+        self.requested: Dict[int, int] = {}
+        self.requested_size: int = 0
 
     def allocate(self, nbytes: int) -> Storage:
+        with self.lock:
+            storage = self._allocate(nbytes)
+            self.requested[storage.addr] = nbytes
+            self.requested_size += nbytes
+            if allocation_tracer.tracing:
+                allocation_tracer.on_allocate(type(self).__name__, storage, nbytes)
+            if tracer.tracing:
+                self.trace_counters()
+            return storage
+
+    def free(self, storage: Storage):
+        with self.lock:
+            self.requested_size -= self.requested.pop(storage.addr, 0)
+            if allocation_tracer.tracing:
+                allocation_tracer.on_free(storage)
+            self._free(storage)
+            if tracer.tracing:
+                self.trace_counters()
+
+    def trace_counters(self):
+        # the memory usage of this pool as a counter track in the chrome trace
+        allocated = self.storage_device.allocated_memory()
+        tracer.counter('{} (MiB)'.format(type(self).__name__), {
+            'active': (allocated - self.reserved_size) / 1024 ** 2,
+            'reserved': self.reserved_size / 1024 ** 2
+        })
+
+    def _allocate(self, nbytes: int) -> Storage:
         allocated = (nbytes + self.block_size - 1) // self.block_size * self.block_size
         block_list = self.memory_blocks[allocated]
         if len(block_list) > 0:
+            self.num_hits += 1
             storage = block_list.pop()
             addr = storage.addr
             self.reserved_size -= storage.num_bytes
         else:
+            self.num_misses += 1
             addr = self.storage_device.allocate(allocated)
             if addr == 0 and allocated != 0:
                 # out of memory
+                self.num_oom_clears += 1
                 self.clear()
                 addr = self.storage_device.allocate(allocated)
                 if addr == 0:
@@ -264,23 +509,42 @@ class MemoryPool:
             free_handler=self.free
         )
 
-    def free(self, storage: Storage):
+    def _free(self, storage: Storage):
         self.memory_blocks[storage.num_bytes].append(storage)
         self.reserved_size += storage.num_bytes
         if self.reserved_size > self.max_reserve_size:
+            self.num_reserve_clears += 1
             self.clear()
 
+    def largest_free_block(self) -> int:
+        return max([size for size, block_list in self.memory_blocks.items() if len(block_list) > 0], default=0)
+
+    def hit_rate(self) -> float:
+        num_requests = self.num_hits + self.num_misses
+        return self.num_hits / num_requests if num_requests > 0 else 0.0
+
+    def fragmentation(self) -> Tuple[float, float]:
+        """
+        Get the internal fragmentation (the ratio of active memory wasted by rounding up the requests) and the external
+        fragmentation (the ratio of reserved memory that can not serve a request as large as the whole reserved memory).
+        """
+        active = self.storage_device.allocated_memory() - self.reserved_size
+        internal = 1.0 - self.requested_size / active if active > 0 else 0.0
+        external = 1.0 - self.largest_free_block() / self.reserved_size if self.reserved_size > 0 else 0.0
+        return internal, external
+
     def clear(self):
-        cuda.device_synchronize()
-        for block_list in self.memory_blocks.values():
-            for storage in block_list:
-                self.storage_device.free(storage.addr)
-                storage.addr = 0
-        # print('Cleared memory pool, returned {} memory back to {} device'.format(
-        #     nbytes2str(self.reserved_size), self.storage_device.name()
-        # ))
-        self.memory_blocks.clear()
-        self.reserved_size = 0
+        with self.lock:
+            self.storage_device.synchronize()
+            for block_list in self.memory_blocks.values():
+                for storage in block_list:
+                    self.storage_device.free(storage.addr)
+                    storage.addr = 0
+            # print('Cleared memory pool, returned {} memory back to {} device'.format(
+            #     nbytes2str(self.reserved_size), self.storage_device.name()
+            # ))
+            self.memory_blocks.clear()
+            self.reserved_size = 0
 
     def status(self) -> str:
         allocated = self.storage_device.allocated_memory()
@@ -289,11 +553,16 @@ class MemoryPool:
             ['Allocated', allocated],
             ['Peak', peak_allocated],
             ['Reserved', self.reserved_size],
-            ['Active', allocated - self.reserved_size]
+            ['Active', allocated - self.reserved_size],
+            ['Planned', self.planned_peak]
         ]
+        internal, external = self.fragmentation()
         lines = [
             'Status of {} memory pool'.format(self.storage_device.name()),
-            *['{:>12}: {}'.format(name, nbytes2str(nbytes)) for name, nbytes in items]
+            *['{:>12}: {}'.format(name, nbytes2str(nbytes)) for name, nbytes in items],
+            '{:>12}: {:.1f}% of {} requests'.format('Hit rate', self.hit_rate() * 100, self.num_hits + self.num_misses),
+            '{:>12}: {:.1f}% internal, {:.1f}% external'.format('Fragment', internal * 100, external * 100),
+            '{:>12}: {} on out of memory, {} on exceeding reserve'.format('Clears', self.num_oom_clears, self.num_reserve_clears)
         ]
         return '\n'.join(lines)
 
@@ -304,10 +573,195 @@ class MemoryPool:
         self.clear()
 
 
-class CudaMemoryPool(MemoryPool):
+class MemoryBlock:
+    def __init__(self, addr: int, size: int, stream: int, small: bool, prev: Optional[MemoryBlock] = None, next: Optional[MemoryBlock] = None):
+        self.addr: int = addr
+        self.size: int = size
+        self.stream: int = stream
+        self.small: bool = small
+        # the adjacent blocks in the same segment
+        self.prev: Optional[MemoryBlock] = prev
+        self.next: Optional[MemoryBlock] = next
+        self.allocated: bool = False
+
+    def is_segment(self) -> bool:
+        # the block spans the whole segment allocated from the device
+        return self.prev is None and self.next is None
+
+
+class CachingMemoryPool(MemoryPool):
+    """
+    A caching allocator that serves the requests of different sizes from large segments of the device memory.
+
+    The requests are rounded up to block_size. The small requests (<= 1 MiB) are served from 2 MiB segments, and the
+    large ones from 20 MiB segments (or a segment of its own rounded up to 2 MiB, if it exceeds 10 MiB). Each request
+    takes the smallest cached free block that fits (best fit), which is split when the remaining part is large enough
+    to be reused. A freed block is coalesced with the adjacent free blocks in its segment. The free blocks are kept in
+    separate lists for small and large blocks and for each cuda stream, so that a block freed by a stream is only
+    reused by the same stream without synchronization. The free segments are returned to the device when the cached
+    memory exceeds max_reserve_size or the device is out of memory.
+    """
+    small_size = 1024 ** 2
+    small_segment_size = 2 * 1024 ** 2
+    large_segment_size = 20 * 1024 ** 2
+    huge_size = 10 * 1024 ** 2
+    segment_granularity = 2 * 1024 ** 2
+    min_large_split = 1024 ** 2
+
+    def __init__(self, storage_device: StorageDevice, block_size: int = 512, max_reserve_size: int = 4 * 1024 ** 3):
+        super().__init__(storage_device, block_size, max_reserve_size)
+        # (stream, small) -> the sorted (size, addr) of free blocks
+        self.free_lists: Dict[Tuple[int, bool], List[Tuple[int, int]]] = defaultdict(list)
+        self.free_blocks: Dict[int, MemoryBlock] = {}
+        self.allocated_blocks: Dict[int, MemoryBlock] = {}
+        # the stream that all the blocks are associated with regardless of the current stream, see pin_stream
+        self.pinned_stream: Optional[int] = None
+
+    def pin_stream(self, stream: Optional[int] = 0):
+        """
+        Associate all the blocks allocated and freed later with the given stream, instead of the current stream.
+
+        CudaGraph pins its pool to the default stream, where the warm-up runs cache all the blocks needed by the
+        capture on the capture stream. None restores the per-stream free lists.
+
+        Parameters
+        ----------
+        stream: Optional[int]
+            The handle of the stream to pin to, or None to unpin.
+        """
+        self.pinned_stream = stream
+
+    def current_stream(self) -> int:
+        if self.pinned_stream is not None:
+            return self.pinned_stream
+        if self.storage_device.name() != 'cuda':
+            return 0
+        from hidet.runtime.cuda_stream import CudaStream
+        return CudaStream.stack[-1].handle if len(CudaStream.stack) > 0 else 0
+
+    def _allocate(self, nbytes: int) -> Storage:
+        size = max((nbytes + self.block_size - 1) // self.block_size * self.block_size, self.block_size)
+        small = size <= self.small_size
+        stream = self.current_stream()
+        block = self._find_free_block(size, stream, small)
+        if block is None:
+            self.num_misses += 1
+            block = self._allocate_segment(size, stream, small)
+        else:
+            self.num_hits += 1
+        block = self._split_block(block, size)
+        block.allocated = True
+        self.allocated_blocks[block.addr] = block
+        return Storage(
+            device=self.storage_device.name(),
+            addr=block.addr,
+            num_bytes=block.size,
+            free_handler=self.free
+        )
+
+    def _find_free_block(self, size: int, stream: int, small: bool) -> Optional[MemoryBlock]:
+        free_list = self.free_lists[(stream, small)]
+        idx = bisect.bisect_left(free_list, (size, 0))
+        if idx == len(free_list):
+            return None
+        _, addr = free_list.pop(idx)
+        block = self.free_blocks.pop(addr)
+        self.reserved_size -= block.size
+        return block
+
+    def _insert_free_block(self, block: MemoryBlock):
+        bisect.insort(self.free_lists[(block.stream, block.small)], (block.size, block.addr))
+        self.free_blocks[block.addr] = block
+        self.reserved_size += block.size
+
+    def _remove_free_block(self, block: MemoryBlock):
+        free_list = self.free_lists[(block.stream, block.small)]
+        del free_list[bisect.bisect_left(free_list, (block.size, block.addr))]
+        del self.free_blocks[block.addr]
+        self.reserved_size -= block.size
+
+    def _allocate_segment(self, size: int, stream: int, small: bool) -> MemoryBlock:
+        if small:
+            segment_size = self.small_segment_size
+        elif size < self.huge_size:
+            segment_size = self.large_segment_size
+        else:
+            segment_size = (size + self.segment_granularity - 1) // self.segment_granularity * self.segment_granularity
+        addr = self.storage_device.allocate(segment_size)
+        if addr == 0:
+            # out of memory, return the cached segments to the device and try again
+            self.num_oom_clears += 1
+            self.release_free_segments()
+            addr = self.storage_device.allocate(segment_size)
+            if addr == 0:
+                raise MemoryError('Can not allocate memory from {} device, total {}, hidet allocated {}, free {}, requesting {}.'.format(
+                    self.storage_device.name(),
+                    nbytes2str(self.storage_device.total_memory()),
+                    nbytes2str(self.storage_device.allocated_memory()),
+                    nbytes2str(self.storage_device.free_memory()),
+                    nbytes2str(segment_size)
+                ))
+        return MemoryBlock(addr, segment_size, stream, small)
+
+    def _split_block(self, block: MemoryBlock, size: int) -> MemoryBlock:
+        remaining = block.size - size
+        if remaining >= (self.block_size if block.small else self.min_large_split):
+            rest = MemoryBlock(block.addr + size, remaining, block.stream, block.small, prev=block, next=block.next)
+            if block.next is not None:
+                block.next.prev = rest
+            block.next = rest
+            block.size = size
+            self._insert_free_block(rest)
+        return block
+
+    def _free(self, storage: Storage):
+        block = self.allocated_blocks.pop(storage.addr)
+        block.allocated = False
+        # coalesce with the adjacent free blocks
+        for adjacent in [block.prev, block.next]:
+            if adjacent is not None and not adjacent.allocated:
+                self._remove_free_block(adjacent)
+                if adjacent is block.prev:
+                    adjacent.size += block.size
+                    adjacent.next = block.next
+                    if block.next is not None:
+                        block.next.prev = adjacent
+                    block = adjacent
+                else:
+                    block.size += adjacent.size
+                    block.next = adjacent.next
+                    if adjacent.next is not None:
+                        adjacent.next.prev = block
+        self._insert_free_block(block)
+        if self.reserved_size > self.max_reserve_size and self.release_free_segments() > 0:
+            self.num_reserve_clears += 1
+
+    def largest_free_block(self) -> int:
+        return max([free_list[-1][0] for free_list in self.free_lists.values() if len(free_list) > 0], default=0)
+
+    def release_free_segments(self) -> int:
+        """
+        Return the segments that are not used by any tensor to the device, and get the number of released segments.
+        The cuda memory is freed in stream order (and the host memory is freed synchronously), thus there is no need to
+        synchronize the device.
+        """
+        with self.lock:
+            segments = [block for block in self.free_blocks.values() if block.is_segment()]
+            for block in segments:
+                self._remove_free_block(block)
+                self.storage_device.free(block.addr)
+            return len(segments)
+
+    def clear(self):
+        with self.lock:
+            self.storage_device.synchronize()
+            self.release_free_segments()
+
+
+class CudaMemoryPool(CachingMemoryPool):
     stack = []
 
-    def __init__(self, block_size: int = 4096, max_reserve_size: int = 4 * 1024 ** 3):
+    def __init__(self, block_size: int = 512, max_reserve_size: int = 4 * 1024 ** 3):
         super().__init__(CudaStorageDevice(), block_size, max_reserve_size)
 
     def __enter__(self):
@@ -324,11 +778,20 @@ class CudaMemoryPool(MemoryPool):
 CudaMemoryPool.stack.append(CudaMemoryPool())
 
 
-class CpuMemoryPool(MemoryPool):
+def default_cpu_storage_device() -> StorageDevice:
+    # use the pinned memory when there is a cuda device, so that the cpu tensors can be copied to the device
+    # asynchronously; otherwise, avoid the dependency on cuda runtime
+    if cuda.device_count() > 0:
+        return PinnedStorageDevice()
+    else:
+        return CpuStorageDevice()
+
+
+class CpuMemoryPool(CachingMemoryPool):
     stack = []
 
-    def __init__(self, block_size: int = 4096, max_reserve_size: int = 128 * 1024 ** 2):
-        super().__init__(CpuStorageDevice(), block_size, max_reserve_size)
+    def __init__(self, block_size: int = 512, max_reserve_size: int = 128 * 1024 ** 2, storage_device: Optional[StorageDevice] = None):
+        super().__init__(storage_device if storage_device else default_cpu_storage_device(), block_size, max_reserve_size)
 
     def __enter__(self):
         CpuMemoryPool.stack.append(self)
@@ -343,6 +806,29 @@ class CpuMemoryPool(MemoryPool):
 
 CpuMemoryPool.stack.append(CpuMemoryPool())
 
+
+class PinnedMemoryPool(CachingMemoryPool):
+    """
+    The pool of pinned host memory, used as the staging memory of the transfers between cpu and cuda device.
+    """
+    stack = []
+
+    def __init__(self, block_size: int = 512, max_reserve_size: int = 128 * 1024 ** 2):
+        super().__init__(PinnedStorageDevice(), block_size, max_reserve_size)
+
+    def __enter__(self):
+        PinnedMemoryPool.stack.append(self)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        PinnedMemoryPool.stack.pop()
+
+    @staticmethod
+    def current() -> PinnedMemoryPool:
+        return PinnedMemoryPool.stack[-1]
+
+
+PinnedMemoryPool.stack.append(PinnedMemoryPool())
+
 # cpu_pool = MemoryPool(
 #     storage_device=CpuStorageDevice(),
 #     block_size=4 * 1024,  # 4 KiB
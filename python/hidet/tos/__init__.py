@@ -13,7 +13,8 @@ from .ir import FlowGraph
 from .transforms import GraphPass, PassContext
 
 from .tensor import array, randn, empty, zeros, ones, symbol, randn_like, empty_like, zeros_like, ones_like, symbol_like
-from .tensor import full, full_like
+from .tensor import full, full_like, from_numpy
+from .dlpack import from_dlpack
 from .operator import space_level, get_space_level
 from .ir import trace_from, load_graph, save_graph
 from .transforms import optimize
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from typing import Dict, Tuple, Any
+import ctypes
+from ctypes import c_void_p, c_char_p, c_int, c_int32, c_int64, c_uint8, c_uint16, c_uint64, POINTER, Structure
+
+from hidet.ir.layout.data_layout import RowMajorLayout
+from hidet.runtime.storage import Storage
+from hidet.utils import prod
+
+
+"""
+Exchange tensors with other frameworks (e.g., numpy, pytorch and onnxruntime) through dlpack without copying.
+Please refer to https://github.com/dmlc/dlpack/blob/main/include/dlpack/dlpack.h for the data structures.
+"""
+
+
+class DLDevice(Structure):
+    _fields_ = [('device_type', c_int32),
+                ('device_id', c_int32)]
+
+
+class DLDataType(Structure):
+    _fields_ = [('code', c_uint8),
+                ('bits', c_uint8),
+                ('lanes', c_uint16)]
+
+
+class DLTensor(Structure):
+    _fields_ = [('data', c_void_p),
+                ('device', DLDevice),
+                ('ndim', c_int32),
+                ('dtype', DLDataType),
+                ('shape', POINTER(c_int64)),
+                ('strides', POINTER(c_int64)),
+                ('byte_offset', c_uint64)]
+
+
+class DLManagedTensor(Structure):
+    pass
+
+
+DLManagedTensorDeleter = ctypes.CFUNCTYPE(None, POINTER(DLManagedTensor))
+DLManagedTensor._fields_ = [('dl_tensor', DLTensor),
+                            ('manager_ctx', c_void_p),
+                            ('deleter', DLManagedTensorDeleter)]
+
+kDLCPU = 1
+kDLCUDA = 2
+kDLCUDAHost = 3
+
+# dtype: (type code, bits)
+dtype2dlpack: Dict[str, Tuple[int, int]] = {
+    'float32': (2, 32),
+    'float16': (2, 16),
+    'bfloat16': (4, 16),
+    'int32': (0, 32),
+    'int64': (0, 64),
+    'uint8': (1, 8),
+    'bool': (6, 8),
+}
+dlpack2dtype: Dict[Tuple[int, int], str] = {v: k for k, v in dtype2dlpack.items()}
+
+# the capsule functions of python c api, the variants taking raw pointers are used in the capsule destructor
+PyCapsule_Destructor = ctypes.CFUNCTYPE(None, c_void_p)
+_capsule_new = ctypes.PYFUNCTYPE(ctypes.py_object, c_void_p, c_char_p, PyCapsule_Destructor)(('PyCapsule_New', ctypes.pythonapi))
+_capsule_is_valid = ctypes.PYFUNCTYPE(c_int, ctypes.py_object, c_char_p)(('PyCapsule_IsValid', ctypes.pythonapi))
+_capsule_get_pointer = ctypes.PYFUNCTYPE(c_void_p, ctypes.py_object, c_char_p)(('PyCapsule_GetPointer', ctypes.pythonapi))
+_capsule_set_name = ctypes.PYFUNCTYPE(c_int, ctypes.py_object, c_char_p)(('PyCapsule_SetName', ctypes.pythonapi))
+_raw_capsule_is_valid = ctypes.PYFUNCTYPE(c_int, c_void_p, c_char_p)(('PyCapsule_IsValid', ctypes.pythonapi))
+_raw_capsule_get_pointer = ctypes.PYFUNCTYPE(c_void_p, c_void_p, c_char_p)(('PyCapsule_GetPointer', ctypes.pythonapi))
+
+# the exported managed tensors and the python objects they reference, indexed by the address of managed tensor
+_exported: Dict[int, Any] = {}
+
+
+@DLManagedTensorDeleter
+def _managed_tensor_deleter(managed_ptr):
+    # called by the consumer when it does not need the tensor anymore
+    _exported.pop(ctypes.addressof(managed_ptr.contents), None)
+
+
+@PyCapsule_Destructor
+def _capsule_destructor(capsule_ptr):
+    # the capsule is released without being consumed
+    if _raw_capsule_is_valid(capsule_ptr, b'dltensor'):
+        managed_ptr = _raw_capsule_get_pointer(capsule_ptr, b'dltensor')
+        _exported.pop(managed_ptr, None)
+
+
+def to_dlpack(tensor) -> Any:
+    """
+    Export a tensor as a dlpack capsule, which shares the memory of the tensor.
+
+    Parameters
+    ----------
+    tensor: Tensor
+        The tensor to export. It must have storage and be in row major layout.
+
+    Returns
+    -------
+    ret: PyCapsule
+        The dlpack capsule with name 'dltensor'.
+    """
+    from hidet.ffi import cuda
+    if tensor.storage is None:
+        raise ValueError('Can not export a symbol tensor to dlpack.')
+    if not isinstance(tensor.layout, RowMajorLayout):
+        raise ValueError('Can only export a tensor in row major layout to dlpack, please use .contiguous() first.')
+    if tensor.dtype not in dtype2dlpack:
+        raise ValueError('Can not export a tensor with data type {} to dlpack.'.format(tensor.dtype))
+    if tensor.device == 'cuda':
+        # the consumer may use the tensor in another stream
+        cuda.device_synchronize()
+    ndim = len(tensor.shape)
+    shape = (c_int64 * max(ndim, 1))(*tensor.shape)
+    managed = DLManagedTensor()
+    managed.dl_tensor.data = tensor.storage.addr
+    managed.dl_tensor.device = DLDevice(kDLCPU if tensor.device == 'cpu' else kDLCUDA, 0)
+    managed.dl_tensor.ndim = ndim
+    managed.dl_tensor.dtype = DLDataType(*dtype2dlpack[tensor.dtype], 1)
+    managed.dl_tensor.shape = ctypes.cast(shape, POINTER(c_int64))
+    managed.dl_tensor.strides = None     # row major
+    managed.dl_tensor.byte_offset = 0
+    managed.manager_ctx = None
+    managed.deleter = _managed_tensor_deleter
+    # keep the tensor alive until the consumer calls the deleter, or the capsule is released without being consumed
+    _exported[ctypes.addressof(managed)] = (tensor, shape, managed)
+    return _capsule_new(ctypes.addressof(managed), b'dltensor', _capsule_destructor)
+
+
+class DLPackOwner:
+    """
+    The owner of the memory of an imported dlpack tensor, which calls the deleter of the managed tensor when it is
+    released.
+    """
+    def __init__(self, managed_ptr: int, capsule: Any):
+        self.managed_ptr = managed_ptr
+        self.capsule = capsule
+
+    def __del__(self):
+        managed = DLManagedTensor.from_address(self.managed_ptr)
+        if managed.deleter:
+            managed.deleter(ctypes.pointer(managed))
+
+
+def from_dlpack(obj: Any):
+    """
+    Create a tensor that shares the memory of an object supporting dlpack (with __dlpack__ method, e.g., pytorch
+    tensors and numpy arrays) or a dlpack capsule. The memory is released by its producer after the tensor is freed.
+
+    Parameters
+    ----------
+    obj: Any
+        The object with __dlpack__ method or a dlpack capsule.
+
+    Returns
+    -------
+    ret: Tensor
+        The tensor sharing the same memory.
+    """
+    from hidet.tos.tensor import Tensor
+    capsule = obj.__dlpack__() if hasattr(obj, '__dlpack__') else obj
+    if not _capsule_is_valid(capsule, b'dltensor'):
+        raise ValueError('Expect a dlpack capsule that has not been consumed, got {}.'.format(type(obj)))
+    managed_ptr = _capsule_get_pointer(capsule, b'dltensor')
+    # mark the capsule as consumed, we take the ownership of the managed tensor
+    _capsule_set_name(capsule, b'used_dltensor')
+    owner = DLPackOwner(managed_ptr, capsule)
+    dl_tensor = DLManagedTensor.from_address(managed_ptr).dl_tensor
+
+    device_type = dl_tensor.device.device_type
+    if device_type in [kDLCPU, kDLCUDAHost]:
+        device = 'cpu'
+    elif device_type == kDLCUDA:
+        device = 'cuda'
+    else:
+        raise ValueError('Can not import a dlpack tensor on device type {}.'.format(device_type))
+    key = (dl_tensor.dtype.code, dl_tensor.dtype.bits)
+    if key not in dlpack2dtype or dl_tensor.dtype.lanes != 1:
+        raise ValueError('Can not import a dlpack tensor with data type (code={}, bits={}, lanes={}).'.format(
+            dl_tensor.dtype.code, dl_tensor.dtype.bits, dl_tensor.dtype.lanes))
+    dtype = dlpack2dtype[key]
+    shape = [int(dl_tensor.shape[i]) for i in range(dl_tensor.ndim)]
+    if dl_tensor.strides:
+        strides = [int(dl_tensor.strides[i]) for i in range(dl_tensor.ndim)]
+        expected = [prod(shape[i + 1:]) for i in range(len(shape))]
+        if any(a != b for a, b, extent in zip(strides, expected, shape) if extent > 1):
+            raise ValueError('Can only import a contiguous dlpack tensor, got shape {} and strides {}.'.format(shape, strides))
+    addr = dl_tensor.data + dl_tensor.byte_offset
+    nbytes = prod(shape) * dl_tensor.dtype.bits // 8
+    storage = Storage.wrap(device, addr, nbytes, owner=owner)
+    return Tensor(shape, dtype, device, storage)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 from typing import List, Union, Dict, Set, Optional, Tuple
-import os
 import pickle
 import warnings
 from collections import defaultdict
@@ -112,47 +111,69 @@ class FlowGraph:
                                  'but the input {} ({}) is a symbol tensor.'.format(idx, tensor.signature()))
         usage_count = self.usage_count.copy()
         tensor_map: Dict[Tensor, Tensor] = {}
+        # the number of live tensors that reference each storage (e.g., the views created by squeeze), the storage of
+        # graph inputs and constants are pinned by an extra reference, thus never written in place
+        storage_refs: Dict[int, int] = defaultdict(int)
+        pinned: Set[int] = set()
         for st, at in zip(self.inputs, inputs):
             tensor_map[st] = at
+            storage_refs[id(at.storage)] += 1
+            pinned.add(id(at.storage))
         for node in self.nodes:
             # prepare node inputs
             node_inputs = []
-            for node_input in node.inputs:
+            dead_inputs = []
+            for idx, node_input in enumerate(node.inputs):
                 if node_input.storage is None:
                     # symbolic input
-                    node_inputs.append(tensor_map[node_input])
+                    actual = tensor_map[node_input]
+                    node_inputs.append(actual)
                     usage_count[node_input] -= 1
                     if usage_count[node_input] == 0:
                         # free the memory
                         del tensor_map[node_input]
+                        key = id(actual.storage)
+                        if node_input.op is not None and storage_refs[key] == 1 and key not in pinned:
+                            # the dead tensor owns its storage outright
+                            dead_inputs.append(idx)
+                        storage_refs[key] -= 1
+                        if storage_refs[key] == 0:
+                            del storage_refs[key]
                 else:
                     # constant input
                     node_inputs.append(node_input)
+                    pinned.add(id(node_input.storage))
+            # write the output to the storage of an intermediate input that is not used after this node
+            outputs = None
+            for idx in node.inplace_inputs():
+                if idx in dead_inputs:
+                    y = node.outputs[0]
+                    outputs = [Tensor(y.shape, y.dtype, y.device, node_inputs[idx].storage, y.layout)]
+                    break
             # run node
             args = {f'input_{idx}': f'{tensor.dtype}{tensor.shape}' for idx, tensor in enumerate(node.inputs)}
             args.update(node.attrs)
             with tracer.profile(node.name, category='op', args=args, trace_cuda=True):
-                node_outputs = node.imperative_run(node_inputs)
+                node_outputs = node.imperative_run(node_inputs, outputs)
             for st, at in zip(node.outputs, node_outputs):
                 tensor_map[st] = at
+                storage_refs[id(at.storage)] += 1
         ret = [tensor_map[st] for st in self.outputs]
         return ret[0] if len(ret) == 1 else ret
 
     def save(self, fname: str):
-        # before save, clear the packed func cache because ctypes object can not be pickled
-        for node in self.nodes:
-            node.task_func = None
-        self.usage_count, self.nodes = None, None
-
-        dirname = os.path.dirname(fname)
-        os.makedirs(dirname, exist_ok=True)
-        # save to a temporary file first, in case pickle fails.
-        with open(fname + '.temp', 'wb') as f:
-            pickle.dump(self, f)
-        os.rename(fname + '.temp', fname)
+        """
+        Save the flow graph in the binary format, see hidet.tos.ir.serialization.
+        """
+        from hidet.tos.ir.serialization import save_flow_graph
+        save_flow_graph(self, fname)
 
     @staticmethod
     def load(fname: str) -> FlowGraph:
+        from hidet.tos.ir.serialization import is_flow_graph_file, load_flow_graph
+        if is_flow_graph_file(fname):
+            return load_flow_graph(fname)
+        # the graphs saved by pickle before the binary format
         with open(fname, 'rb') as f:
             ret = pickle.load(f)
         if not isinstance(ret, FlowGraph):
@@ -178,6 +199,18 @@ class FlowGraph:
         from hidet.runtime.cuda_graph import create_cuda_graph
         return create_cuda_graph(self)
 
+    def parallel_executor(self, inter_op_threads: Optional[int] = None, intra_op_threads: Optional[int] = None):
+        from hidet.runtime.parallel_executor import create_parallel_executor
+        return create_parallel_executor(self, inter_op_threads, intra_op_threads)
+
+    def plan_memory(self, policy: str = 'greedy_by_size', alignment: int = 256):
+        from hidet.runtime.memory_planner import plan_memory
+        return plan_memory(self, policy, alignment)
+
+    def execution_plan(self, policy: str = 'greedy_by_size'):
+        from hidet.runtime.execution_plan import create_execution_plan
+        return create_execution_plan(self, policy)
+
     @staticmethod
     def _analyze(outputs: List[Tensor]) -> Tuple[List[Tensor], List[Operator], Dict[Tensor, int]]:
         inputs = []
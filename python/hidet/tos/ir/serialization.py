@@ -0,0 +1,207 @@
+from __future__ import annotations
+from typing import List, Dict, Any, Union, Optional
+import os
+import json
+import struct
+import pickle
+import importlib
+import numpy as np
+
+from hidet.ir.layout.data_layout import RowMajorLayout
+from hidet.runtime.storage import Storage
+from hidet.tos.tensor import Tensor
+from hidet.tos.operator import Operator
+
+
+"""
+The binary format of flow graph files (FlowGraph.save and FlowGraph.load):
+
+    magic (8 bytes) | version (uint32) | reserved (uint32) | header size (uint64) | header | padding | blob
+
+The header is a json document with a flat tensor table and operator table:
+    tensors: [{shape, dtype, device, layout, data}], where data is the (offset, nbytes) of the constant in the blob,
+    inputs, outputs: the tensor ids of graph inputs and outputs,
+    ops: [{class, name, attrs, inputs, outputs, task}], in topological order, where task is the (offset, nbytes) of the
+         pickled task in the blob.
+The blob starts at a page boundary and each item in it is aligned to 64 bytes, so that the constants are mapped with
+np.memmap and only read from disk when used. The task (compute definition) of an operator is only unpickled when it is
+used for the first time (see Operator.task). The attributes that are not json values (and non-row-major layouts) are
+pickled into the blob as well.
+"""
+
+MAGIC = b'HIDETFG\0'
+VERSION = 1
+PAGE_SIZE = 4096
+ALIGNMENT = 64
+
+# the attributes of the Operator class, others (set by the subclasses) are saved as extra attributes
+operator_fields = ['inputs', '_task', '_task_loader', 'attrs', 'outputs', 'name', 'task_func', '_inplace_inputs']
+
+
+class BlobWriter:
+    def __init__(self):
+        self.items: List[Union[bytes, Tensor]] = []
+        self.offsets: List[int] = []
+        self.size: int = 0
+
+    def add(self, item: Union[bytes, Tensor]) -> List[int]:
+        nbytes = len(item) if isinstance(item, bytes) else item.nbytes
+        offset = (self.size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        self.items.append(item)
+        self.offsets.append(offset)
+        self.size = offset + nbytes
+        return [offset, nbytes]
+
+    def write(self, f, blob_start: int):
+        for item, offset in zip(self.items, self.offsets):
+            f.seek(blob_start + offset)
+            if isinstance(item, Tensor):
+                # write the constants one by one, instead of copying all of them to host memory first
+                item = item.cpu().storage.as_array(num_elements=item.nbytes, dtype='uint8')
+            f.write(item)
+
+
+def encode_value(value: Any, blob: BlobWriter) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    elif isinstance(value, list):
+        return [encode_value(v, blob) for v in value]
+    elif isinstance(value, tuple):
+        return {'tuple': [encode_value(v, blob) for v in value]}
+    else:
+        return {'pickle': blob.add(pickle.dumps(value))}
+
+
+def decode_value(value: Any, blob: np.ndarray) -> Any:
+    if isinstance(value, list):
+        return [decode_value(v, blob) for v in value]
+    elif isinstance(value, dict):
+        if 'tuple' in value:
+            return tuple(decode_value(v, blob) for v in value['tuple'])
+        offset, nbytes = value['pickle']
+        return pickle.loads(blob[offset:offset + nbytes].tobytes())
+    else:
+        return value
+
+
+def save_flow_graph(graph, fname: str):
+    """
+    Save the flow graph in the binary format. The graph is not modified.
+    """
+    if any(v is None for v in [graph.inputs, graph.nodes, graph.usage_count]):
+        graph.update_nodes()
+    blob = BlobWriter()
+    tensor_ids: Dict[Tensor, int] = {}
+    tensors: List[Dict[str, Any]] = []
+
+    def tensor_id(x: Tensor) -> int:
+        if x not in tensor_ids:
+            tensor_ids[x] = len(tensors)
+            tensors.append({
+                'shape': x.shape,
+                'dtype': x.dtype,
+                'device': x.device,
+                'layout': None if isinstance(x.layout, RowMajorLayout) else encode_value(x.layout, blob),
+                'data': blob.add(x) if x.storage is not None else None
+            })
+        return tensor_ids[x]
+
+    inputs = [tensor_id(x) for x in graph.inputs]
+    ops = []
+    for op in graph.nodes:
+        ops.append({
+            'class': '{}.{}'.format(type(op).__module__, type(op).__qualname__),
+            'name': op.name,
+            'attrs': {name: encode_value(value, blob) for name, value in op.attrs.items()},
+            'extra': {name: encode_value(value, blob) for name, value in op.__dict__.items() if name not in operator_fields},
+            'inputs': [tensor_id(x) for x in op.inputs],
+            'outputs': [tensor_id(y) for y in op.outputs],
+            'task': blob.add(pickle.dumps(op.task))
+        })
+    outputs = [tensor_id(y) for y in graph.outputs]
+    header = json.dumps({
+        'tensors': tensors,
+        'inputs': inputs,
+        'outputs': outputs,
+        'ops': ops
+    }).encode('utf-8')
+    prefix = MAGIC + struct.pack('<IIQ', VERSION, 0, len(header))
+    blob_start = (len(prefix) + len(header) + PAGE_SIZE - 1) // PAGE_SIZE * PAGE_SIZE
+
+    dirname = os.path.dirname(fname)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    # save to a temporary file first, in case of failure
+    with open(fname + '.temp', 'wb') as f:
+        f.write(prefix)
+        f.write(header)
+        blob.write(f, blob_start)
+        f.truncate(blob_start + blob.size)
+    os.rename(fname + '.temp', fname)
+
+
+def is_flow_graph_file(fname: str) -> bool:
+    with open(fname, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_flow_graph(fname: str):
+    """
+    Load the flow graph saved by save_flow_graph. The constants are mapped from the file (and copied to cuda device
+    for cuda constants), and the tasks of operators are loaded lazily.
+    """
+    from hidet.tos.ir.graph import FlowGraph
+    with open(fname, 'rb') as f:
+        prefix = f.read(len(MAGIC) + 16)
+        if prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a flow graph file.'.format(fname))
+        version, _, header_size = struct.unpack('<IIQ', prefix[len(MAGIC):])
+        if version > VERSION:
+            raise ValueError('Can not load flow graph file of version {}, the latest supported version is {}.'.format(version, VERSION))
+        header = json.loads(f.read(header_size).decode('utf-8'))
+    blob_start = (len(prefix) + header_size + PAGE_SIZE - 1) // PAGE_SIZE * PAGE_SIZE
+    if os.path.getsize(fname) > blob_start:
+        # copy on write, the pages are only read when used and never written back to the file
+        blob = np.memmap(fname, dtype=np.uint8, mode='c', offset=blob_start)
+    else:
+        blob = np.zeros([0], dtype=np.uint8)
+
+    tensors: List[Optional[Tensor]] = [None] * len(header['tensors'])
+
+    def load_tensor(idx: int, trace=None) -> Tensor:
+        t = header['tensors'][idx]
+        layout = decode_value(t['layout'], blob) if t['layout'] is not None else None
+        storage = None
+        if t['data'] is not None:
+            offset, nbytes = t['data']
+            data = blob[offset:offset + nbytes]
+            storage = Storage.wrap(device='cpu', addr=data.ctypes.data, num_bytes=nbytes, owner=data)
+        tensor = Tensor(t['shape'], t['dtype'], 'cpu' if storage is not None else t['device'], storage, layout, trace)
+        if storage is not None and t['device'] == 'cuda':
+            tensor = tensor.cuda()
+        tensors[idx] = tensor
+        return tensor
+
+    def task_loader(offset: int, nbytes: int):
+        return lambda: pickle.loads(blob[offset:offset + nbytes].tobytes())
+
+    for idx in header['inputs']:
+        load_tensor(idx)
+    for item in header['ops']:
+        module_name, _, class_name = item['class'].rpartition('.')
+        cls = importlib.import_module(module_name)
+        for name in class_name.split('.'):
+            cls = getattr(cls, name)
+        op: Operator = cls.__new__(cls)
+        op.name = item['name']
+        op.inputs = [tensors[idx] if tensors[idx] is not None else load_tensor(idx) for idx in item['inputs']]
+        op.attrs = {name: decode_value(value, blob) for name, value in item['attrs'].items()}
+        op.set_task_loader(task_loader(*item['task']))
+        op.task_func = None
+        op._inplace_inputs = None
+        for name, value in item['extra'].items():
+            setattr(op, name, decode_value(value, blob))
+        op.outputs = [load_tensor(idx, trace=(op, i)) for i, idx in enumerate(item['outputs'])]
+    outputs = [tensors[idx] if tensors[idx] is not None else load_tensor(idx) for idx in header['outputs']]
+    inputs = [tensors[idx] for idx in header['inputs']]
+    return FlowGraph(outputs, inputs).update_nodes()
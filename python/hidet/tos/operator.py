@@ -1,8 +1,9 @@
-from typing import List, Optional, Dict, Any, Iterable, Tuple, Union
+from typing import List, Optional, Dict, Any, Iterable, Tuple, Union, Callable
 from collections import defaultdict
 
-from hidet.ir.task import Task
+from hidet.ir.task import Task, inplace_parameters
 from hidet.runtime import CompiledFunction
+from hidet.runtime.storage import allocation_tracer
 from hidet.driver import build_task
 from hidet.tos.tensor import empty, empty_like, Tensor
 
@@ -11,6 +12,18 @@ def trim_op_ending(name: str):
     return name[:-2] if name.endswith('Op') else name
 
 
+def scope_device(tensor_type) -> str:
+    # the device of the tensors with given type, host tensors are on cpu
+    return 'cpu' if tensor_type.scope.name == 'host' else 'cuda'
+
+
+def same_layout(a: Tensor, b: Tensor) -> bool:
+    from hidet.ir.layout import StridesLayout
+    if not isinstance(a.layout, StridesLayout) or not isinstance(b.layout, StridesLayout):
+        return False
+    return a.shape == b.shape and [int(v) for v in a.layout.strides] == [int(v) for v in b.layout.strides]
+
+
 class Operator:
     _current_space_level = 0
     _use_cache = True
@@ -34,6 +47,43 @@ class Operator:
 
         # cache
         self.task_func: Optional[CompiledFunction] = None
+        self._inplace_inputs: Optional[List[int]] = None
+
+    @property
+    def task(self) -> Optional[Task]:
+        # the task of an operator loaded from a graph file is reconstructed when it is used for the first time
+        if self._task_loader is not None:
+            self._task = self._task_loader()
+            self._task_loader = None
+        return self._task
+
+    @task.setter
+    def task(self, task: Optional[Task]):
+        self._task = task
+        self._task_loader = None
+
+    def set_task_loader(self, loader: Callable[[], Task]):
+        self._task = None
+        self._task_loader = loader
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_task'] = self.task
+        state['_task_loader'] = None
+        # the compiled function can not be pickled, which is loaded again when used
+        state['task_func'] = None
+        return state
+
+    def __setstate__(self, state):
+        if 'task' in state:
+            # pickled before the task can be loaded lazily
+            state['_task'] = state.pop('task')
+        # the operators pickled by older versions do not have the attributes added later
+        state.setdefault('_task', None)
+        state.setdefault('_task_loader', None)
+        state.setdefault('task_func', None)
+        state.setdefault('_inplace_inputs', None)
+        self.__dict__.update(state)
 
     def __str__(self):
         arguments = ['{}: {}{}'.format(i, t.dtype, t.shape) for i, t in enumerate(self.inputs)]
@@ -57,7 +107,11 @@ class Operator:
             outputs = self.outputs
         return outputs[idx]
 
-    def imperative_run(self, inputs: List[Tensor]) -> List[Tensor]:
+    def get_task_func(self) -> CompiledFunction:
+        """
+        Get the compiled function of the task of this operator, which is built (or loaded from cache) when it is
+        requested for the first time.
+        """
         if self.task_func is None:
             task_string = str(self.task)
             level = self._current_space_level
@@ -66,15 +120,39 @@ class Operator:
             else:
                 self.task_func = build_task(self.task, space_level=self._current_space_level, use_cache=self._use_cache)
                 self._task_cache[level][task_string] = self.task_func
+        return self.task_func
+
+    def inplace_inputs(self) -> List[int]:
+        """
+        Get the indices of the inputs whose storage can be reused by the output of this operator, when the input is
+        not used after this operator. The input must have the same shape, data type, layout and device as the output,
+        and be only accessed at the same indices as the output element being computed (see
+        hidet.ir.task.inplace_parameters).
+        """
+        if self._inplace_inputs is None:
+            params = inplace_parameters(self.task)
+            candidates = [i for i, param in enumerate(self.task.parameters[:len(self.inputs)]) if param in params]
+            candidates = [i for i in candidates if self.inputs[i].device == self.outputs[0].device
+                          and self.inputs[i].dtype == self.outputs[0].dtype and same_layout(self.inputs[i], self.outputs[0])]
+            # the input should not be passed to the other parameters, which may read it at other indices
+            self._inplace_inputs = [i for i in candidates
+                                    if all(j in candidates for j, x in enumerate(self.inputs) if x is self.inputs[i])]
+        return self._inplace_inputs
+
+    def imperative_run(self, inputs: List[Tensor], outputs: Optional[List[Tensor]] = None) -> List[Tensor]:
+        self.get_task_func()
         assert len(inputs) + len(self.task.outputs) == len(self.task.parameters)
-        output_types = [output.data_type for output in self.task.parameters[-len(self.task.outputs):]]
-        outputs = [empty(shape=type.const_shape(), dtype=type.scalar_type.name, device='cuda', layout=type.layout) for type in output_types]
+        if outputs is None:
+            # allocate the outputs, unless they are given (e.g., planned by hidet.runtime.memory_planner)
+            output_types = [output.data_type for output in self.task.parameters[-len(self.task.outputs):]]
+            with allocation_tracer.scope(self.name):
+                outputs = [empty(shape=type.const_shape(), dtype=type.scalar_type.name, device=scope_device(type), layout=type.layout) for type in output_types]
         self.task_func(*inputs, *outputs)
         return outputs
 
     def lazy_run(self) -> List[Tensor]:
         output_types = [output.data_type for output in self.task.parameters[-len(self.task.outputs):]]
-        outputs = [Tensor(shape=type.const_shape(), dtype=type.scalar_type.name, device='cuda', storage=None, layout=type.layout, trace=(self, i)) for i, type in enumerate(output_types)]
+        outputs = [Tensor(shape=type.const_shape(), dtype=type.scalar_type.name, device=scope_device(type), storage=None, layout=type.layout, trace=(self, i)) for i, type in enumerate(output_types)]
         return outputs
 
     def reforward(self, inputs: List[Tensor], update_attributes: Optional[Dict[str, Any]] = None) -> List[Tensor]:
@@ -99,6 +177,7 @@ class Operator:
         new_op.attrs = attributes
         new_op.outputs = new_op.run()
         new_op.task_func = None
+        new_op._inplace_inputs = None
         return new_op.outputs
 
     def latency(self, warmup=3, number=20, repeat=5, median=True) -> Union[List[float], float]:
@@ -5,7 +5,7 @@ from .definitions.matmul import matmul, parallel_k_batched_matmul
 from .definitions.pool import max_pool2d, avg_pool2d
 from .definitions.softmax import softmax
 from .definitions.activation import relu, sigmoid, clip, relu6
-from .definitions.norm import batch_norm_infer, instance_norm, layer_norm
+from .definitions.norm import batch_norm_infer, instance_norm, layer_norm, normalize
 from .definitions.image import resize2d
 from .definitions.arithmatic import add, sub, multiply, divide, neg, sqrt, rsqrt, sin, cos, pow, erf, tanh, equal, less, where, square
 from .definitions.reduce import reduce_mean, reduce_sum, reduce_var
@@ -6,7 +6,7 @@ from .matmul import matmul
 from .pool import max_pool2d, avg_pool2d
 from .softmax import softmax
 from .activation import relu, sigmoid, relu6, clip
-from .norm import batch_norm_infer, instance_norm
+from .norm import batch_norm_infer, instance_norm, normalize
 from .image import resize2d
 from .arithmatic import add, sub, multiply, divide, neg, sqrt, rsqrt, equal, less, where
 from .reduce import reduce_mean
@@ -17,6 +17,7 @@ from .matmul import MatmulOp
 from .conv2d import Conv2dOp
 from .arithmatic import ErfOp, PowOp, AddOp, SubOp, MultiplyOp, DivideOp, EqualOp, WhereOp
 from .reduce import ReduceSumOp, ReduceMeanOp
+from .norm import NormalizeOp
 from .transform import PadOp
 
 from . import utils
@@ -1,4 +1,5 @@
 from typing import List, Union
+from hidet.ir.func import IRModule
 from hidet.tos.ops.definitions.utils import Task, Operator, Tensor, compute, input_like, TensorNode, normalize_kernel, normalize_stride, normalize_padding, reduce
 
 
@@ -15,6 +16,8 @@ class Conv2dTask(Task):
             raise ValueError('Conv2d expect the weight has shape [out_channels, in_channels / groups, kx, ky], \n'
                              'but got weight shape {}, in_channels {} and groups {}'.format([oc, wc, kx, ky], c, groups))
         out_group_size = oc // groups
+        self.stride: List[int] = [sx, sy]
+        self.groups: int = groups
         output = compute(
             name='out',
             shape=[n, oc, p, q],
@@ -28,8 +31,21 @@ class Conv2dTask(Task):
             name='conv2d',
             inputs=[data, weight],
             outputs=[output],
+            attributes={
+                'stride': [sx, sy],
+                'groups': groups
+            }
         )
 
+    def implement_cpu(self) -> IRModule:
+        from hidet.tos.ops.schedules.cpu.conv2d import conv2d_cpu_schedule
+        return conv2d_cpu_schedule(self)
+
+    def fast_implement(self, space_level: int) -> bool:
+        # only the cpu schedule is tuned, the direct cuda convolution uses the generic schedule
+        from hidet.driver import task_target
+        return space_level == 0 or task_target(self) != 'cpu'
+
 
 class Conv2dOp(Operator):
     def __init__(self, x: Tensor, w: Tensor, stride: List[int], groups: int):
@@ -1,5 +1,7 @@
 from typing import List
 
+from hidet.ir.func import IRModule
+
 from hidet.tos.ops.definitions.matmul.matmul import matmul
 from hidet.tos.ops.definitions.utils import Task, Operator, Tensor, compute, input_like, TensorNode
 from hidet.tos.ops.definitions.utils import normalize_kernel, normalize_stride
@@ -15,6 +17,9 @@ class Conv2dGemmImageTransformTask(Task):
         if c % groups != 0:
             raise ValueError('Conv2d expect in_channels % groups == 0, but got in_channels {} and groups {}'.format(c, groups))
         gc = c // groups  # group channels
+        self.kernel: List[int] = [kx, ky]
+        self.stride: List[int] = [sx, sy]
+        self.groups: int = groups
         gemm_x = compute(
             name='gemm_x',
             shape=[groups, n * p * q, gc * kx * ky],
@@ -27,6 +32,10 @@ class Conv2dGemmImageTransformTask(Task):
             outputs=[gemm_x],
         )
 
+    def implement_cpu(self) -> IRModule:
+        from hidet.tos.ops.schedules.cpu.conv2d import conv2d_gemm_image_transform_cpu_schedule
+        return conv2d_gemm_image_transform_cpu_schedule(self)
+
 
 # class Conv2dGemmFilterTransformTask(Task):
 #     def __init__(self, w: TensorNode, groups: int):
@@ -85,7 +94,8 @@ class Conv2dGemmImageTransformOp(Operator):
             task=Conv2dGemmImageTransformTask(input_like(x, 'x'), kernel, stride, groups),
             attributes={
                 'kernel': kernel,
-                'stride': stride
+                'stride': stride,
+                'groups': groups
             }
 
         )
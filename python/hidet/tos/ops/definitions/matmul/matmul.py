@@ -21,8 +21,7 @@ class MatmulTask(Task):
                 shape=[k_size],
                 fcompute=lambda k: a[r, i, k] * b[r, k, j],
                 reduce_type='sum'
-            ),
-            scope='global'
+            )
         )
         super().__init__(
             name='matmul',
@@ -49,6 +48,10 @@ class MatmulTask(Task):
         else:
             raise ValueError('Can not recognize mma type {}, candidates: {}'.format(self.mma, ['simt', 'wmma']))
 
+    def implement_cpu(self) -> IRModule:
+        from hidet.tos.ops.schedules.cpu.matmul import batched_matmul_cpu_schedule
+        return batched_matmul_cpu_schedule(self)
+
     def fast_implement(self, space_level: int) -> bool:
         return space_level == 0
 
@@ -1,47 +1,148 @@
 import warnings
+from typing import Optional
+import subprocess
 from .matmul import matmul, Tensor, cuda
 from hidet.utils.py import gcd, factor
 from hidet.utils import hidet_cache_file
 
 
-def parallel_k_nparts(batch_size, m_size, n_size, k_size) -> int:
-    predefined_rules = {
-        # some predefined rules used in important models
-        (1, 128, 3072, 768): 3,
-        (1, 128, 2304, 768): 3,
-        (1, 128, 768, 768): 6,
-        (1, 289, 192, 1120): 10,
-        (1, 64, 384, 1152): 12,
-        (1, 289, 192, 1344): 14,
-        (1, 49, 160, 960): 15,
-        (1, 49, 320, 960): 15,
-        (1, 196, 64, 384): 16,
-        (1, 196, 256, 2304): 16,
-        (1, 289, 128, 768): 16,
-        (1, 289, 96, 864): 16,
-        (1, 289, 128, 896): 16,
-        (1, 128, 768, 3072): 16,
-    }
+def parallel_k_cost(batch_size, m_size, n_size, k_size, nparts, num_sms, block_shape=(64, 64), resident_blocks=4,
+                    sm_flops_per_us=384e3, workspace_bytes_per_us=1000e3, launch_us=5.0) -> float:
+    """
+    Estimate the latency (in microseconds) of a parallel-k batched matmul with an analytical model.
+
+    The model considers three factors:
+        1. Wave quantization. The matmul launches batch_size * nparts * ceil(m / block_m) * ceil(n / block_n) thread
+           blocks, executed in waves of num_sms * resident_blocks blocks. The last wave costs as much as a full one
+           even if it is partially occupied, and each wave costs the time of one block over k / nparts.
+        2. Reduction overhead. Splitting k requires an extra kernel launch to sum the partial results.
+        3. Workspace traffic. The partial results (nparts * batch_size * m * n floats) are written to global memory
+           and read back by the reduction, which writes the final result.
+
+    Parameters
+    ----------
+    batch_size: int
+        The batch size.
+    m_size: int
+        The m size.
+    n_size: int
+        The n size.
+    k_size: int
+        The k size.
+    nparts: int
+        The number of parts to split the k dimension.
+    num_sms: int
+        The number of streaming multiprocessors.
+    block_shape: Tuple[int, int]
+        The (m, n) tile size of each thread block.
+    resident_blocks: int
+        The number of resident thread blocks on each streaming multiprocessor.
+    sm_flops_per_us: float
+        The float operations each streaming multiprocessor can do per microsecond.
+    workspace_bytes_per_us: float
+        The bandwidth to access the workspace in bytes per microsecond. It is higher than the dram bandwidth
+        because the workspace of the common shapes fits in the l2 cache.
+    launch_us: float
+        The overhead of a kernel launch in microseconds.
+
+    Returns
+    -------
+    ret: float
+        The estimated latency in microseconds.
+    """
+    block_m, block_n = block_shape
+    num_blocks = batch_size * nparts * ((m_size + block_m - 1) // block_m) * ((n_size + block_n - 1) // block_n)
+    blocks_per_wave = num_sms * resident_blocks
+    num_waves = (num_blocks + blocks_per_wave - 1) // blocks_per_wave
+    # the blocks in the same wave share the streaming multiprocessor
+    wave_us = resident_blocks * 2.0 * block_m * block_n * (k_size / nparts) / sm_flops_per_us
+    latency = launch_us + num_waves * wave_us
+    if nparts > 1:
+        workspace_bytes = nparts * batch_size * m_size * n_size * 4
+        output_bytes = batch_size * m_size * n_size * 4
+        latency += launch_us + (2 * workspace_bytes + output_bytes) / workspace_bytes_per_us
+    return latency
+
+
+# the split factors measured on the important models (bert and inception), used before the analytical model
+predefined_rules = {
+    (1, 128, 3072, 768): 3,
+    (1, 128, 2304, 768): 3,
+    (1, 128, 768, 768): 6,
+    (1, 289, 192, 1120): 10,
+    (1, 64, 384, 1152): 12,
+    (1, 289, 192, 1344): 14,
+    (1, 49, 160, 960): 15,
+    (1, 49, 320, 960): 15,
+    (1, 196, 64, 384): 16,
+    (1, 196, 256, 2304): 16,
+    (1, 289, 128, 768): 16,
+    (1, 289, 96, 864): 16,
+    (1, 289, 128, 896): 16,
+    (1, 128, 768, 3072): 16,
+}
+
+
+def _records_key(batch_size, m_size, n_size, k_size):
+    from hidet.tos.ops.schedules.records import current_target
+    try:
+        target = current_target()
+    except (OSError, subprocess.CalledProcessError):
+        # no gpu, can not decide the target of the records
+        return None
+    return 'parallel_k_{}x{}x{}x{}'.format(batch_size, m_size, n_size, k_size), target
+
+
+def parallel_k_nparts(batch_size, m_size, n_size, k_size, num_sms: Optional[int] = None, block_shape=(64, 64), use_records=True) -> int:
+    """
+    Decide the number of parts to split the k dimension of a batched matmul.
+
+    Small k (less than 384) is never split. When the split factors of this shape have been measured on the current device (see
+    parallel_k_batched_matmul_search), the best measured one is used. Otherwise, the matrix-vector products are split
+    into 16 parts and the shapes in predefined_rules use the measured factor. Only the remaining shapes use the factor
+    (a divisor of k_size that is at most 16) with the lowest latency estimated by parallel_k_cost.
+
+    Parameters
+    ----------
+    batch_size: int
+        The batch size.
+    m_size: int
+        The m size.
+    n_size: int
+        The n size.
+    k_size: int
+        The k size.
+    num_sms: Optional[int]
+        The number of streaming multiprocessors. None means querying the current device. Giving it explicitly
+        makes the result reproducible offline.
+    block_shape: Tuple[int, int]
+        The (m, n) tile size of each thread block.
+    use_records: bool
+        Whether to use the measured results in the tuning records.
+
+    Returns
+    -------
+    ret: int
+        The number of parts.
+    """
     if k_size < 384:
         # for small k, the overhead of splitting k is too large compared with the benefits
         return 1
-    elif m_size == 1 or n_size == 1:
+    if use_records:
+        key = _records_key(batch_size, m_size, n_size, k_size)
+        if key is not None:
+            from hidet.tos.ops.schedules.records import tuning_database
+            best = tuning_database().best(*key)
+            if best is not None:
+                return int(dict(best.keys)['nparts'])
+    if m_size == 1 or n_size == 1:
         return 16
-    elif (batch_size, m_size, n_size, k_size) in predefined_rules:
+    if (batch_size, m_size, n_size, k_size) in predefined_rules:
         return predefined_rules[(batch_size, m_size, n_size, k_size)]
-    else:
-        # we hope to run multiple waves of thread blocks (e.g., 5)
-        estimate_thread_blocks = batch_size * ((m_size + 63) // 64) * ((n_size + 63) // 64)
-        num_multi_processors = cuda.device_property(cuda.PropertyMultiProcessorCount)
-        if estimate_thread_blocks * 8 <= num_multi_processors * 5:
-            nparts = 8
-        elif estimate_thread_blocks * 4 <= num_multi_processors * 5:
-            nparts = 4
-        elif estimate_thread_blocks * 2 <= num_multi_processors * 5:
-            nparts = 2
-        else:
-            nparts = 1
-        return nparts
+    if num_sms is None:
+        num_sms = cuda.device_property(cuda.PropertyMultiProcessorCount)
+    candidates = [v for v in factor(k_size) if v <= 16]
+    return min(candidates, key=lambda nparts: parallel_k_cost(batch_size, m_size, n_size, k_size, nparts, num_sms, block_shape))
 
 
 def parallel_k_batched_matmul(a: Tensor, b: Tensor, mma: str = 'default', nparts=None) -> Tensor:
@@ -115,6 +216,11 @@ def parallel_k_batched_matmul_search(a: Tensor, b: Tensor, mma: str = 'default')
                     best_nparts_latency = latency
                 candidate_latencies.append(latency)
         # print('candidate latencies: {}, choose factor {}'.format(['{:.3f}'.format(v * 1000) for v in candidate_latencies], best_nparts))
+        key = _records_key(batch_size, m_size, n_size, k_size)
+        if key is not None:
+            from hidet.tos.ops.schedules.records import tuning_database, TuningRecord, TuningCandidate
+            candidates = [TuningCandidate([['nparts', nparts]], latency) for nparts, latency in zip(factors, candidate_latencies)]
+            tuning_database().add(TuningRecord(key[0], 'parallel_k_matmul', key[1], candidates))
     else:
         assert len(factors) == 1
         best_nparts = factors[0]
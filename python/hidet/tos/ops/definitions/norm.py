@@ -1,13 +1,103 @@
 from typing import List
-from .utils import Tensor
+from hidet.ir import primitives as prim
+from .utils import Task, Operator, Tensor, TensorNode, IRModule, compute, reduce, input_like, normalize_dim
 from .arithmatic import sqrt, square
 from .reduce import reduce_mean, reduce_var
 
 
+class NormalizeTask(Task):
+    """
+    Normalize the data to zero mean and unit variance along the given dimensions:
+
+        y = (x - mean(x)) / sqrt(var(x) + epsilon)
+
+    The mean and variance are kept in the task instead of separate reduce operators, which allows the schedule to
+    compute both of them in a single pass and the residual addition before (or the affine transform after) the
+    normalization to be fused as prologue (or epilogue).
+    """
+    def __init__(self, x: TensorNode, dims: List[int], epsilon: float, accumulate_dtype: str = 'float32'):
+        x_shape = x.const_shape()
+        reduce_shape = [x_shape[i] for i in dims]
+        stat_shape = [1 if i in dims else v for i, v in enumerate(x_shape)]
+
+        def x_indices(indices, reduce_indices):
+            reduce_indices = list(reversed(reduce_indices))
+            return [reduce_indices.pop() if i in dims else index for i, index in enumerate(indices)]
+
+        def stat_indices(indices):
+            return [0 if i in dims else index for i, index in enumerate(indices)]
+
+        def squared(e):
+            return e * e
+
+        mean = compute(
+            name='mean',
+            shape=stat_shape,
+            fcompute=lambda *indices: reduce(
+                shape=reduce_shape,
+                fcompute=lambda *reduce_indices: x[x_indices(indices, reduce_indices)],
+                reduce_type='avg',
+                accumulate_dtype=accumulate_dtype
+            )
+        )
+        var = compute(
+            name='var',
+            shape=stat_shape,
+            fcompute=lambda *indices: reduce(
+                shape=reduce_shape,
+                fcompute=lambda *reduce_indices: squared(x[x_indices(indices, reduce_indices)] - mean[indices]),
+                reduce_type='avg',
+                accumulate_dtype=accumulate_dtype
+            )
+        )
+        y = compute(
+            name='y',
+            shape=x_shape,
+            fcompute=lambda *indices: (x[indices] - mean[stat_indices(indices)]) / prim.sqrt(var[stat_indices(indices)] + epsilon)
+        )
+
+        self.dims: List[int] = dims
+        self.epsilon: float = epsilon
+
+        super().__init__(
+            name='normalize',
+            inputs=[x],
+            outputs=[y],
+            attributes={
+                'dims': dims,
+                'epsilon': epsilon,
+                'accumulate_dtype': accumulate_dtype
+            }
+        )
+
+    def implement_cpu(self) -> IRModule:
+        from ..schedules.cpu.norm import normalize_cpu_schedule
+        return normalize_cpu_schedule(self)
+
+    def fast_implement(self, space_level: int) -> bool:
+        return True
+
+
+class NormalizeOp(Operator):
+    def __init__(self, x: Tensor, dims: List[int], epsilon: float):
+        dims = normalize_dim(dims, rank=len(x.shape))
+        super().__init__(
+            inputs=[x],
+            task=NormalizeTask(input_like(x, 'x'), dims, epsilon),
+            attributes={
+                'dims': dims,
+                'epsilon': epsilon
+            }
+        )
+
+
 def normalize(x: Tensor, dims: List[int], epsilon: float = 1e-5) -> Tensor:
-    x = x - x.mean(dims, keep_dim=True)
-    variance = square(x).mean(dims, keep_dim=True)
-    return x * (variance + epsilon).rsqrt()
+    if x.device == 'cuda':
+        # NormalizeTask only has a cpu schedule, the reduce operators have efficient cuda schedules
+        x = x - x.mean(dims, keep_dim=True)
+        variance = square(x).mean(dims, keep_dim=True)
+        return x * (variance + epsilon).rsqrt()
+    return NormalizeOp(x, dims, epsilon).get_output(0)
 
 
 def batch_norm_infer(x: Tensor, running_mean: Tensor, running_var: Tensor, epsilon=1e-5, axis=1) -> Tensor:
@@ -27,8 +27,7 @@ class Pool2dTask(Task):
                 shape=[kernel[0], kernel[1]],
                 fcompute=lambda rx, ry: pad[n, c, h * strides[0] + rx, w * strides[1] + ry],
                 reduce_type=reduce_type
-            ),
-            scope='global'
+            )
         )
         y = inline_compute(y)
         super().__init__(
@@ -36,7 +36,7 @@ class ReduceTask(Task):
             return reduce(shape=reduce_shape, fcompute=reduce_fcompute,
                           reduce_type=reduce_type, accumulate_dtype=accumulate_dtype)
 
-        y = compute(name='y', shape=y_shape, fcompute=fcompute, scope='global')
+        y = compute(name='y', shape=y_shape, fcompute=fcompute)
 
         self.dims: List[int] = dims
         self.keep_dim: bool = keep_dim
@@ -64,6 +64,10 @@ class ReduceTask(Task):
             # last dimension has not been reduced
             return cuda_schedule_reduce_by_default(self)
 
+    def implement_cpu(self) -> IRModule:
+        from ..schedules.cpu.reduce import reduce_cpu_schedule
+        return reduce_cpu_schedule(self)
+
     def fast_implement(self, space_level: int) -> bool:
         return True
 
@@ -57,6 +57,10 @@ class SoftmaxTask(Task):
         from hidet.tos.ops.schedules import softmax_cuda_schedule
         return softmax_cuda_schedule(self)
 
+    def implement_cpu(self) -> IRModule:
+        from hidet.tos.ops.schedules.cpu.softmax import softmax_cpu_schedule
+        return softmax_cpu_schedule(self)
+
     def fast_implement(self, space_level: int) -> bool:
         return True
 
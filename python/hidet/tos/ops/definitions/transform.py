@@ -67,8 +67,7 @@ class ReshapeTask(Task):
         y = compute(
             name='y',
             shape=y_shape,
-            fcompute=lambda *indices: x[index_map(indices, src_shape=x_shape, dst_shape=y_shape)],
-            scope='global',
+            fcompute=lambda *indices: x[index_map(indices, src_shape=x_shape, dst_shape=y_shape)]
         )
         super().__init__(
             name='reshape',
@@ -179,8 +178,7 @@ class TakeTask(Task):
         output = compute(
             name='output',
             shape=output_shape,
-            fcompute=lambda *output_indices: fmap(*output_indices),
-            scope='global'
+            fcompute=lambda *output_indices: fmap(*output_indices)
         )
         super().__init__(
             name='take',
@@ -376,14 +374,15 @@ class SqueezeOp(Operator):
 
         )
 
-    def imperative_run(self, inputs: Optional[List[Tensor]] = None) -> List[Tensor]:
+    def imperative_run(self, inputs: Optional[List[Tensor]] = None, outputs: Optional[List[Tensor]] = None) -> List[Tensor]:
         x = inputs[0] if inputs else self.inputs[0]
-        if isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
+        # share the storage of input, unless the output storage is given (e.g., planned by the memory planner)
+        if outputs is None and isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
             shape = self.task.outputs[0].const_shape()
             layout = x.layout.__class__(shape)
             return [Tensor(shape=shape, dtype=x.dtype, device=x.device, storage=x.storage, layout=layout, trace=None)]
         else:
-            return Operator.imperative_run(self, inputs)
+            return Operator.imperative_run(self, inputs, outputs)
 
 
 class UnsqueezeOp(Operator):
@@ -407,14 +406,15 @@ class UnsqueezeOp(Operator):
 
         )
 
-    def imperative_run(self, inputs: Optional[List[Tensor]] = None) -> List[Tensor]:
+    def imperative_run(self, inputs: Optional[List[Tensor]] = None, outputs: Optional[List[Tensor]] = None) -> List[Tensor]:
         x = inputs[0] if inputs else self.inputs[0]
-        if isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
+        # share the storage of input, unless the output storage is given (e.g., planned by the memory planner)
+        if outputs is None and isinstance(x.layout, (RowMajorLayout, ColumnMajorLayout)):
             shape = self.task.outputs[0].const_shape()
             layout = x.layout.__class__(shape)
             return [Tensor(shape=shape, dtype=x.dtype, device=x.device, storage=x.storage, layout=layout, trace=None)]
         else:
-            return Operator.imperative_run(self, inputs)
+            return Operator.imperative_run(self, inputs, outputs)
 
 
 class FlattenOp(Operator):
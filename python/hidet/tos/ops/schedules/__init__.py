@@ -1,8 +1,12 @@
 from . import cpu
 from . import cuda
 
-from .cpu import generic_cpu_schedule
+from .cpu import generic_cpu_schedule, cpu_auto_schedule
 from .cuda import generic_cuda_schedule
 
 from .cuda.softmax import softmax_cuda_schedule
 from .cuda.reduce import cuda_schedule_reduce_by_default, cuda_schedule_reduce_by_warp_reduce
+
+from .records import TuningDatabase, TuningRecord, TuningCandidate, tuning_database, set_tuning_database
+from .cost_model import CostModel, extract_features, evaluate_cost_model
+from .measure import Measurer, CudaMeasurer, CpuMeasurer, SimulatedMeasurer
@@ -231,3 +231,15 @@ def params_from_task(task: Task) -> List[Var]:
 #         return BufferStoreStmt(buf, indices, value)
 #     else:
 #         return BufferStoreStmt(buf, indices, value)
+
+
+def merge_indices(grid_indices: List[Expr], reduce_indices: List[Expr], reduce_dims: List[int]) -> List[Expr]:
+    indices = []
+    grid_indices = list(reversed(grid_indices))
+    reduce_indices = list(reversed(reduce_indices))
+    for i in range(len(grid_indices) + len(reduce_indices)):
+        if i in reduce_dims:
+            indices.append(reduce_indices.pop())
+        else:
+            indices.append(grid_indices.pop())
+    return indices
@@ -0,0 +1,184 @@
+from typing import List, Optional, Dict, Union, Sequence, Tuple
+import math
+import zlib
+import numpy as np
+
+from .records import TuningRecord, TuningDatabase, tuning_database
+
+
+def extract_features(keys: Sequence[Sequence[Union[int, float, str]]],
+                     derived_keys: Sequence[Sequence[Union[int, float, str]]] = (),
+                     task_features: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Extract the features of a candidate schedule of a task.
+
+    Numeric keys are used by their logarithm and string keys are one-hot encoded. Besides, each task feature is
+    crossed with each numeric schedule key, so that the model can learn how the best schedule varies with the
+    task shape.
+
+    Parameters
+    ----------
+    keys: Sequence[Sequence[Union[int, float, str]]]
+        The (name, value) pairs of Schedule.keys().
+    derived_keys: Sequence[Sequence[Union[int, float, str]]]
+        The (name, value) pairs of Schedule.derived_keys().
+    task_features: Optional[Dict[str, float]]
+        The task features, see records.task_features().
+
+    Returns
+    -------
+    ret: Dict[str, float]
+        The features.
+    """
+    schedule_features = {}
+    for name, value in list(keys) + list(derived_keys):
+        if isinstance(value, str):
+            schedule_features['{}={}'.format(name, value)] = 1.0
+        else:
+            schedule_features[name] = math.log2(1.0 + max(float(value), 0.0))
+    features = dict(schedule_features)
+    if task_features:
+        for task_name, task_value in task_features.items():
+            task_value = math.log2(1.0 + max(float(task_value), 0.0))
+            features[task_name] = task_value
+            for name, value in schedule_features.items():
+                features['{}*{}'.format(task_name, name)] = task_value * value
+    return features
+
+
+class CostModel:
+    """
+    A ridge regression model that predicts the logarithm of the latency of a candidate schedule from its features.
+
+    The features are hashed into a fixed-size vector, and the model keeps the sufficient statistics (X^T X and
+    X^T y) instead of the samples, thus it can be updated online as new measurements arrive and refit in
+    O(num_features^3) time regardless of the number of samples.
+    """
+    def __init__(self, num_features: int = 256, alpha: float = 1.0):
+        self.num_features = num_features
+        self.alpha = alpha
+        dim = num_features + 1  # the last one is bias
+        self.xtx = np.zeros([dim, dim], dtype=np.float64)
+        self.xty = np.zeros([dim], dtype=np.float64)
+        self.weights: Optional[np.ndarray] = None
+        self.num_samples = 0
+
+    def vectorize(self, features: Dict[str, float]) -> np.ndarray:
+        x = np.zeros([self.num_features + 1], dtype=np.float64)
+        for name, value in features.items():
+            # use crc32 instead of the builtin hash, which is randomized across processes
+            h = zlib.crc32(name.encode())
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            x[h % self.num_features] += sign * value
+        x[-1] = 1.0
+        return x
+
+    def update(self, features: List[Dict[str, float]], latencies: List[float]):
+        """
+        Update the model with new measurements. The latencies must be positive.
+        """
+        if len(features) != len(latencies):
+            raise ValueError('The number of features and latencies does not match.')
+        if len(features) == 0:
+            return
+        x = np.stack([self.vectorize(f) for f in features])
+        y = np.log(np.array(latencies, dtype=np.float64))
+        self.xtx += x.T @ x
+        self.xty += x.T @ y
+        self.num_samples += len(features)
+        reg = self.alpha * np.eye(self.num_features + 1)
+        reg[-1, -1] = 0.0  # do not regularize the bias
+        self.weights = np.linalg.solve(self.xtx + reg, self.xty)
+
+    def update_records(self, records: List[TuningRecord]):
+        """
+        Update the model with the measured candidates in given tuning records.
+        """
+        features, latencies = [], []
+        for record in records:
+            for candidate in record.candidates:
+                if candidate.status == 'ok' and candidate.latency is not None and candidate.latency > 0:
+                    features.append(extract_features(candidate.keys, candidate.derived_keys, record.task_features))
+                    latencies.append(candidate.latency)
+        self.update(features, latencies)
+
+    def trained(self) -> bool:
+        return self.weights is not None
+
+    def predict(self, features: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Predict the latency of each candidate. Requires the model to be trained.
+        """
+        if self.weights is None:
+            raise ValueError('The cost model has not been trained.')
+        if len(features) == 0:
+            return np.zeros([0], dtype=np.float64)
+        x = np.stack([self.vectorize(f) for f in features])
+        return np.exp(x @ self.weights)
+
+    def rank(self, features: List[Dict[str, float]]) -> List[int]:
+        """
+        Rank the candidates by predicted latency, from fast to slow. When the model has not been trained, the
+        original order is kept.
+        """
+        if self.weights is None:
+            return list(range(len(features)))
+        predicted = self.predict(features)
+        return [int(idx) for idx in np.argsort(predicted, kind='stable')]
+
+
+def evaluate_cost_model(train_records: List[TuningRecord], test_records: List[TuningRecord], top_k: int,
+                        num_features: int = 256, alpha: float = 1.0) -> List[Tuple[str, float]]:
+    """
+    Evaluate the cost model offline with recorded data.
+
+    The model is trained on train_records. For each test record, the measured candidates are ranked by the model
+    and we report the ratio between the true best latency and the best latency among the predicted top-k
+    candidates (1.0 means the best candidate is always found).
+
+    Parameters
+    ----------
+    train_records: List[TuningRecord]
+        The records to train the model.
+    test_records: List[TuningRecord]
+        The records to evaluate the model.
+    top_k: int
+        The number of candidates to build and measure.
+    num_features: int
+        The number of hashed features.
+    alpha: float
+        The ridge regularization strength.
+
+    Returns
+    -------
+    ret: List[Tuple[str, float]]
+        The (task name, ratio) of each test record that has measured candidates.
+    """
+    model = CostModel(num_features, alpha)
+    model.update_records(train_records)
+    results = []
+    for record in test_records:
+        candidates = [c for c in record.candidates if c.status == 'ok' and c.latency is not None]
+        if len(candidates) == 0:
+            continue
+        features = [extract_features(c.keys, c.derived_keys, record.task_features) for c in candidates]
+        selected = model.rank(features)[:top_k]
+        best = min(c.latency for c in candidates)
+        found = min(candidates[idx].latency for idx in selected)
+        results.append((record.task_name, best / found))
+    return results
+
+
+_cost_models: Dict[str, CostModel] = {}
+
+
+def cost_model(target: str, database: Optional[TuningDatabase] = None) -> CostModel:
+    """
+    Get the cost model of given target used by schedule resolving. It is trained on the records of the target in
+    the tuning database when first used, and updated online by resolve_ir_modules.
+    """
+    if target not in _cost_models:
+        model = CostModel()
+        model.update_records((database if database is not None else tuning_database()).query(target=target))
+        _cost_models[target] = model
+    return _cost_models[target]
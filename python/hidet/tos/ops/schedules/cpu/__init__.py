@@ -1 +1,8 @@
+from . import matmul
+from . import conv2d
+from . import reduce
+from . import softmax
+from . import norm
+
 from .generic_cpu import generic_cpu_schedule
+from .auto_scheduler import CpuAutoScheduler, cpu_auto_schedule
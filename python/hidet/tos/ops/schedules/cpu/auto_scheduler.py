@@ -0,0 +1,198 @@
+from typing import List, Dict, Optional, Sequence, Union
+
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.dialects.compute import TensorNode, ScalarNode, ReduceCompute
+from hidet.ir.expr import Expr, Var, TensorElement, Constant, var, tensor_var
+from hidet.ir.func import IRModule
+from hidet.ir.functors import collect, rewrite, inline_compute
+from hidet.ir.stmt import Stmt, ForStmt, BufferStoreStmt, SeqStmt
+from hidet.ir.task import Task
+from hidet.ir.utils import index_deserialize
+from hidet.utils import prod
+from ..common import expand_loop, params_from_task, NotSupportedError
+
+
+def _vars_of(e: Expr) -> List[Var]:
+    return collect(e, Var)
+
+
+def _tile_size(extent: int, limit: int, multiple_of: int = 1) -> int:
+    # the largest divisor of extent that does not exceed limit, preferring the multiples of given number
+    divisors = [d for d in range(1, min(extent, limit) + 1) if extent % d == 0]
+    preferred = [d for d in divisors if d % multiple_of == 0]
+    return max(preferred) if len(preferred) > 0 else max(divisors)
+
+
+def _loop_nest(loop_vars: Sequence[Var], extents: Sequence[int], body: Stmt, vectorize: bool = False) -> Stmt:
+    # wrap body with nested loops, the last loop is the innermost one
+    for i in reversed(range(len(loop_vars))):
+        body = ForStmt(loop_vars[i], extents[i], body=body, vectorize=vectorize and i == len(loop_vars) - 1)
+    return body
+
+
+class CpuAutoScheduler:
+    """
+    Schedule the computation of a task in compute dialect on cpu.
+
+    For each output (and each intermediate tensor that can not be inlined because it contains a large reduction),
+    the scheduler analyzes the tensor accesses of its grid compute and
+
+    1. Reorders the grid axes such that the innermost axis is the one that accesses memory contiguously (appears
+       in the last index) in the most tensor accesses, including the write of the output.
+    2. Tiles the two innermost grid axes into a block of block_rows x block_cols elements. All the loops over
+       the tiles and the remaining grid axes are fused into one loop that is distributed to cpu threads.
+    3. Marks the innermost loop in the tile as vectorized.
+
+    When the output is computed by a reduction, and the innermost grid axis accesses the reduced tensors
+    contiguously (e.g., the j axis of matmul C[i, j] = sum_k A[i, k] * B[k, j]), the reduction loops are moved
+    out of the tile and the partial results of the tile are accumulated in a register block. Otherwise, the
+    reduction is the innermost loop of each output element, which accesses the reduced tensors contiguously
+    (e.g., the sum over the last dimension).
+    """
+    def __init__(self, vector_width: int = 8, block_rows: int = 4, block_cols: int = 64, min_parallel_work: int = 4096):
+        """
+        Parameters
+        ----------
+        vector_width: int
+            The number of elements in a simd vector. The number of columns of a block prefers its multiples.
+        block_rows: int
+            The maximum extent of the second innermost axis in a block.
+        block_cols: int
+            The maximum extent of the innermost axis in a block.
+        min_parallel_work: int
+            The minimum number of executed loop iterations (including the reduction ones) to use multiple threads.
+        """
+        self.vector_width = vector_width
+        self.block_rows = block_rows
+        self.block_cols = block_cols
+        self.min_parallel_work = min_parallel_work
+        self.buffer_map: Dict[TensorNode, Var] = {}
+        self.local_vars: List[Var] = []
+
+    def schedule(self, task: Task) -> IRModule:
+        params = params_from_task(task)
+        self.buffer_map = {node: param for node, param in zip(task.inputs + task.outputs, params)}
+        self.local_vars = []
+        with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label='cpu auto schedule') as fb:
+            fb.extend_params(params)
+            sb = StmtBuilder()
+            for output in task.outputs:
+                sb += self.schedule_tensor(inline_compute(output, reduce_limit=16), self.buffer_map[output])
+            fb.extend_local_vars(self.local_vars)
+            fb.set_body(sb.finish())
+        func = fb.get()
+        return IRModule(funcs={func.name: func}, task=task)
+
+    def materialize_stages(self, value: Expr) -> List[Stmt]:
+        # compute the intermediate tensors that are not inlined into local buffers before they are used
+        stmts = []
+        for node in collect(value, TensorNode, stop_when_found=True):
+            if node in self.buffer_map or node.grid_compute is None:
+                continue
+            buf = tensor_var(node.name, shape=node.const_shape(), scope='host', dtype=node.data_type.scalar_type)
+            self.local_vars.append(buf)
+            stmts.append(self.schedule_tensor(node, buf))
+            self.buffer_map[node] = buf
+        return stmts
+
+    def schedule_tensor(self, node: TensorNode, buf: Var) -> Stmt:
+        gc = node.grid_compute
+        if any(not isinstance(extent, Constant) for extent in gc.shape):
+            raise NotSupportedError(node, 'Can only schedule tensors with constant shape on cpu.')
+        stmts = self.materialize_stages(gc.value)
+        value = rewrite(gc.value, self.buffer_map)
+        axes: List[Var] = list(gc.axes)
+        extents: Dict[Var, int] = {axis: int(extent) for axis, extent in zip(axes, gc.shape)}
+        reduces: List[ScalarNode] = [s for s in collect(value, ScalarNode, stop_when_found=True) if s.reduce_compute is not None]
+
+        # reorder: the innermost axis accesses memory contiguously in the most accesses (including the output)
+        accesses: List[Sequence[Expr]] = [axes] + [te.indices for te in collect(value, TensorElement)]
+        inner_axis: Optional[Var] = None
+        best_score = -1
+        for axis in axes:
+            score = sum(1 for indices in accesses if len(indices) > 0 and axis in _vars_of(indices[-1]))
+            if score >= best_score:
+                inner_axis, best_score = axis, score
+        tile_axes: List[Var] = [axis for axis in axes if axis is not inner_axis][-1:] + ([inner_axis] if inner_axis is not None else [])
+        outer_axes: List[Var] = [axis for axis in axes if axis not in tile_axes]
+
+        # tile
+        tile_sizes = []
+        for axis in tile_axes:
+            if axis is inner_axis:
+                tile_sizes.append(_tile_size(extents[axis], self.block_cols, self.vector_width))
+            else:
+                tile_sizes.append(_tile_size(extents[axis], self.block_rows))
+        tile_vars = [var(axis.hint + '_i' if axis.hint else None) for axis in tile_axes]
+
+        # parallelize the fused loop over the outer axes and the tiles
+        fused_shape = [extents[axis] for axis in outer_axes] + [extents[axis] // size for axis, size in zip(tile_axes, tile_sizes)]
+        reduce_extent = prod([prod(s.reduce_compute.const_shape()) for s in reduces]) if len(reduces) > 0 else 1
+        parallel = prod(fused_shape) > 1 and prod(list(extents.values())) * reduce_extent >= self.min_parallel_work
+        fused_var = var('p')
+        fused_indices = index_deserialize(fused_var, fused_shape)
+        grid_map: Dict[Var, Expr] = {axis: index for axis, index in zip(outer_axes, fused_indices)}
+        for axis, tile_index, tile_var, size in zip(tile_axes, fused_indices[len(outer_axes):], tile_vars, tile_sizes):
+            grid_map[axis] = tile_index * size + tile_var
+        out_indices = [grid_map[axis] for axis in axes]
+
+        accumulate = False
+        if len(reduces) == 1 and inner_axis is not None:
+            reduce_value = reduces[0].reduce_compute.value
+            nested = [s for s in collect(reduce_value, ScalarNode) if s.reduce_compute is not None]
+            contiguous = any(len(te.indices) > 0 and inner_axis in _vars_of(te.indices[-1]) for te in collect(reduce_value, TensorElement))
+            accumulate = len(nested) == 0 and contiguous
+
+        if accumulate:
+            body = self.accumulate_block(buf, out_indices, value, reduces[0], grid_map, tile_vars, tile_sizes)
+        else:
+            # expand the reductions (if any) as the innermost loops of each output element
+            stmt, expanded, new_buffer_map = expand_loop(rewrite(value, grid_map), input_map={})
+            self.local_vars.extend(new_buffer_map.values())
+            body = _loop_nest(tile_vars, tile_sizes, SeqStmt([stmt, BufferStoreStmt(buf, out_indices, expanded)]), vectorize=len(reduces) == 0)
+        stmts.append(ForStmt(fused_var, prod(fused_shape), body=body, parallel=parallel))
+        return SeqStmt(stmts)
+
+    def accumulate_block(self, buf: Var, out_indices: List[Expr], value: Expr, reduce_node: ScalarNode, grid_map: Dict[Var, Expr],
+                         tile_vars: List[Var], tile_sizes: List[int]) -> Stmt:
+        rc = reduce_node.reduce_compute
+        acc = tensor_var('acc', shape=tile_sizes, scope='register', dtype=rc.accumulate_dtype)
+        self.local_vars.append(acc)
+        init = ReduceCompute.init_const(rc.reduce_type, rc.accumulate_dtype)
+        combined = ReduceCompute.combine(rc.reduce_type, acc[tile_vars], rewrite(rc.value, grid_map))
+        finalized = ReduceCompute.finalize(rc.reduce_type, acc[tile_vars], prod(rc.const_shape()))
+        output_map: Dict[Union[Var, ScalarNode], Expr] = dict(grid_map)
+        output_map[reduce_node] = finalized
+
+        stmts = [_loop_nest(tile_vars, tile_sizes, BufferStoreStmt(acc, tile_vars, init), vectorize=True)]
+        update = _loop_nest(tile_vars, tile_sizes, BufferStoreStmt(acc, tile_vars, combined), vectorize=True)
+        stmts.append(_loop_nest(list(rc.axes), rc.const_shape(), update))
+        stmts.append(_loop_nest(tile_vars, tile_sizes, BufferStoreStmt(buf, out_indices, rewrite(value, output_map)), vectorize=True))
+        return SeqStmt(stmts)
+
+
+def cpu_auto_schedule(task: Task, vector_width: int = 8, block_rows: int = 4, block_cols: int = 64, min_parallel_work: int = 4096) -> IRModule:
+    """
+    Schedule a task in compute dialect on cpu with tiling, loop reordering, multithreading and vectorization.
+    See CpuAutoScheduler for the details.
+
+    Parameters
+    ----------
+    task: Task
+        The task to schedule. All its tensors must have constant shapes.
+    vector_width: int
+        The number of elements in a simd vector.
+    block_rows: int
+        The maximum extent of the second innermost axis in a block.
+    block_cols: int
+        The maximum extent of the innermost axis in a block.
+    min_parallel_work: int
+        The minimum number of executed loop iterations to use multiple threads.
+
+    Returns
+    -------
+    ret: IRModule
+        The ir module with a single host kernel.
+    """
+    scheduler = CpuAutoScheduler(vector_width, block_rows, block_cols, min_parallel_work)
+    return scheduler.schedule(task)
@@ -0,0 +1,300 @@
+from typing import List, Tuple, Union
+
+import os
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.expr import Var, And, if_then_else, convert, tensor_var
+from hidet.ir.func import IRModule
+from hidet.ir.layout import TaskLayout
+from hidet.ir.stmt import BufferStoreStmt, IfStmt
+from hidet.ir.type import ScalarType
+from hidet.ir.task import TaskContext
+from hidet.utils import cpu, prod
+from hidet.tos.ops.definitions.conv2d.conv2d import Conv2dTask
+from hidet.tos.ops.definitions.conv2d.conv2d_gemm import Conv2dGemmImageTransformTask
+from hidet.tos.ops.schedules.resolve import resolve_ir_modules
+from hidet.tos.ops.schedules.measure import CpuMeasurer
+from hidet.tos.ops.schedules.common import params_from_task, Schedule, NotSupportedError
+from hidet.tos.ops.schedules.space import ScheduleSpace
+from .utils import ceil_div, balance, thread_grids, default_thread_grid
+
+
+"""
+pseudo code of the direct convolution on cpu, with the output channels blocked by ocb (NCHWc)
+=========
+parallel for worker in thread_layout:
+    for each block (n, g, ob, pb) assigned to the worker by block_layout:
+        w[g * ogc + ob * ocb:, :, :, :] -> packed_w    # [wc, kx, ky, ocb]
+        for p in rows of block pb:
+            for qt in range(q / qb):
+                acc = 0                                 # qb x ocb registers
+                for c, i, j in range(wc), range(kx), range(ky):
+                    acc += x[n, g * wc + c, p * sx + i, (qt * qb:) * sy + j] outer packed_w[c, i, j, :]
+                acc -> y[n, g * ogc + ob * ocb:, p, qt * qb:]
+"""
+
+
+class Conv2dCpuSchedule(Schedule):
+    def __init__(
+            self,
+            task: Conv2dTask,
+            vector_dim=None,
+            tile_oc=16,
+            tile_q=6,
+            block_rows=4,
+            thread_grid=None,
+            dtype='float32'
+    ):
+        n, c, h, w = task.inputs[0].const_shape()
+        oc, wc, kx, ky = task.inputs[1].const_shape()
+        _, _, p, q = task.outputs[0].const_shape()
+        groups = task.groups
+        ogc = oc // groups
+        if vector_dim is None:
+            # vectorize over the output channels unless there are too few of them in a group (e.g., depthwise)
+            vector_dim = 'oc' if ogc >= 8 else 'q'
+        self.check(vector_dim in ['oc', 'q'], 'unknown vector dimension {}'.format(vector_dim))
+        self.vector_dim = vector_dim
+        self.tile_oc = balance(ogc, tile_oc, 8 if vector_dim == 'oc' and ogc >= 8 else 1)
+        self.tile_q = balance(q, tile_q, 1)
+        self.block_rows = balance(p, block_rows, 1)
+        self.oc_blocks = ceil_div(ogc, self.tile_oc)
+        self.q_tiles = ceil_div(q, self.tile_q)
+        self.num_blocks = [n, groups * self.oc_blocks, ceil_div(p, self.block_rows)]
+        if thread_grid is None:
+            thread_grid = default_thread_grid(cpu.query_num_cores(), self.num_blocks)
+        self.thread_grid = tuple(thread_grid)
+        self.check(all(t <= b for t, b in zip(self.thread_grid, self.num_blocks)), 'there are threads without any block')
+
+        # derived task layouts
+        row_major = TaskLayout.row_major
+        full_layout = TaskLayout.full_layout
+        self.thread_layout = row_major(self.thread_grid)
+        self.block_layout = self.thread_layout * full_layout([ceil_div(b, t) for b, t in zip(self.num_blocks, self.thread_grid)])
+
+        # derived constants
+        nbytes = ScalarType(dtype).nbytes()
+        self.packed_w_shape = [wc, kx, ky, self.tile_oc]
+        self.acc_shape = [self.tile_q, self.tile_oc] if vector_dim == 'oc' else [self.tile_oc, self.tile_q]
+        self.buffer_bytes = prod(self.packed_w_shape) * nbytes
+        self.num_threads = self.thread_layout.num_workers
+
+    def keys(self) -> List[Tuple[str, Union[int, float, str]]]:
+        return [
+            ('vec', self.vector_dim),
+            ('ocb', self.tile_oc),
+            ('qb', self.tile_q),
+            ('rows', self.block_rows),
+            ('tn', self.thread_grid[0]),
+            ('toc', self.thread_grid[1]),
+            ('tp', self.thread_grid[2])
+        ]
+
+    def derived_keys(self) -> List[Tuple[str, Union[int, float, str]]]:
+        return [
+            ('acc', prod(self.acc_shape)),
+            ('buffer', self.buffer_bytes),
+            ('threads', self.num_threads)
+        ]
+
+    def __str__(self):
+        return 'vec_{}_tile_{}x{}_rows_{}_threads_{}x{}x{}'.format(self.vector_dim, self.tile_q, self.tile_oc, self.block_rows, *self.thread_grid)
+
+    def check(self, cond, msg: str = ""):
+        if not cond:
+            raise NotSupportedError(self, msg)
+
+    @staticmethod
+    def space(space_level: int, task: Conv2dTask, dtype: str = 'float32') -> ScheduleSpace:
+        oc, wc, kx, ky = task.inputs[1].const_shape()
+        _, _, p, q = task.outputs[0].const_shape()
+        ogc = oc // task.groups
+        space = ScheduleSpace('conv2d_cpu_space_{}'.format(space_level))
+        if space_level == 1:
+            space.axis('vector_dim', ['oc', 'q'])
+            space.axis('tile', [[6, 16], [4, 16], [8, 8]])
+            space.axis('block_rows', [2, 4])
+        elif space_level == 2:
+            space.axis('vector_dim', ['oc', 'q'])
+            space.axis('tile', [[4, 8], [8, 8], [12, 8], [4, 16], [6, 16], [8, 16], [2, 32], [3, 32], [4, 32]])
+            space.axis('block_rows', [1, 2, 4, 8])
+        else:
+            raise NotImplementedError()
+        space.axis('thread_grid', thread_grids(cpu.query_num_cores(), rank=3))
+        nbytes = ScalarType(dtype).nbytes()
+        max_accumulators = 128      # 16 vector registers of 256 bits
+        max_buffer_bytes = 1024 * 1024   # the packed weights are allocated on the stack of each thread
+        space.constraint(lambda vector_dim: vector_dim == 'oc' or ogc < 8, 'vectorize over the output channels when there are enough of them')
+        space.derive('tile_q', lambda vector_dim, tile: balance(q, tile[0] if vector_dim == 'oc' else tile[1], 1))
+        space.derive('tile_oc', lambda vector_dim, tile: balance(ogc, tile[1] if vector_dim == 'oc' else tile[0], 8 if vector_dim == 'oc' else 1))
+        space.constraint(lambda tile_q, tile_oc: tile_q * tile_oc <= max_accumulators, 'the accumulators exceed the vector registers')
+        space.constraint(lambda tile_oc: wc * kx * ky * tile_oc * nbytes <= max_buffer_bytes, 'the packed weights exceed the limit')
+        space.derive('rows', lambda block_rows: balance(p, block_rows, 1))
+        space.constraint(lambda tile_oc, rows, thread_grid: all(t <= b for t, b in zip(thread_grid, [task.inputs[0].const_shape()[0],
+                                                                                                     task.groups * ceil_div(ogc, tile_oc), ceil_div(p, rows)])),
+                         'there are threads without any block')
+        return space
+
+    @staticmethod
+    def schedules(task: Conv2dTask, space_level: int = 0, verbose: bool = False):
+        if space_level == 0:
+            return [Conv2dCpuSchedule(task)]
+        space = Conv2dCpuSchedule.space(space_level, task)
+        # the tiles balanced for the task may coincide, keep the first one of each
+        settings = {}
+        for point in space.enumerate():
+            key = (point['vector_dim'], point['tile_q'], point['tile_oc'], point['rows'], point['thread_grid'])
+            if key not in settings:
+                settings[key] = Conv2dCpuSchedule(
+                    task,
+                    vector_dim=point['vector_dim'],
+                    tile_oc=point['tile_oc'],
+                    tile_q=point['tile_q'],
+                    block_rows=point['rows'],
+                    thread_grid=point['thread_grid']
+                )
+        if verbose:
+            print(space.report())
+        return list(settings.values())
+
+
+def conv2d_cpu_schedule(task: Conv2dTask) -> IRModule:
+    ctx = TaskContext.current()
+    all_schedules = Conv2dCpuSchedule.schedules(task, space_level=ctx.space_level, verbose=True)
+    if len(all_schedules) == 1:
+        return conv2d_cpu_with_given_schedule(task, all_schedules[0])
+    x_shape, w_shape = task.inputs[0].const_shape(), task.inputs[1].const_shape()
+    default_resolve_out_dir = os.path.join('./outs/resolve', task.name, 'conv2d_cpu_{}_{}_s{}x{}_g{}'.format(
+        'x'.join(str(v) for v in x_shape), 'x'.join(str(v) for v in w_shape), *task.stride, task.groups))
+    resolve_out_dir = ctx.resolve_out_dir if ctx.resolve_out_dir else default_resolve_out_dir
+    ir_modules = []
+    for schedule in all_schedules:
+        ir_modules.append(conv2d_cpu_with_given_schedule(task, schedule))
+    return resolve_ir_modules(
+        ir_modules=ir_modules,
+        schedules=all_schedules,
+        output_dir=resolve_out_dir,
+        parallel=True,
+        verbose=True,
+        measurer=ctx.measurer if ctx.measurer is not None else CpuMeasurer()
+    )
+
+
+def conv2d_cpu_with_given_schedule(task: Conv2dTask, schedule: Conv2dCpuSchedule) -> IRModule:
+    ir_module = IRModule(task=task)
+    sch = schedule
+
+    w_dtype = task.inputs[1].data_type.scalar_type
+    y_dtype = task.outputs[0].data_type.scalar_type
+
+    n, c, h, w = task.inputs[0].const_shape()
+    oc, wc, kx, ky = task.inputs[1].const_shape()
+    _, _, p, q = task.outputs[0].const_shape()
+    sx, sy = task.stride
+    ogc = oc // task.groups
+    tq, toc = sch.tile_q, sch.tile_oc
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label=str(sch)) as fb:
+        sb = StmtBuilder()
+
+        # declare params
+        params = params_from_task(task)
+        x, wt, y = params
+        fb.extend_params(params)
+
+        # declare thread-private buffers
+        packed_w = tensor_var('packed_w', shape=sch.packed_w_shape, scope='register', dtype=w_dtype)
+        acc = tensor_var('acc', shape=sch.acc_shape, scope='register', dtype=y_dtype)
+        fb.extend_local_vars([packed_w, acc])
+
+        with sb.for_loop('worker', sch.num_threads, parallel=True) as worker:
+            with sb.for_task(worker, sch.block_layout, unroll_limit=1) as [(bn, bo, bp)]:
+                with sb.if_then(And.join(bn < sch.num_blocks[0], bo < sch.num_blocks[1], bp < sch.num_blocks[2])):
+                    with sb.lets(['g', 'oc_offset'], [bo // sch.oc_blocks, bo % sch.oc_blocks * toc]) as (g, oc_offset):
+                        # pack the weights of the output channel block, padded with zeros
+                        with sb.for_loop('ci', wc) as ci:
+                            with sb.for_loop('i', kx) as i:
+                                with sb.for_loop('j', ky) as j:
+                                    with sb.for_loop('o', toc, vectorize=True) as o:
+                                        sb += BufferStoreStmt(packed_w, [ci, i, j, o], if_then_else(
+                                            oc_offset + o < ogc, wt[g * ogc + oc_offset + o, ci, i, j], convert(0.0, w_dtype)))
+                        with sb.for_loop('r', sch.block_rows) as r:
+                            with sb.let('pi', bp * sch.block_rows + r) as pi:
+                                with sb.if_then(pi < p):
+                                    with sb.for_loop('qt', sch.q_tiles) as qt:
+                                        sb += conv_tile(x, packed_w, acc, y, bn, g, oc_offset, pi, qt, task, sch)
+        # set body
+        fb.set_body(sb.finish())
+
+    func = fb.get()
+    ir_module.add(func.name, func)
+    return ir_module
+
+
+def conv_tile(x: Var, packed_w: Var, acc: Var, y: Var, bn, g, oc_offset, pi, qt, task: Conv2dTask, schedule: Conv2dCpuSchedule):
+    sb = StmtBuilder()
+    n, c, h, w = task.inputs[0].const_shape()
+    oc, wc, kx, ky = task.inputs[1].const_shape()
+    _, _, p, q = task.outputs[0].const_shape()
+    sx, sy = task.stride
+    ogc = oc // task.groups
+    tq, toc = schedule.tile_q, schedule.tile_oc
+    rows, cols = schedule.acc_shape
+
+    def x_value(ci, i, j, qi):
+        # clamp the columns beyond the output to a valid input element, whose results are not stored
+        qq = qt * tq + qi
+        qq = if_then_else(qq < q, qq, q - 1)
+        return x[bn, g * wc + ci, pi * sx + i, qq * sy + j]
+
+    # unroll the rows of the register tile and leave the columns to the auto-vectorizer of backend compiler
+    with sb.for_loop('a', rows) as a:
+        with sb.for_loop('b', cols, vectorize=True) as b:
+            sb += BufferStoreStmt(acc, [a, b], convert(0.0, acc.type.scalar_type))
+    with sb.for_loop('ci', wc) as ci:
+        with sb.for_loop('i', kx) as i:
+            with sb.for_loop('j', ky) as j:
+                for a in range(rows):
+                    with sb.for_loop('b', cols) as b:
+                        if schedule.vector_dim == 'oc':
+                            value = x_value(ci, i, j, a) * packed_w[ci, i, j, b]
+                        else:
+                            value = x_value(ci, i, j, b) * packed_w[ci, i, j, a]
+                        sb += BufferStoreStmt(acc, [a, b], acc[a, b] + value)
+    with sb.for_loop('a', rows) as a:
+        with sb.for_loop('b', cols) as b:
+            qi, oi = (a, b) if schedule.vector_dim == 'oc' else (b, a)
+            sb += IfStmt(And(qt * tq + qi < q, oc_offset + oi < ogc), BufferStoreStmt(y, [bn, g * ogc + oc_offset + oi, pi, qt * tq + qi], acc[a, b]))
+    return sb.finish()
+
+
+def conv2d_gemm_image_transform_cpu_schedule(task: Conv2dGemmImageTransformTask) -> IRModule:
+    """
+    The im2col transform on cpu. Each worker produces the rows of gemm_x for an output row (g, n, p) of the
+    convolution, where the input rows used by them stay in cache, and the row of gemm_x is written contiguously.
+    """
+    ir_module = IRModule(task=task)
+    n, c, h, w = task.inputs[0].const_shape()
+    groups, _, gk = task.outputs[0].const_shape()
+    kx, ky = task.kernel
+    sx, sy = task.stride
+    p, q = (h - kx) // sx + 1, (w - ky) // sy + 1
+    gc = c // groups
+    num_rows = groups * n * p
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label='im2col') as fb:
+        sb = StmtBuilder()
+        params = params_from_task(task)
+        x, gemm_x = params
+        fb.extend_params(params)
+        with sb.for_loop('row', num_rows, parallel=num_rows > 1) as row:
+            with sb.lets(['g', 'ni', 'pi'], [row // (n * p), row // p % n, row % p]) as (g, ni, pi):
+                with sb.for_loop('qi', q) as qi:
+                    with sb.for_loop('ci', gc) as ci:
+                        with sb.for_loop('i', kx) as i:
+                            with sb.for_loop('j', ky, vectorize=True) as j:
+                                sb += BufferStoreStmt(gemm_x, [g, (ni * p + pi) * q + qi, (ci * kx + i) * ky + j],
+                                                      x[ni, g * gc + ci, pi * sx + i, qi * sy + j])
+        fb.set_body(sb.finish())
+    func = fb.get()
+    ir_module.add(func.name, func)
+    return ir_module
@@ -1,17 +1,23 @@
-from hidet.tos.ops.schedules.common import expand_loop
+from hidet.tos.ops.schedules.common import expand_loop, NotSupportedError
 from hidet.ir.dialects.lowlevel import VoidType
 from hidet.ir.expr import Var
 from hidet.ir.func import IRModule, Function
 from hidet.ir.task import Task
+from .auto_scheduler import cpu_auto_schedule
 
 
 def generic_cpu_schedule(task: Task, space_level: int = 0) -> IRModule:
-    assert len(task.outputs) == 0
-    func_param_vars = [Var(param.name, param.data_type) for param in task.parameters]
-    input_map = {p: v for p, v in zip(task.parameters, func_param_vars)}
+    try:
+        return cpu_auto_schedule(task)
+    except NotSupportedError:
+        # fall back to the naive loop nest
+        pass
+    assert len(task.outputs) == 1
+    func_param_vars = [Var(param.name, param.data_type) for param in task.inputs + task.outputs]
+    input_map = {p: v for p, v in zip(task.inputs + task.outputs, func_param_vars)}
     body, _, new_buffer_map = expand_loop(task.outputs[0], input_map)
     func_locals = list(new_buffer_map.values())
-    func = Function(task.name + '.host', kind='host_kernel', params=func_param_vars, body=body, ret_type=VoidType(),
+    func = Function(task.name + '_host', kind='host_kernel', params=func_param_vars, body=body, ret_type=VoidType(),
                     local_vars=func_locals, local_const_vars=[])
-    module = IRModule({func.name: func})
+    module = IRModule({func.name: func}, task=task)
     return module
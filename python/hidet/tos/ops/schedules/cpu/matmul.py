@@ -0,0 +1,289 @@
+from typing import List, Tuple, Union
+
+import os
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.expr import Var, And, if_then_else, convert, tensor_var
+from hidet.ir.func import IRModule
+from hidet.ir.layout import TaskLayout
+from hidet.ir.stmt import BufferStoreStmt, IfStmt
+from hidet.ir.type import ScalarType
+from hidet.ir.task import TaskContext
+from hidet.utils import cpu, prod
+from hidet.tos.ops.definitions.matmul.matmul import MatmulTask
+from hidet.tos.ops.schedules.resolve import resolve_ir_modules
+from hidet.tos.ops.schedules.measure import CpuMeasurer
+from hidet.tos.ops.schedules.common import params_from_task, Schedule, NotSupportedError
+from hidet.tos.ops.schedules.space import ScheduleSpace
+from .utils import round_up, ceil_div, balance, thread_grids, default_thread_grid
+
+
+"""
+pseudo code of the blocked matmul on cpu (for each batch)
+=========
+parallel for worker in thread_layout:
+    for each block (mc x nc) of C assigned to the worker by block_layout:
+        c_block = 0
+        for pc in range(K / kc):
+            B[pc * kc:, block_n:] -> packed_b    # nc / nr micro panels of kc x nr, each fits in L1
+            A[block_m:, pc * kc:] -> packed_a    # mc / mr micro panels of mr x kc, all fit in L2
+            for jr in range(nc / nr):
+                for ir in range(mc / mr):
+                    acc = 0                      # mr x nr registers
+                    for k in range(kc):
+                        acc += packed_a[ir, k, :] outer packed_b[jr, k, :]
+                    c_block[ir, jr] += acc
+        c_block -> C[block_m:, block_n:]
+"""
+
+
+class MatmulCpuSchedule(Schedule):
+    def __init__(
+            self,
+            task: MatmulTask,
+            micro_tile=(6, 16),
+            block_k=256,
+            block_m=96,
+            block_n=256,
+            thread_grid=None,
+            dtype='float32'
+    ):
+        batch_size, m_size, k_size, n_size = task.batch_size, task.m_size, task.k_size, task.n_size
+        mr, nr = micro_tile
+        self.check(block_m % mr == 0 and block_n % nr == 0, 'the block should be divisible by the micro tile')
+        self.micro_tile = tuple(micro_tile)
+        # balance the blocks of each dimension to reduce the computation on padding
+        self.block_k = balance(k_size, block_k, 1)
+        self.block_m = balance(m_size, block_m, mr)
+        self.block_n = balance(n_size, block_n, nr)
+        self.num_blocks = [batch_size, ceil_div(m_size, self.block_m), ceil_div(n_size, self.block_n)]
+        if thread_grid is None:
+            thread_grid = default_thread_grid(cpu.query_num_cores(), self.num_blocks)
+        self.thread_grid = tuple(thread_grid)
+        self.check(all(t <= b for t, b in zip(self.thread_grid, self.num_blocks)), 'there are threads without any block')
+
+        # derived task layouts
+        row_major = TaskLayout.row_major
+        full_layout = TaskLayout.full_layout
+        self.thread_layout = row_major(self.thread_grid)
+        self.block_layout = self.thread_layout * full_layout([ceil_div(b, t) for b, t in zip(self.num_blocks, self.thread_grid)])
+        # the micro tiles in a block: the micro panel of packed b (in L1) is reused by all the micro panels of packed a
+        self.micro_layout = full_layout([1, self.block_n // nr]) * full_layout([self.block_m // mr, 1])
+
+        # derived constants
+        nbytes = ScalarType(dtype).nbytes()
+        self.packed_a_shape = [self.block_m // mr, self.block_k, mr]
+        self.packed_b_shape = [self.block_n // nr, self.block_k, nr]
+        self.c_block_shape = [self.block_m, self.block_n]
+        self.l1_bytes = (mr + nr) * self.block_k * nbytes
+        self.l2_bytes = self.block_m * self.block_k * nbytes
+        self.buffer_bytes = (prod(self.packed_a_shape) + prod(self.packed_b_shape) + prod(self.c_block_shape)) * nbytes
+        self.num_threads = self.thread_layout.num_workers
+
+    def keys(self) -> List[Tuple[str, Union[int, float, str]]]:
+        return [
+            ('mr', self.micro_tile[0]),
+            ('nr', self.micro_tile[1]),
+            ('kc', self.block_k),
+            ('mc', self.block_m),
+            ('nc', self.block_n),
+            ('tb', self.thread_grid[0]),
+            ('tm', self.thread_grid[1]),
+            ('tn', self.thread_grid[2])
+        ]
+
+    def derived_keys(self) -> List[Tuple[str, Union[int, float, str]]]:
+        return [
+            ('l1', self.l1_bytes),
+            ('l2', self.l2_bytes),
+            ('buffer', self.buffer_bytes),
+            ('threads', self.num_threads)
+        ]
+
+    def __str__(self):
+        return 'micro_{}x{}_block_{}x{}x{}_threads_{}x{}x{}'.format(*self.micro_tile, self.block_m, self.block_n, self.block_k, *self.thread_grid)
+
+    def check(self, cond, msg: str = ""):
+        if not cond:
+            raise NotSupportedError(self, msg)
+
+    @staticmethod
+    def space(space_level: int, task: MatmulTask, dtype: str = 'float32') -> ScheduleSpace:
+        space = ScheduleSpace('batched_matmul_cpu_space_{}'.format(space_level))
+        if space_level == 1:
+            space.axis('micro_tile', [[4, 16], [6, 16], [8, 8]])
+            space.axis('block_k', [128, 256])
+            space.axis('block_m', [48, 64, 96])
+            space.axis('block_n', [128, 256])
+        elif space_level == 2:
+            space.axis('micro_tile', [[4, 8], [4, 16], [6, 16], [8, 8], [8, 16], [4, 32]])
+            space.axis('block_k', [64, 128, 256, 384, 512])
+            space.axis('block_m', [32, 48, 64, 96, 128, 192])
+            space.axis('block_n', [64, 128, 256, 512])
+        else:
+            raise NotImplementedError()
+        space.axis('thread_grid', thread_grids(cpu.query_num_cores(), rank=3))
+        nbytes = ScalarType(dtype).nbytes()
+        max_accumulators = 128      # 16 vector registers of 256 bits
+        max_buffer_bytes = 1024 * 1024   # the packed buffers are allocated on the stack of each thread
+        space.constraint(lambda micro_tile: micro_tile[0] * micro_tile[1] <= max_accumulators, 'the accumulators of micro tile exceed the vector registers')
+        space.derive('kc', lambda block_k: balance(task.k_size, block_k, 1))
+        space.constraint(lambda micro_tile, kc: (micro_tile[0] + micro_tile[1]) * kc * nbytes <= cpu.query_cache_bytes(1),
+                         'the micro panels of a and b exceed the l1 cache')
+        space.constraint(lambda micro_tile, block_m: block_m % micro_tile[0] == 0, 'block_m should be divisible by the micro tile')
+        space.derive('mc', lambda micro_tile, block_m: balance(task.m_size, block_m, micro_tile[0]))
+        space.constraint(lambda mc, kc: mc * kc * nbytes <= cpu.query_cache_bytes(2) // 2, 'the packed block of a exceeds half of the l2 cache')
+        space.constraint(lambda micro_tile, block_n: block_n % micro_tile[1] == 0, 'block_n should be divisible by the micro tile')
+        space.derive('nc', lambda micro_tile, block_n: balance(task.n_size, block_n, micro_tile[1]))
+        space.constraint(lambda mc, nc, kc: (mc * kc + nc * kc + mc * nc) * nbytes <= max_buffer_bytes, 'the packed buffers exceed the limit')
+        space.constraint(lambda mc, nc, thread_grid: all(t <= b for t, b in zip(thread_grid, [task.batch_size, ceil_div(task.m_size, mc), ceil_div(task.n_size, nc)])),
+                         'there are threads without any block')
+        return space
+
+    @staticmethod
+    def schedules(task: MatmulTask, space_level: int = 0, verbose: bool = False):
+        if space_level == 0:
+            return [MatmulCpuSchedule(task)]
+        space = MatmulCpuSchedule.space(space_level, task)
+        # the blocks balanced for the task may coincide, keep the first one of each
+        settings = {}
+        for point in space.enumerate():
+            key = (tuple(point['micro_tile']), point['kc'], point['mc'], point['nc'], point['thread_grid'])
+            if key not in settings:
+                settings[key] = MatmulCpuSchedule(
+                    task,
+                    micro_tile=point['micro_tile'],
+                    block_k=point['kc'],
+                    block_m=point['mc'],
+                    block_n=point['nc'],
+                    thread_grid=point['thread_grid']
+                )
+        if verbose:
+            print(space.report())
+        return list(settings.values())
+
+
+def batched_matmul_cpu_schedule(task: MatmulTask) -> IRModule:
+    ctx = TaskContext.current()
+    all_schedules = MatmulCpuSchedule.schedules(task, space_level=ctx.space_level, verbose=True)
+    if len(all_schedules) == 1:
+        return batched_matmul_cpu_with_given_schedule(task, all_schedules[0])
+    default_resolve_out_dir = os.path.join('./outs/resolve', task.name, 'batched_matmul_cpu_{}x{}x{}x{}'.format(task.batch_size, task.m_size, task.k_size, task.n_size))
+    resolve_out_dir = ctx.resolve_out_dir if ctx.resolve_out_dir else default_resolve_out_dir
+    ir_modules = []
+    for schedule in all_schedules:
+        ir_modules.append(batched_matmul_cpu_with_given_schedule(task, schedule))
+    return resolve_ir_modules(
+        ir_modules=ir_modules,
+        schedules=all_schedules,
+        output_dir=resolve_out_dir,
+        parallel=True,
+        verbose=True,
+        measurer=ctx.measurer if ctx.measurer is not None else CpuMeasurer()
+    )
+
+
+def batched_matmul_cpu_with_given_schedule(task: MatmulTask, schedule: MatmulCpuSchedule) -> IRModule:
+    ir_module = IRModule(task=task)
+    sch = schedule
+
+    a_dtype = task.inputs[0].data_type.scalar_type
+    b_dtype = task.inputs[1].data_type.scalar_type
+    c_dtype = task.outputs[0].data_type.scalar_type
+
+    batch_size = task.batch_size
+    m_size, k_size, n_size = task.m_size, task.k_size, task.n_size
+    mr, nr = sch.micro_tile
+    k_tiles = ceil_div(k_size, sch.block_k)
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label=str(sch)) as fb:
+        sb = StmtBuilder()
+
+        # declare params
+        params = params_from_task(task)
+        a, b, c = params
+        fb.extend_params(params)
+
+        # declare thread-private buffers
+        packed_a = tensor_var('packed_a', shape=sch.packed_a_shape, scope='register', dtype=a_dtype)
+        packed_b = tensor_var('packed_b', shape=sch.packed_b_shape, scope='register', dtype=b_dtype)
+        c_block = tensor_var('c_block', shape=sch.c_block_shape, scope='register', dtype=c_dtype)
+        acc = tensor_var('acc', shape=[mr, nr], scope='register', dtype=c_dtype)
+        fb.extend_local_vars([packed_a, packed_b, c_block, acc])
+
+        with sb.for_loop('worker', sch.num_threads, parallel=True) as worker:
+            with sb.for_task(worker, sch.block_layout, unroll_limit=1) as [(bb, bm, bn)]:
+                with sb.if_then(And.join(bb < batch_size, bm < sch.num_blocks[1], bn < sch.num_blocks[2])):
+                    offset_m, offset_n = bm * sch.block_m, bn * sch.block_n
+                    sb += fill(c_block, convert(0.0, c_dtype))
+                    with sb.for_loop('pc', k_tiles) as pc:
+                        offset_k = pc * sch.block_k
+                        sb += pack(packed_b, lambda k, j: b[bb, offset_k + k, offset_n + j], default_value=convert(0.0, b_dtype),
+                                   predicate=lambda k, j: And(offset_k + k < k_size, offset_n + j < n_size), panel_dim=1)
+                        sb += pack(packed_a, lambda i, k: a[bb, offset_m + i, offset_k + k], default_value=convert(0.0, a_dtype),
+                                   predicate=lambda i, k: And(offset_m + i < m_size, offset_k + k < k_size), panel_dim=0)
+                        with sb.for_task(convert(0), sch.micro_layout, unroll_limit=1) as [(ir, jr)]:
+                            sb += micro_kernel(packed_a, packed_b, c_block, acc, ir, jr, sch)
+                    sb += store(c_block, lambda i, j: (bb, offset_m + i, offset_n + j), c,
+                                predicate=lambda i, j: And(offset_m + i < m_size, offset_n + j < n_size))
+        # set body
+        fb.set_body(sb.finish())
+
+    func = fb.get()
+    ir_module.add(func.name, func)
+    return ir_module
+
+
+def fill(dst: Var, value):
+    sb = StmtBuilder()
+    rows, cols = dst.type.shape
+    with sb.for_loop('i', rows) as i:
+        with sb.for_loop('j', cols, vectorize=True) as j:
+            sb += BufferStoreStmt(dst, [i, j], value)
+    return sb.finish()
+
+
+def pack(dst: Var, src, default_value, predicate, panel_dim: int):
+    # pack the src block into the micro panels of dst, dst[p, k, q] = src(p * width + q, k) when panel_dim == 0 or
+    # src(k, p * width + q) when panel_dim == 1, where width is the width of each micro panel
+    sb = StmtBuilder()
+    num_panels, depth, width = dst.type.shape
+    with sb.for_loop('p', num_panels) as p:
+        with sb.for_loop('k', depth) as k:
+            with sb.for_loop('q', width, vectorize=panel_dim == 1) as q:
+                indices = [p * width + q, k] if panel_dim == 0 else [k, p * width + q]
+                sb += BufferStoreStmt(dst, [p, k, q], if_then_else(predicate(*indices), src(*indices), default_value))
+    return sb.finish()
+
+
+def micro_kernel(packed_a: Var, packed_b: Var, c_block: Var, acc: Var, ir, jr, schedule: MatmulCpuSchedule):
+    sb = StmtBuilder()
+    mr, nr = schedule.micro_tile
+    sb += fill(acc, convert(0.0, acc.type.scalar_type))
+    with sb.for_loop('k', schedule.block_k) as k:
+        # unroll the rows and leave the columns to the auto-vectorizer of backend compiler, which keeps the
+        # accumulators in vector registers during the loop over k
+        for i in range(mr):
+            with sb.for_loop('j', nr) as j:
+                sb += BufferStoreStmt(acc, [i, j], acc[i, j] + packed_a[ir, k, i] * packed_b[jr, k, j])
+    with sb.for_loop('i', mr) as i:
+        with sb.for_loop('j', nr, vectorize=True) as j:
+            row, col = ir * mr + i, jr * nr + j
+            sb += BufferStoreStmt(c_block, [row, col], c_block[row, col] + acc[i, j])
+    return sb.finish()
+
+
+def store(src: Var, dst_indices, dst: Var, predicate):
+    sb = StmtBuilder()
+    rows, cols = src.type.shape
+    with sb.for_loop('i', rows) as i:
+        with sb.for_loop('j', cols, vectorize=True) as j:
+            sb += IfStmt(predicate(i, j), BufferStoreStmt(dst, list(dst_indices(i, j)), src[i, j]))
+    return sb.finish()
+
+
+if __name__ == '__main__':
+    from hidet.tos import symbol
+    from hidet.tos.ops.definitions.matmul.matmul import matmul
+    task = matmul(symbol([1, 2048, 2048], device='cpu'), symbol([1, 2048, 2048], device='cpu'), algo='direct').op.task
+    for sch in MatmulCpuSchedule.schedules(task, space_level=2, verbose=True):
+        print(sch)
@@ -0,0 +1,108 @@
+from typing import List
+
+from hidet.ir import IRModule
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.expr import Var, Expr, tensor_var, scalar_var, convert, cast
+from hidet.ir.stmt import BufferStoreStmt
+from hidet.ir.utils import index_deserialize
+from hidet.ir import primitives as prim
+from hidet.tos.ops.definitions.norm import NormalizeTask
+from hidet.tos.ops.schedules.common import params_from_task, merge_indices
+from hidet.utils import prod
+from .utils import loop_nest
+
+
+"""
+pseudo code of the normalization on cpu, with the mean and variance computed by welford's algorithm in a single pass.
+Each vector lane keeps the count, mean and sum of squared differences (m2) of the elements it has visited.
+=========
+parallel for each row:
+    count[lanes], mean[lanes], m2[lanes] = 0, 0, 0
+    for v in x[row, ...] (lane l takes the elements l, l + lanes, ... of the last dimension):
+        count[l] += 1
+        delta = v - mean[l]
+        mean[l] += delta / count[l]
+        m2[l] += delta * (v - mean[l])
+    count, mean, m2 = combine the statistics of all lanes
+    y[row, ...] = (x[row, ...] - mean) / sqrt(m2 / count + epsilon)
+"""
+
+
+def welford_update(sb: StmtBuilder, count: Var, mean: Var, m2: Var, lane: Expr, value: Expr, dtype):
+    # the statistics are updated from their old values, in the order of m2, mean and count
+    one = convert(1.0, dtype)
+    delta = value - mean[lane]
+    sb += BufferStoreStmt(m2, [lane], m2[lane] + delta * (delta - delta / (count[lane] + one)))
+    sb += BufferStoreStmt(mean, [lane], mean[lane] + delta / (count[lane] + one))
+    sb += BufferStoreStmt(count, [lane], count[lane] + one)
+
+
+def welford_combine_lanes(sb: StmtBuilder, count: Var, mean: Var, m2: Var, num_lanes: int, dtype):
+    """
+    Combine the statistics of all lanes into the first lane with the parallel algorithm of chan et al.
+    """
+    with sb.for_loop('l', num_lanes - 1) as l:
+        na, nb = count[0], count[l + 1]
+        delta = mean[l + 1] - mean[0]
+        with sb.if_then(nb > convert(0.0, dtype)):
+            sb += BufferStoreStmt(m2, [0], m2[0] + m2[l + 1] + delta * delta * na * nb / (na + nb))
+            sb += BufferStoreStmt(mean, [0], mean[0] + delta * nb / (na + nb))
+            sb += BufferStoreStmt(count, [0], na + nb)
+
+
+def normalize_cpu_schedule(task: NormalizeTask, vector_width: int = 8) -> IRModule:
+    shape: List[int] = task.inputs[0].const_shape()
+    dims = sorted(task.dims)
+    if len(shape) - 1 not in dims:
+        # the last dimension is not normalized, use the generic schedule
+        return NotImplemented
+    grid_shape = [v for i, v in enumerate(shape) if i not in dims]
+    reduce_shape = [shape[i] for i in dims]
+    num_rows = prod(grid_shape)
+    extent = shape[-1]
+    main_extent, tail_extent = extent // vector_width * vector_width, extent % vector_width
+
+    y_dtype = task.outputs[0].data_type.scalar_type
+    dtype = task.attributes['accumulate_dtype']
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label='welford normalize') as fb:
+        # params
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        # thread-private statistics, one for each vector lane
+        count = tensor_var('count', shape=[vector_width], scope='register', dtype=dtype)
+        mean = tensor_var('mean', shape=[vector_width], scope='register', dtype=dtype)
+        m2 = tensor_var('m2', shape=[vector_width], scope='register', dtype=dtype)
+        fb.extend_local_vars([count, mean, m2])
+
+        # body
+        sb = StmtBuilder()
+        with sb.for_loop('row', num_rows, parallel=num_rows > 1) as row:
+            grid_indices = index_deserialize(row, grid_shape)
+            with sb.for_loop('l', vector_width, vectorize=True) as l:
+                for stat in [count, mean, m2]:
+                    sb += BufferStoreStmt(stat, [l], convert(0.0, dtype))
+            with loop_nest(sb, 'r', reduce_shape[:-1]) as reduce_indices:
+                if main_extent > 0:
+                    with sb.for_loop('k', main_extent // vector_width) as k:
+                        with sb.for_loop('l', vector_width, vectorize=True) as l:
+                            value = x[merge_indices(grid_indices, reduce_indices + [k * vector_width + l], dims)]
+                            welford_update(sb, count, mean, m2, l, value, dtype)
+                if tail_extent > 0:
+                    with sb.for_loop('l', tail_extent) as l:
+                        value = x[merge_indices(grid_indices, reduce_indices + [main_extent + l], dims)]
+                        welford_update(sb, count, mean, m2, l, value, dtype)
+            welford_combine_lanes(sb, count, mean, m2, vector_width, dtype)
+
+            # write back
+            with sb.let(scalar_var('rstd', dtype), convert(1.0, dtype) / prim.sqrt(m2[0] / count[0] + task.epsilon)) as rstd:
+                with loop_nest(sb, 'r', reduce_shape[:-1]) as reduce_indices:
+                    with sb.for_loop('k', extent, vectorize=True) as k:
+                        indices = merge_indices(grid_indices, reduce_indices + [k], dims)
+                        sb += BufferStoreStmt(y, indices, cast((x[indices] - mean[0]) * rstd, y_dtype))
+
+        fb.set_body(sb.finish())
+    func = fb.get()
+    return IRModule(funcs={func.name: func}, task=task)
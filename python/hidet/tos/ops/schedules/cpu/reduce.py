@@ -0,0 +1,155 @@
+import functools
+from typing import List
+
+from hidet.ir import IRModule
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.expr import Expr, tensor_var, if_then_else, convert, cast
+from hidet.ir.dialects.compute import ReduceCompute
+from hidet.ir.stmt import BufferStoreStmt, IfStmt
+from hidet.ir.utils import index_deserialize
+from hidet.tos.ops.definitions.reduce import ReduceTask
+from hidet.tos.ops.schedules.common import params_from_task, merge_indices
+from hidet.utils import prod
+from .utils import ceil_div, loop_nest
+
+
+"""
+pseudo code of the reduction on cpu, where the vector lanes are laid along the last (contiguous) dimension.
+=========
+when the last dimension is reduced (row reduction):
+    parallel for each row of the remaining dimensions:
+        acc[lanes] = init
+        for other reduce indices:
+            for k in range(extent / lanes):
+                acc[:] = combine(acc[:], x[row, ..., k * lanes:(k + 1) * lanes])
+            acc[0:tail] = combine(acc[0:tail], x[row, ..., extent - tail:])
+        y[row] = finalize(combine(acc[0], ..., acc[lanes - 1]))
+
+when the last dimension is not reduced (column reduction):
+    parallel for each row of the remaining dimensions (except the last one) and column block:
+        acc[lanes] = init
+        for reduce indices:
+            acc[:] = combine(acc[:], x[row, ..., col * lanes: (col + 1) * lanes])
+        y[row, col * lanes: (col + 1) * lanes] = finalize(acc[:])
+"""
+
+
+def reduce_cpu_schedule(task: ReduceTask, vector_width: int = 8) -> IRModule:
+    shape: List[int] = task.inputs[0].const_shape()
+    if len(shape) - 1 in task.dims:
+        return reduce_rows_cpu_schedule(task, vector_width)
+    else:
+        return reduce_columns_cpu_schedule(task, vector_width)
+
+
+def reduce_rows_cpu_schedule(task: ReduceTask, vector_width: int) -> IRModule:
+    shape: List[int] = task.inputs[0].const_shape()
+    dims = sorted(task.dims)
+    grid_shape = [v for i, v in enumerate(shape) if i not in dims]
+    reduce_shape = [shape[i] for i in dims]
+    num_rows = prod(grid_shape)
+    extent = shape[-1]
+    main_extent, tail_extent = extent // vector_width * vector_width, extent % vector_width
+
+    y_dtype = task.outputs[0].data_type.scalar_type
+    accumulate_dtype = task.attributes['accumulate_dtype']
+    reduce_type = task.reduce_type
+    init_value = ReduceCompute.init_const(reduce_type=reduce_type, data_type=accumulate_dtype)
+    combine = functools.partial(ReduceCompute.combine, reduce_type)
+    finalize = functools.partial(ReduceCompute.finalize, reduce_type)
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label='reduce rows') as fb:
+        # params
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        # thread-private accumulators, one for each vector lane
+        acc = tensor_var('acc', shape=[vector_width], scope='register', dtype=accumulate_dtype)
+        fb.extend_local_vars([acc])
+
+        # body
+        sb = StmtBuilder()
+        with sb.for_loop('row', num_rows, parallel=num_rows > 1) as row:
+            grid_indices = index_deserialize(row, grid_shape)
+            with sb.for_loop('l', vector_width, vectorize=True) as l:
+                sb += BufferStoreStmt(acc, [l], init_value)
+            with loop_nest(sb, 'r', reduce_shape[:-1]) as reduce_indices:
+                def accumulate(col: Expr, lane: Expr):
+                    x_indices = merge_indices(grid_indices, reduce_indices + [col], reduce_dims=dims)
+                    return BufferStoreStmt(acc, [lane], combine(acc[lane], x[x_indices]))
+
+                if main_extent > 0:
+                    with sb.for_loop('k', main_extent // vector_width) as k:
+                        with sb.for_loop('l', vector_width, vectorize=True) as l:
+                            sb += accumulate(k * vector_width + l, l)
+                if tail_extent > 0:
+                    with sb.for_loop('l', tail_extent) as l:
+                        sb += accumulate(main_extent + l, l)
+            with sb.for_loop('l', vector_width - 1) as l:
+                sb += BufferStoreStmt(acc, [0], combine(acc[0], acc[l + 1]))
+
+            # write back
+            if task.keep_dim:
+                output_indices = merge_indices(grid_indices, [convert(0) for _ in dims], reduce_dims=dims)
+            else:
+                output_indices = grid_indices
+            sb += BufferStoreStmt(y, output_indices, cast(finalize(acc=acc[0], size=prod(reduce_shape)), y_dtype))
+
+        fb.set_body(sb.finish())
+    func = fb.get()
+    return IRModule(funcs={func.name: func}, task=task)
+
+
+def reduce_columns_cpu_schedule(task: ReduceTask, vector_width: int) -> IRModule:
+    shape: List[int] = task.inputs[0].const_shape()
+    dims = sorted(task.dims)
+    grid_shape = [v for i, v in enumerate(shape) if i not in dims]
+    reduce_shape = [shape[i] for i in dims]
+    extent = shape[-1]
+    num_cols = ceil_div(extent, vector_width)
+    num_tasks = prod(grid_shape[:-1]) * num_cols
+
+    y_dtype = task.outputs[0].data_type.scalar_type
+    accumulate_dtype = task.attributes['accumulate_dtype']
+    reduce_type = task.reduce_type
+    init_value = ReduceCompute.init_const(reduce_type=reduce_type, data_type=accumulate_dtype)
+    combine = functools.partial(ReduceCompute.combine, reduce_type)
+    finalize = functools.partial(ReduceCompute.finalize, reduce_type)
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label='reduce columns') as fb:
+        # params
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        # thread-private accumulators, one for each column in the block
+        acc = tensor_var('acc', shape=[vector_width], scope='register', dtype=accumulate_dtype)
+        fb.extend_local_vars([acc])
+
+        # body
+        sb = StmtBuilder()
+        with sb.for_loop('t', num_tasks, parallel=num_tasks > 1) as t:
+            row_indices = index_deserialize(t // num_cols, grid_shape[:-1])
+            with sb.let('c0', t % num_cols * vector_width) as c0:
+                with sb.for_loop('l', vector_width, vectorize=True) as l:
+                    sb += BufferStoreStmt(acc, [l], init_value)
+                with loop_nest(sb, 'r', reduce_shape) as reduce_indices:
+                    with sb.for_loop('l', vector_width, vectorize=True) as l:
+                        # clamp the column of the last block to keep the loop branch-free, the result is discarded
+                        col = if_then_else(c0 + l < extent, c0 + l, extent - 1)
+                        x_indices = merge_indices(row_indices + [col], reduce_indices, reduce_dims=dims)
+                        sb += BufferStoreStmt(acc, [l], combine(acc[l], x[x_indices]))
+
+                # write back
+                with sb.for_loop('l', vector_width) as l:
+                    if task.keep_dim:
+                        output_indices = merge_indices(row_indices + [c0 + l], [convert(0) for _ in dims], reduce_dims=dims)
+                    else:
+                        output_indices = row_indices + [c0 + l]
+                    value = cast(finalize(acc=acc[l], size=prod(reduce_shape)), y_dtype)
+                    sb += IfStmt(c0 + l < extent, BufferStoreStmt(y, output_indices, value))
+
+        fb.set_body(sb.finish())
+    func = fb.get()
+    return IRModule(funcs={func.name: func}, task=task)
@@ -0,0 +1,160 @@
+from typing import List
+
+from hidet.ir import IRModule
+from hidet.ir.builders import FunctionBuilder, StmtBuilder
+from hidet.ir.expr import Var, Expr, tensor_var, scalar_var, if_then_else, convert, cast
+from hidet.ir.dialects.compute import ReduceCompute
+from hidet.ir.stmt import BufferStoreStmt, IfStmt
+from hidet.ir.utils import index_deserialize
+from hidet.ir import primitives as prim
+from hidet.tos.ops.definitions.softmax import SoftmaxTask
+from hidet.tos.ops.schedules.common import params_from_task
+from hidet.utils import prod
+from .utils import ceil_div
+
+
+"""
+pseudo code of the online softmax on cpu. Each vector lane keeps a running maximum m and a running sum s of
+exp(v - m), which are rescaled when the maximum grows, so that the input is read only once for the statistics.
+=========
+when the softmax axis is the last dimension:
+    parallel for each row:
+        m[lanes], s[lanes] = -inf, 0
+        for v in x[row, :] (lane l takes the elements l, l + lanes, ...):
+            m[l], s[l] = max(m[l], v), s[l] * exp(m[l] - max(m[l], v)) + exp(v - max(m[l], v))
+        m, s = combine the (m[l], s[l]) of all lanes
+        y[row, :] = exp(x[row, :] - m) / s
+
+otherwise, each lane takes a column of the dimensions after the axis:
+    parallel for each row of the dimensions before the axis and column block:
+        m[lanes], s[lanes] = -inf, 0
+        for k in range(axis extent):
+            update (m[:], s[:]) with x[row, k, col * lanes: (col + 1) * lanes]
+        for k in range(axis extent):
+            y[row, k, col * lanes: (col + 1) * lanes] = exp(x[row, k, col * lanes:] - m[:]) / s[:]
+"""
+
+
+def online_update(sb: StmtBuilder, m: Var, s: Var, lane: Expr, value: Expr, dtype):
+    """
+    Update the running maximum m and running sum s of a lane with given value. One of the two exponentials in the
+    update is exp(0) = 1, thus only exp(-|v - m|) is computed.
+    """
+    with sb.let(scalar_var('v', dtype), value) as v:
+        with sb.let(scalar_var('e', dtype), prim.exp(if_then_else(v > m[lane], m[lane] - v, v - m[lane]))) as e:
+            sb += BufferStoreStmt(s, [lane], if_then_else(v > m[lane], s[lane] * e + convert(1.0, dtype), s[lane] + e))
+            sb += BufferStoreStmt(m, [lane], if_then_else(v > m[lane], v, m[lane]))
+
+
+def combine_lanes(sb: StmtBuilder, m: Var, s: Var, num_lanes: int, dtype):
+    """
+    Combine the running maximum and sum of all lanes into the first lane.
+    """
+    with sb.for_loop('l', num_lanes - 1) as l:
+        with sb.let(scalar_var('mx', dtype), if_then_else(m[l + 1] > m[0], m[l + 1], m[0])) as mx:
+            sb += BufferStoreStmt(s, [0], s[0] * prim.exp(m[0] - mx) + s[l + 1] * prim.exp(m[l + 1] - mx))
+            sb += BufferStoreStmt(m, [0], mx)
+
+
+def softmax_cpu_schedule(task: SoftmaxTask, vector_width: int = 8) -> IRModule:
+    if task.axis == len(task.x_shape) - 1:
+        return softmax_rows_cpu_schedule(task, vector_width)
+    else:
+        return softmax_columns_cpu_schedule(task, vector_width)
+
+
+def softmax_rows_cpu_schedule(task: SoftmaxTask, vector_width: int) -> IRModule:
+    shape: List[int] = task.x_shape
+    extent = shape[-1]
+    num_rows = prod(shape[:-1])
+    main_extent, tail_extent = extent // vector_width * vector_width, extent % vector_width
+
+    y_dtype = task.outputs[0].data_type.scalar_type
+    dtype = 'float32'
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label='online softmax rows') as fb:
+        # params
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        # thread-private running maximum and sum, one for each vector lane
+        m = tensor_var('m', shape=[vector_width], scope='register', dtype=dtype)
+        s = tensor_var('s', shape=[vector_width], scope='register', dtype=dtype)
+        fb.extend_local_vars([m, s])
+
+        # body
+        sb = StmtBuilder()
+        with sb.for_loop('row', num_rows, parallel=num_rows > 1) as row:
+            row_indices = index_deserialize(row, shape[:-1])
+            with sb.for_loop('l', vector_width, vectorize=True) as l:
+                sb += BufferStoreStmt(m, [l], ReduceCompute.init_const('max', dtype))
+                sb += BufferStoreStmt(s, [l], convert(0.0, dtype))
+            if main_extent > 0:
+                with sb.for_loop('k', main_extent // vector_width) as k:
+                    with sb.for_loop('l', vector_width, vectorize=True) as l:
+                        online_update(sb, m, s, l, x[row_indices + [k * vector_width + l]], dtype)
+            if tail_extent > 0:
+                with sb.for_loop('l', tail_extent) as l:
+                    online_update(sb, m, s, l, x[row_indices + [main_extent + l]], dtype)
+            combine_lanes(sb, m, s, vector_width, dtype)
+
+            # write back
+            with sb.let(scalar_var('inv_sum', dtype), convert(1.0, dtype) / s[0]) as inv_sum:
+                with sb.for_loop('k', extent, vectorize=True) as k:
+                    sb += BufferStoreStmt(y, row_indices + [k], cast(prim.exp(x[row_indices + [k]] - m[0]) * inv_sum, y_dtype))
+
+        fb.set_body(sb.finish())
+    func = fb.get()
+    return IRModule(funcs={func.name: func}, task=task)
+
+
+def softmax_columns_cpu_schedule(task: SoftmaxTask, vector_width: int) -> IRModule:
+    shape: List[int] = task.x_shape
+    axis = task.axis
+    extent = shape[axis]
+    inner_shape = shape[axis + 1:]
+    inner_extent = prod(inner_shape)
+    num_cols = ceil_div(inner_extent, vector_width)
+    num_tasks = prod(shape[:axis]) * num_cols
+
+    y_dtype = task.outputs[0].data_type.scalar_type
+    dtype = 'float32'
+
+    with FunctionBuilder(name=task.name + '_host', kind='host_kernel', label='online softmax columns') as fb:
+        # params
+        params = params_from_task(task)
+        x, y = params
+        fb.extend_params(params)
+
+        # thread-private running maximum and sum, one for each column in the block
+        m = tensor_var('m', shape=[vector_width], scope='register', dtype=dtype)
+        s = tensor_var('s', shape=[vector_width], scope='register', dtype=dtype)
+        fb.extend_local_vars([m, s])
+
+        # body
+        sb = StmtBuilder()
+        with sb.for_loop('t', num_tasks, parallel=num_tasks > 1) as t:
+            outer_indices = index_deserialize(t // num_cols, shape[:axis])
+            with sb.let('c0', t % num_cols * vector_width) as c0:
+                with sb.for_loop('l', vector_width, vectorize=True) as l:
+                    sb += BufferStoreStmt(m, [l], ReduceCompute.init_const('max', dtype))
+                    sb += BufferStoreStmt(s, [l], convert(0.0, dtype))
+                with sb.for_loop('k', extent) as k:
+                    with sb.for_loop('l', vector_width, vectorize=True) as l:
+                        # clamp the column of the last block to keep the loop branch-free, the result is discarded
+                        col = if_then_else(c0 + l < inner_extent, c0 + l, inner_extent - 1)
+                        online_update(sb, m, s, l, x[outer_indices + [k] + index_deserialize(col, inner_shape)], dtype)
+                with sb.for_loop('l', vector_width, vectorize=True) as l:
+                    sb += BufferStoreStmt(s, [l], convert(1.0, dtype) / s[l])
+
+                # write back
+                with sb.for_loop('k', extent) as k:
+                    with sb.for_loop('l', vector_width) as l:
+                        indices = outer_indices + [k] + index_deserialize(c0 + l, inner_shape)
+                        value = cast(prim.exp(x[indices] - m[l]) * s[l], y_dtype)
+                        sb += IfStmt(c0 + l < inner_extent, BufferStoreStmt(y, indices, value))
+
+        fb.set_body(sb.finish())
+    func = fb.get()
+    return IRModule(funcs={func.name: func}, task=task)
@@ -0,0 +1,61 @@
+from typing import List, Tuple, Sequence
+from contextlib import contextmanager, ExitStack
+
+from hidet.ir.builders import StmtBuilder
+
+
+def round_up(a: int, b: int) -> int:
+    return (a + b - 1) // b * b
+
+
+def ceil_div(a: int, b: int) -> int:
+    return (a + b - 1) // b
+
+
+def balance(extent: int, block: int, multiple_of: int = 1) -> int:
+    """
+    Get the smallest block size (a multiple of given number) that covers the extent with the same number of blocks
+    as given block size, which reduces the computation on the padding of the last block.
+    """
+    return min(block, round_up(ceil_div(extent, ceil_div(extent, block)), multiple_of))
+
+
+def thread_grids(num_threads: int, rank: int) -> List[Tuple[int, ...]]:
+    """
+    Get all the ways to distribute the threads to the dimensions of a block grid with given rank.
+    """
+    if rank == 1:
+        return [(num_threads,)]
+    grids = []
+    for t in range(1, num_threads + 1):
+        if num_threads % t == 0:
+            grids.extend((t,) + grid for grid in thread_grids(num_threads // t, rank - 1))
+    return grids
+
+
+def default_thread_grid(num_threads: int, num_blocks: List[int]) -> Tuple[int, ...]:
+    """
+    Distribute the threads to the dimensions of a block grid: the prime factors of the number of threads are assigned
+    greedily to the dimension with the most blocks per thread.
+    """
+    grid = [1 for _ in num_blocks]
+    factors = []
+    n, p = num_threads, 2
+    while n > 1:
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+        p += 1
+    for factor in reversed(factors):
+        dim = max(range(len(num_blocks)), key=lambda i: (num_blocks[i] / grid[i], -i))
+        grid[dim] *= factor
+    return tuple(grid)
+
+
+@contextmanager
+def loop_nest(sb: StmtBuilder, hint: str, shape: Sequence[int]):
+    """
+    Open a nest of for loops with given extents, and get the loop variables (an empty list when shape is empty).
+    """
+    with ExitStack() as stack:
+        yield [stack.enter_context(sb.for_loop(hint, extent)) for extent in shape]
@@ -16,6 +16,7 @@ from hidet.utils import cuda, factor, prod
 from hidet.tos.ops.definitions.matmul.matmul import MatmulTask
 from hidet.tos.ops.schedules.resolve import resolve_ir_modules
 from hidet.tos.ops.schedules.common import params_from_task, Schedule, NotSupportedError
+from hidet.tos.ops.schedules.space import ScheduleSpace
 
 
 """
@@ -213,57 +214,100 @@ class MatmulSchedule(Schedule):
             raise NotSupportedError(self, msg)
 
     @staticmethod
-    def schedules(space_level: int = 0):
-        settings = []
-        if space_level == 0:
-            settings.append(MatmulSchedule())
-        elif space_level == 1:
-            for inner_m, inner_n in [[4, 4], [4, 8], [8, 4]]:
-                for outer_m, outer_n in [[1, 1], [1, 2], [2, 1], [2, 2]]:
-                    for block_warps_k, warp_k in [[8, 1]]:
-                        for block_warps_m, block_warps_n in [[1, 1], [1, 2], [2, 2], [2, 4]]:
-                            for name, atom_layout in [('row_4x8', TaskLayout.row_major((4, 8)))]:
-                                try:
-                                    settings.append(MatmulSchedule(
-                                        block_warps_k=block_warps_k,
-                                        warp_k=warp_k,
-                                        block_warps=[block_warps_m, block_warps_n],
-                                        warp_outer=[outer_m, outer_n],
-                                        atom_layout=atom_layout,
-                                        atom_layout_name=name,
-                                        warp_inner=[inner_m, inner_n]
-                                    ))
-                                except NotSupportedError as e:
-                                    pass
+    def space(space_level: int) -> ScheduleSpace:
+        space = ScheduleSpace('batched_matmul_wb_space_{}'.format(space_level))
+        if space_level == 1:
+            space.axis('warp_inner', [[4, 4], [4, 8], [8, 4]])
+            space.axis('warp_outer', [[1, 1], [1, 2], [2, 1], [2, 2]])
+            space.axis('k_config', [[8, 1]])
+            space.axis('block_warps', [[1, 1], [1, 2], [2, 2], [2, 4]])
+            space.axis('atom', [('row_4x8', TaskLayout.row_major((4, 8)))])
         elif space_level == 2:
-            for inner_m, inner_n in [[4, 4]]:
-                for outer_m, outer_n in [[1, 1], [1, 2], [2, 1], [2, 2], [1, 3], [3, 1], [2, 3], [3, 2], [3, 3]]:
-                    for block_warps_k, warp_k in [[4, 1], [8, 1]]:
-                        for block_warps_m, block_warps_n in [[1, 1], [1, 2], [2, 1], [2, 2], [2, 4], [4, 2]]:
-                            for name, atom_layout in [('row_4x8', TaskLayout.row_major((4, 8))), ('custom_4x8', CustomTaskLayout())]:
-                                try:
-                                    settings.append(MatmulSchedule(
-                                        block_warps_k=block_warps_k,
-                                        warp_k=warp_k,
-                                        block_warps=[block_warps_m, block_warps_n],
-                                        warp_outer=[outer_m, outer_n],
-                                        atom_layout=atom_layout,
-                                        atom_layout_name=name,
-                                        warp_inner=[inner_m, inner_n]
-                                    ))
-                                except NotSupportedError as e:
-                                    print()
-                                    print(e.obj)
-                                    print(e.msg)
-                                    pass
+            space.axis('warp_inner', [[4, 4]])
+            space.axis('warp_outer', [[1, 1], [1, 2], [2, 1], [2, 2], [1, 3], [3, 1], [2, 3], [3, 2], [3, 3]])
+            space.axis('k_config', [[4, 1], [8, 1]])
+            space.axis('block_warps', [[1, 1], [1, 2], [2, 1], [2, 2], [2, 4], [4, 2]])
+            space.axis('atom', [('row_4x8', TaskLayout.row_major((4, 8))), ('custom_4x8', CustomTaskLayout())])
         else:
             raise NotImplementedError()
+        warp_size = 32
+        reserved_regs = 16  # keep consistent with __init__
+        space.derive('block_warps_k', lambda k_config: k_config[0])
+        space.derive('warp_k', lambda k_config: k_config[1])
+        space.derive('block_k', lambda block_warps_k, warp_k: block_warps_k * warp_k)
+        space.constraint(lambda block_warps_k: block_warps_k % 2 == 0, 'double buffering requires that block_k/warp_k is divisible by 2')
+        space.constraint(lambda block_k: block_k <= warp_size and warp_size % block_k == 0, 'transfer from gmem to smem requires block_k divides warp_size')
+        space.derive('atom_shape', lambda atom: atom[1].task_shape)
+        space.constraint(lambda atom: atom[1].num_workers == warp_size, 'atom layout should have exactly 32 workers')
+        space.derive('block_shape', lambda block_warps, warp_outer, atom_shape, warp_inner: [
+            block_warps[i] * warp_outer[i] * atom_shape[i] * warp_inner[i] for i in range(2)])
+        space.derive('block_size', lambda block_warps: block_warps[0] * block_warps[1] * warp_size)
+        space.derive('lines', lambda block_size, block_k: block_size // block_k)
+        space.constraint(lambda block_shape, lines: block_shape[0] % lines == 0 and block_shape[1] % lines == 0,
+                         'transfer of matrix A/B from gmem to regs requires block_shape is divisible by block_size / block_k')
+        space.derive('regs', lambda warp_outer, warp_inner, warp_k, block_shape, lines: (
+            warp_outer[0] * warp_k * warp_inner[0]                                  # regs a
+            + warp_k * warp_outer[1] * warp_inner[1]                                # regs b
+            + warp_outer[0] * warp_outer[1] * warp_inner[0] * warp_inner[1]         # regs c
+            + block_shape[0] // lines + block_shape[1] // lines                     # regs a/b ldg
+            + reserved_regs + 7) // 8 * 8)
+        space.constraint(lambda regs: regs <= cuda.max_num_regs_per_thread(), 'registers per thread exceed the maximum')
+        space.constraint(lambda regs, block_size: regs * block_size <= cuda.max_num_regs_per_block(), 'registers per block exceed the maximum')
+        space.derive('max_smem', lambda regs, block_size: min(cuda.max_smem_bytes_per_sm() // (cuda.max_num_regs_per_sm() // (regs * block_size)),
+                                                              cuda.max_smem_bytes_per_block()) // 128 * 128)
+
+        def wb_shapes(block_warps, warp_outer, atom_shape, warp_inner, max_smem):
+            # the (warp write-back shape, block write-back shape) of the largest write-back config that fits smem
+            pairs = []
+            for a, b in itertools.product(factor(warp_outer[0]), factor(warp_outer[1])):
+                block_wb_shape = [block_warps[0] * a * atom_shape[0] * warp_inner[0], block_warps[1] * b * atom_shape[1] * warp_inner[1]]
+                if prod(block_wb_shape) * 4 <= max_smem:
+                    pairs.append((a, b))
+            if len(pairs) == 0:
+                return None
+            a, b = max(pairs, key=lambda p: p[0] * p[1])
+            return [a * atom_shape[0] * warp_inner[0], b * atom_shape[1] * warp_inner[1]], [block_warps[0] * a * atom_shape[0] * warp_inner[0], block_warps[1] * b * atom_shape[1] * warp_inner[1]]
+
+        space.derive('wb_shapes', wb_shapes)
+        space.constraint(lambda wb_shapes: wb_shapes is not None, 'can not find a write-back config')
+        space.constraint(lambda wb_shapes: wb_shapes[0][1] % warp_size == 0 if warp_size <= wb_shapes[0][1]
+                         else warp_size % wb_shapes[0][1] == 0 and wb_shapes[0][0] % (warp_size // wb_shapes[0][1]) == 0, 'C write back alignment requirement')
+        space.derive('smem', lambda block_shape, block_k, wb_shapes: max((block_shape[0] + block_shape[1]) * block_k * 2 * 4, prod(wb_shapes[1]) * 4))
+        space.constraint(lambda smem, max_smem: smem <= max_smem, 'shared memory exceeds the maximum')
+        return space
+
+    @staticmethod
+    def schedules(space_level: int = 0, verbose: bool = False):
+        if space_level == 0:
+            return [MatmulSchedule()]
+        space = MatmulSchedule.space(space_level)
+        # only construct the layouts of the valid points, the constraints of the space are a cheap pre-filter of the
+        # checks in __init__, which remain the source of truth
+        settings = []
+        num_rejected = 0
+        for point in space.enumerate():
+            try:
+                settings.append(MatmulSchedule(
+                    block_warps_k=point['block_warps_k'],
+                    warp_k=point['warp_k'],
+                    block_warps=point['block_warps'],
+                    warp_outer=point['warp_outer'],
+                    atom_layout=point['atom'][1],
+                    atom_layout_name=point['atom'][0],
+                    warp_inner=point['warp_inner']
+                ))
+            except NotSupportedError:
+                num_rejected += 1
+        if verbose:
+            print(space.report())
+            if num_rejected > 0:
+                print('  {:>6} rejected by the schedule checks.'.format(num_rejected))
         return settings
 
 
 def batched_matmul_cuda_schedule_wb(task: MatmulTask) -> IRModule:
     ctx = TaskContext.current()
-    schedules = MatmulSchedule.schedules(space_level=ctx.space_level)
+    schedules = MatmulSchedule.schedules(space_level=ctx.space_level, verbose=True)
     default_resolve_out_dir = os.path.join('./outs/resolve', task.name, 'batched_matmul_{}x{}x{}x{}'.format(task.batch_size, task.m_size, task.k_size, task.n_size))
     resolve_out_dir = ctx.resolve_out_dir if ctx.resolve_out_dir else default_resolve_out_dir
     ir_modules = []
@@ -10,23 +10,11 @@ from hidet.ir.dialects.compute import ReduceCompute
 from hidet.ir.stmt import AssignStmt, BufferStoreStmt
 from hidet.ir.utils import index_deserialize
 from hidet.tos.ops.definitions.reduce import ReduceTask
-from hidet.tos.ops.schedules.common import params_from_task
+from hidet.tos.ops.schedules.common import params_from_task, merge_indices
 from .common import warp_reduce
 from hidet.utils import prod
 
 
-def merge_indices(grid_indices: List[Expr], reduce_indices: List[Expr], reduce_dims: List[int]) -> List[Expr]:
-    indices = []
-    grid_indices = list(reversed(grid_indices))
-    reduce_indices = list(reversed(reduce_indices))
-    for i in range(len(grid_indices) + len(reduce_indices)):
-        if i in reduce_dims:
-            indices.append(reduce_indices.pop())
-        else:
-            indices.append(grid_indices.pop())
-    return indices
-
-
 def cuda_schedule_reduce_by_warp_reduce(task: ReduceTask) -> IRModule:
     x, y = task.inputs[0], task.outputs[0]
 
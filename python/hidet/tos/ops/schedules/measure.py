@@ -0,0 +1,296 @@
+from typing import List, Dict, Callable, Tuple, Optional, Iterable
+import math
+import time
+import platform
+import numpy as np
+
+from hidet.ir.func import IRModule
+from hidet.ir.task import Task
+from hidet.ir.analyzers import analyze_resource_usage, ResourceLimits
+from hidet.runtime import CompiledFunction
+from hidet.utils import prod
+
+# two-sided 95% critical values of student's t-distribution, indexed by degrees of freedom
+_t_table_95 = [
+    float('inf'), 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042
+]
+
+
+def confidence_interval(samples: List[float]) -> Tuple[float, float]:
+    """
+    Get the 95% confidence interval of the mean of given samples.
+
+    Parameters
+    ----------
+    samples: List[float]
+        The samples.
+
+    Returns
+    -------
+    ret: Tuple[float, float]
+        The lower and upper bound. When there is only one sample, the interval is unbounded.
+    """
+    n = len(samples)
+    if n == 0:
+        raise ValueError('Require at least one sample.')
+    mean = float(np.mean(samples))
+    if n == 1:
+        return -math.inf, math.inf
+    t = _t_table_95[n - 1] if n - 1 < len(_t_table_95) else 1.960
+    half_width = t * float(np.std(samples, ddof=1)) / math.sqrt(n)
+    return mean - half_width, mean + half_width
+
+
+def successive_halving(measure: Callable[[int, int], List[float]], candidates: Iterable[int], initial_repeat: int = 2,
+                       max_repeat: int = 32, eta: int = 2, verbose: bool = False, deadline: Optional[float] = None) -> Dict[int, List[float]]:
+    """
+    Measure the candidates with successive halving.
+
+    In each round, each remaining candidate is measured `repeat` more times. Then only the best 1/eta candidates
+    (by median latency) are kept, and the repeat is multiplied by eta for the next round. The measurement stops
+    when one candidate is left, when the repeat exceeds max_repeat, or early when the 95% confidence interval of
+    the best candidate is separated from (i.e., entirely below) the ones of all other remaining candidates.
+
+    Parameters
+    ----------
+    measure: Callable[[int, int], List[float]]
+        The measure function. measure(candidate, repeat) returns `repeat` latency samples of the candidate.
+    candidates: Iterable[int]
+        The candidates to measure. It can be a generator that yields the candidates as soon as they are built,
+        the first round of measurement is done for each candidate as it arrives.
+    initial_repeat: int
+        The number of samples for each candidate in the first round.
+    max_repeat: int
+        The maximum number of samples taken in a round.
+    eta: int
+        The reduction factor of each round.
+    verbose: bool
+        Whether to print the progress of each round.
+    deadline: Optional[float]
+        The wall time (as time.time()) to stop measuring. After the deadline, no more candidates are taken from
+        the candidates and no more rounds are started, but at least one candidate is measured. None means no
+        deadline.
+
+    Returns
+    -------
+    ret: Dict[int, List[float]]
+        The latency samples of each candidate. The candidates eliminated earlier have fewer samples.
+    """
+    if eta < 2:
+        raise ValueError('The reduction factor eta must be at least 2, got {}.'.format(eta))
+    def timeout() -> bool:
+        return deadline is not None and time.time() >= deadline
+
+    samples: Dict[int, List[float]] = {}
+    candidates = iter(candidates)
+    for c in candidates:
+        samples[c] = list(measure(c, initial_repeat))
+        if timeout():
+            if verbose:
+                print('Stop measuring new candidates, the deadline has passed.')
+            break
+    if hasattr(candidates, 'close'):
+        # stop the generator (e.g., the background building) of the candidates that will not be measured
+        candidates.close()
+    remaining = list(samples.keys())
+    repeat = initial_repeat
+    while len(remaining) > 1:
+        remaining = sorted(remaining, key=lambda c: float(np.median(samples[c])))
+        if repeat * eta > max_repeat or timeout():
+            break
+        best_upper = confidence_interval(samples[remaining[0]])[1]
+        if all(best_upper < confidence_interval(samples[c])[0] for c in remaining[1:]):
+            if verbose:
+                print('Early stop with {} candidates left, the best one is statistically separated.'.format(len(remaining)))
+            break
+        remaining = remaining[:max(1, int(math.ceil(len(remaining) / eta)))]
+        repeat *= eta
+        if verbose:
+            print('Keep {} candidates, measure each {} more times.'.format(len(remaining), repeat))
+        for c in remaining:
+            samples[c].extend(measure(c, repeat))
+    return samples
+
+
+class Measurer:
+    """
+    The interface to measure the latency of candidate ir modules of a task.
+
+    The measurer is prepared once for each task, then measure() is called multiple times for each candidate.
+    """
+    # whether the candidates need to be built before measuring
+    requires_build = True
+    # whether the candidates can be measured while the remaining ones are being built in background, which is not the
+    # case when measuring on the host, where the build workers occupy all the cores
+    overlaps_build = True
+
+    def target(self) -> str:
+        """
+        The target string used to key the tuning records.
+        """
+        raise NotImplementedError()
+
+    def resource_limits(self) -> Optional[ResourceLimits]:
+        """
+        The resource limits used to reject candidates before building. None means no limits.
+        """
+        return None
+
+    def prepare(self, task: Task):
+        """
+        Prepare for measuring the candidates of given task, such as creating the input tensors.
+        """
+        pass
+
+    def measure(self, ir_module: IRModule, compiled_func: Optional[CompiledFunction], repeat: int) -> List[float]:
+        """
+        Measure the latency of a candidate.
+
+        Parameters
+        ----------
+        ir_module: IRModule
+            The ir module of the candidate.
+        compiled_func: Optional[CompiledFunction]
+            The compiled function of the candidate. None if the measurer does not require building.
+        repeat: int
+            The number of latency samples to take.
+
+        Returns
+        -------
+        ret: List[float]
+            The latency samples, in milliseconds.
+        """
+        raise NotImplementedError()
+
+
+class CudaMeasurer(Measurer):
+    """
+    Measure the kernels on the cuda device with cuda events.
+    """
+    def __init__(self, warmup: int = 2, number: int = 10, stabilize_gpu: bool = False):
+        self.warmup = warmup
+        self.number = number
+        self.stabilize_gpu = stabilize_gpu
+        self.inputs = []
+
+    def target(self) -> str:
+        from .records import current_target
+        return current_target()
+
+    def resource_limits(self) -> Optional[ResourceLimits]:
+        return ResourceLimits.from_compute_capability()
+
+    def prepare(self, task: Task):
+        from .resolve import dummy_inputs_from_task
+        self.inputs = dummy_inputs_from_task(task)
+        if self.stabilize_gpu:
+            from hidet.utils import cuda
+            if not cuda.wait_for_stable_gpu():
+                print('The gpu is not stable (thermal throttled or nvidia-smi unavailable), measure anyway.')
+
+    def measure(self, ir_module: IRModule, compiled_func: Optional[CompiledFunction], repeat: int) -> List[float]:
+        return compiled_func.profile(*self.inputs, warmup=self.warmup, number=self.number, repeat=repeat)
+
+
+class CpuMeasurer(Measurer):
+    """
+    Measure the functions on the host with the host timer.
+    """
+    overlaps_build = False
+
+    def __init__(self, warmup: int = 1, number: int = 10, seed: int = 0):
+        self.warmup = warmup
+        self.number = number
+        self.seed = seed
+        self.inputs = []
+
+    def target(self) -> str:
+        return 'cpu {}'.format(platform.machine())
+
+    def prepare(self, task: Task):
+        from .resolve import dummy_inputs_from_task
+        self.inputs = dummy_inputs_from_task(task, device='cpu', seed=self.seed)
+
+    def measure(self, ir_module: IRModule, compiled_func: Optional[CompiledFunction], repeat: int) -> List[float]:
+        for _ in range(self.warmup):
+            compiled_func(*self.inputs)
+        results = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(self.number):
+                compiled_func(*self.inputs)
+            end = time.perf_counter()
+            results.append((end - start) * 1000.0 / self.number)
+        return results
+
+
+class SimulatedMeasurer(Measurer):
+    """
+    A deterministic measurer driven by an analytical model of the statically estimated resource usage (see
+    analyze_resource_usage). It does not require building or a gpu, thus can be used to exercise and test the
+    search, caching and record-keeping logic of tuning anywhere.
+
+    The latency of a kernel is modeled as the number of waves of thread blocks times the latency of each wave.
+    The latency of a wave is the weighted instruction count of a warp, scaled by the number of warps that each
+    warp scheduler needs to issue.
+    """
+    requires_build = False
+    inst_cycles = {
+        'ld.global': 8.0,
+        'st.global': 8.0,
+        'ld.shared': 2.0,
+        'st.shared': 2.0,
+        'arith': 1.0,
+        'sync': 16.0,
+        'branch': 2.0
+    }
+
+    def __init__(self, compute_capability: Tuple[int, int] = (8, 6), num_sms: int = 68, num_schedulers: int = 4,
+                 clock_mhz: float = 1500.0, noise: float = 0.0, seed: int = 0):
+        self.compute_capability = compute_capability
+        self.num_sms = num_sms
+        self.num_schedulers = num_schedulers
+        self.clock_mhz = clock_mhz
+        self.noise = noise
+        self.seed = seed
+        self.rng = np.random.RandomState(seed)
+        self.latency_cache: Dict[int, float] = {}
+
+    def target(self) -> str:
+        return 'simulated sm_{}{}'.format(*self.compute_capability)
+
+    def resource_limits(self) -> Optional[ResourceLimits]:
+        return ResourceLimits.from_compute_capability(self.compute_capability)
+
+    def prepare(self, task: Task):
+        self.rng = np.random.RandomState(self.seed)
+        self.latency_cache.clear()
+
+    def estimate(self, ir_module: IRModule) -> float:
+        from hidet.ir.functors import simplify_to_int
+        kernels = [func for func in ir_module.functions.values() if func.kind == 'cuda_kernel']
+        if len(kernels) != 1:
+            raise ValueError('Expect exactly one cuda kernel in the ir module, got {}.'.format(len(kernels)))
+        kernel = kernels[0]
+        usage = analyze_resource_usage(kernel)
+        grid_dim = kernel.get_attr('cuda_grid_dim', 1)
+        grid_dims = grid_dim if isinstance(grid_dim, (list, tuple)) else [grid_dim]
+        num_blocks = prod([simplify_to_int(d) for d in grid_dims])
+        resident_blocks = max(usage.resident_blocks(self.resource_limits()), 1)
+        num_waves = (num_blocks + self.num_sms * resident_blocks - 1) // (self.num_sms * resident_blocks)
+        warps_per_block = (usage.block_size + 31) // 32
+        warp_cycles = sum(count * self.inst_cycles.get(category, 1.0) for category, count in usage.inst_mix.items())
+        wave_cycles = warp_cycles * max(1.0, resident_blocks * warps_per_block / self.num_schedulers)
+        return num_waves * wave_cycles / (self.clock_mhz * 1e3)
+
+    def measure(self, ir_module: IRModule, compiled_func: Optional[CompiledFunction], repeat: int) -> List[float]:
+        key = id(ir_module)
+        if key not in self.latency_cache:
+            self.latency_cache[key] = self.estimate(ir_module)
+        latency = self.latency_cache[key]
+        if self.noise > 0.0:
+            return [float(v) for v in latency * (1.0 + self.noise * np.abs(self.rng.randn(repeat)))]
+        else:
+            return [latency] * repeat
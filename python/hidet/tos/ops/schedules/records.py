@@ -0,0 +1,332 @@
+from typing import List, Optional, Dict, Union, Any, Tuple
+import os
+import math
+import json
+import time
+from hashlib import sha256
+
+from hidet.ir.task import Task
+from hidet.utils import hidet_cache_file
+from .common import Schedule
+
+
+def task_fingerprint(task: Task) -> str:
+    """
+    Get the fingerprint of a task. Two tasks have the same fingerprint if and only if they have the same
+    computation definition (including the shapes and data types of the parameters).
+
+    Parameters
+    ----------
+    task: Task
+        The task to fingerprint.
+
+    Returns
+    -------
+    ret: str
+        The fingerprint, the same as the task hash used by the operator cache.
+    """
+    return sha256(str(task).encode()).hexdigest()[:16]
+
+
+def current_target() -> str:
+    """
+    Get the target string of the current device used to key the tuning records, such as 'cuda sm_86'.
+    """
+    from hidet.utils import cuda
+    major, minor = cuda.query_compute_capability()
+    return 'cuda sm_{}{}'.format(major, minor)
+
+
+def schedule_keys(schedule: Schedule) -> List[List[Union[int, float, str]]]:
+    """
+    Get the keys of a schedule in the form stored in the tuning records.
+    """
+    return [[name, value] for name, value in schedule.keys()]
+
+
+def task_features(task: Task) -> Dict[str, float]:
+    """
+    Get the features of a task used by the cost model: the name of the task and the shape of each parameter.
+    The dimensions that are not constant are ignored.
+    """
+    from hidet.ir.type import TensorType
+    from hidet.ir.expr import Constant
+    features = {'task_name={}'.format(task.name): 1.0}
+    for idx, param in enumerate(task.parameters):
+        param_type = param.data_type
+        if not isinstance(param_type, TensorType):
+            continue
+        for dim, extent in enumerate(param_type.shape):
+            if isinstance(extent, Constant):
+                features['p{}_d{}'.format(idx, dim)] = float(extent.value)
+    return features
+
+
+class TuningCandidate:
+    """
+    A candidate schedule measured in one tuning session.
+
+    Attributes
+    ----------
+    keys: List[List[Union[int, float, str]]]
+        The (name, value) pairs returned by Schedule.keys().
+    latency: Optional[float]
+        The measured latency in milliseconds. None if the candidate is not measured.
+    status: str
+        'ok' if it is measured, 'build_failed' if it failed in building, 'rejected' if it is rejected by the
+        resource limits before building, or 'skipped' if it is not selected by the cost model.
+    derived_keys: List[List[Union[int, float, str]]]
+        The (name, value) pairs returned by Schedule.derived_keys(). Used as features of the cost model.
+    """
+    def __init__(self, keys: List[List[Union[int, float, str]]], latency: Optional[float], status: str = 'ok',
+                 derived_keys: Optional[List[List[Union[int, float, str]]]] = None):
+        self.keys = [list(kv) for kv in keys]
+        self.latency = latency
+        self.status = status
+        self.derived_keys = [list(kv) for kv in derived_keys] if derived_keys is not None else []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'keys': self.keys, 'latency': self.latency, 'status': self.status, 'derived_keys': self.derived_keys}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'TuningCandidate':
+        return TuningCandidate(data['keys'], data['latency'], data['status'], data.get('derived_keys', None))
+
+
+class TuningRecord:
+    """
+    The result of tuning a task on a target: all the candidates and their latency. The task features (e.g., the
+    shapes of task parameters) are recorded to train the cost model across tasks.
+    """
+    def __init__(self, fingerprint: str, task_name: str, target: str, candidates: List[TuningCandidate], timestamp: Optional[float] = None,
+                 task_features: Optional[Dict[str, float]] = None, partial: bool = False):
+        self.fingerprint = fingerprint
+        self.task_name = task_name
+        self.target = target
+        self.candidates = candidates
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.task_features = task_features if task_features is not None else {}
+        # whether the tuning stopped early because of the tuning budget, thus can be resumed
+        self.partial = partial
+
+    def best(self) -> Optional[TuningCandidate]:
+        measured = [c for c in self.candidates if c.status == 'ok' and c.latency is not None]
+        if len(measured) == 0:
+            return None
+        return min(measured, key=lambda c: c.latency)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'fingerprint': self.fingerprint,
+            'task_name': self.task_name,
+            'target': self.target,
+            'timestamp': self.timestamp,
+            'candidates': [c.to_dict() for c in self.candidates],
+            'task_features': self.task_features,
+            'partial': self.partial
+        }, sort_keys=True)
+
+    @staticmethod
+    def from_json(line: str) -> 'TuningRecord':
+        data = json.loads(line)
+        return TuningRecord(
+            fingerprint=data['fingerprint'],
+            task_name=data['task_name'],
+            target=data['target'],
+            candidates=[TuningCandidate.from_dict(c) for c in data['candidates']],
+            timestamp=data['timestamp'],
+            task_features=data.get('task_features', None),
+            partial=data.get('partial', False)
+        )
+
+
+class TuningDatabase:
+    """
+    A persistent database of tuning records, stored as a json lines file with one record per line.
+
+    The file is append-only, thus the databases on different machines can be merged by concatenating (see
+    merge()). When the same task on the same target has been tuned multiple times, the best candidate among all
+    records is used.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.records: List[TuningRecord] = []
+        self.index: Dict[Tuple[str, str], List[TuningRecord]] = {}
+        self.lines = set()
+        self.load()
+
+    def load(self):
+        self.records.clear()
+        self.index.clear()
+        self.lines.clear()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if len(line) == 0 or line in self.lines:
+                    continue
+                try:
+                    record = TuningRecord.from_json(line)
+                except (ValueError, KeyError):
+                    # skip the broken line (e.g., written by an interrupted process)
+                    continue
+                self._insert(record, line)
+
+    def _insert(self, record: TuningRecord, line: str):
+        self.records.append(record)
+        self.index.setdefault((record.fingerprint, record.target), []).append(record)
+        self.lines.add(line)
+
+    def add(self, record: TuningRecord) -> bool:
+        """
+        Add a record to the database and append it to the database file.
+
+        Returns
+        -------
+        ret: bool
+            False if the record already exists, otherwise True.
+        """
+        line = record.to_json()
+        if line in self.lines:
+            return False
+        self._insert(record, line)
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(line + '\n')
+        return True
+
+    def merge(self, other: Union[str, 'TuningDatabase']) -> int:
+        """
+        Merge the records of another database (or database file) into this one.
+
+        Returns
+        -------
+        ret: int
+            The number of newly added records.
+        """
+        if isinstance(other, str):
+            other = TuningDatabase(other)
+        return sum(self.add(record) for record in other.records)
+
+    def query(self, fingerprint: Optional[str] = None, target: Optional[str] = None, task_name: Optional[str] = None) -> List[TuningRecord]:
+        """
+        Query the records that match all the given conditions. None means no condition.
+        """
+        if fingerprint is not None and target is not None:
+            candidates = self.index.get((fingerprint, target), [])
+        else:
+            candidates = self.records
+        return [record for record in candidates if (fingerprint is None or record.fingerprint == fingerprint)
+                and (target is None or record.target == target)
+                and (task_name is None or record.task_name == task_name)]
+
+    def best(self, fingerprint: str, target: str, include_partial: bool = True) -> Optional[TuningCandidate]:
+        """
+        Get the best candidate of given task on given target among all the records. When include_partial is False,
+        the partial records (see TuningRecord.partial) are ignored.
+        """
+        best = None
+        for record in self.query(fingerprint, target):
+            if record.partial and not include_partial:
+                continue
+            candidate = record.best()
+            if candidate is not None and (best is None or candidate.latency < best.latency):
+                best = candidate
+        return best
+
+    def measured(self, fingerprint: str, target: str) -> Dict[str, float]:
+        """
+        Get the measured latency of each candidate of given task on given target among all the records, used to
+        resume a partial tuning without measuring the candidates again.
+
+        Returns
+        -------
+        ret: Dict[str, float]
+            The map from the json dump of candidate keys to the best measured latency.
+        """
+        latencies = {}
+        for record in self.query(fingerprint, target):
+            for candidate in record.candidates:
+                if candidate.status == 'ok' and candidate.latency is not None:
+                    key = json.dumps(candidate.keys)
+                    latencies[key] = min(latencies.get(key, candidate.latency), candidate.latency)
+        return latencies
+
+    def nearest(self, task_name: str, target: str, task_features: Dict[str, float], num_neighbors: int = 3) -> List[Tuple[float, TuningRecord]]:
+        """
+        Find the records of the most similar tasks: the same operator on the same target, whose parameters have the
+        same ranks, ordered by the distance of their shapes.
+
+        The distance is the euclidean distance between the logarithms of the parameter dimensions, thus 2048 is as
+        close to 1024 as 1024 to 512. When a task has multiple records, only its best one is returned.
+
+        Parameters
+        ----------
+        task_name: str
+            The name of the task.
+        target: str
+            The target.
+        task_features: Dict[str, float]
+            The features of the task, see task_features().
+        num_neighbors: int
+            The maximum number of tasks to return.
+
+        Returns
+        -------
+        ret: List[Tuple[float, TuningRecord]]
+            The (distance, record) pairs, from the nearest to the farthest.
+        """
+        best_records: Dict[str, Tuple[float, TuningRecord]] = {}
+        for record in self.query(target=target, task_name=task_name):
+            best = record.best()
+            if best is None or set(record.task_features.keys()) != set(task_features.keys()):
+                continue
+            distance = math.sqrt(sum((math.log2(1.0 + record.task_features[name]) - math.log2(1.0 + value)) ** 2 for name, value in task_features.items()))
+            if record.fingerprint not in best_records or best.latency < best_records[record.fingerprint][1].best().latency:
+                best_records[record.fingerprint] = (distance, record)
+        return sorted(best_records.values(), key=lambda item: item[0])[:num_neighbors]
+
+    def transfer(self, task_name: str, target: str, task_features: Dict[str, float], num_neighbors: int = 3,
+                 num_per_neighbor: int = 3) -> List[List[List[Union[int, float, str]]]]:
+        """
+        Get the schedule keys that worked best for the most similar tuned tasks, to warm start tuning an unseen task.
+
+        Returns
+        -------
+        ret: List[List[List[Union[int, float, str]]]]
+            The keys of the transferred schedules without duplication, ordered by the distance of their tasks and
+            then their latency.
+        """
+        ret = []
+        for _, record in self.nearest(task_name, target, task_features, num_neighbors):
+            measured = [c for c in record.candidates if c.status == 'ok' and c.latency is not None]
+            for candidate in sorted(measured, key=lambda c: c.latency)[:num_per_neighbor]:
+                if candidate.keys not in ret:
+                    ret.append(candidate.keys)
+        return ret
+
+
+_tuning_database: Optional[TuningDatabase] = None
+
+
+def set_tuning_database(path: Optional[str]):
+    """
+    Set the path of the tuning database used by schedule resolving. None means the default one in the hidet cache
+    directory.
+    """
+    global _tuning_database
+    if path is None:
+        path = hidet_cache_file('tuning', 'records.jsonl')
+    _tuning_database = TuningDatabase(path)
+
+
+def tuning_database() -> TuningDatabase:
+    """
+    Get the tuning database used by schedule resolving.
+    """
+    if _tuning_database is None:
+        set_tuning_database(None)
+    return _tuning_database
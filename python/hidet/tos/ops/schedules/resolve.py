@@ -1,19 +1,26 @@
 import os
 import time
-from typing import List
+import json
+import warnings
+from typing import List, Optional
 import numpy as np
 
 from hidet.ir.type import TensorType
 from hidet.ir.expr import Constant
 from hidet.ir.func import IRModule
-from hidet.ir.task import Task
-from hidet.utils import TableBuilder, strict_zip
-from hidet.tos.tensor import randn, zeros, ones, Tensor
-from hidet.backend import BuildInstance, batch_build_ir_modules
+from hidet.ir.task import Task, TaskContext
+from hidet.ir.analyzers import analyze_resource_usage, ResourceLimits
+from hidet.utils import TableBuilder
+from hidet.tos.tensor import randn, zeros, ones, from_numpy, Tensor
+from hidet.transforms import PassContext
+from hidet.backend import BuildInstance, iter_build_ir_modules
 from .common import Schedule
+from .records import TuningRecord, TuningCandidate, tuning_database, task_fingerprint, schedule_keys, task_features
+from .cost_model import extract_features, cost_model
+from .measure import successive_halving, Measurer, CudaMeasurer
 
 
-def dummy_inputs_from_task(task: Task) -> List[Tensor]:
+def dummy_inputs_from_task(task: Task, device: Optional[str] = None, seed: Optional[int] = None) -> List[Tensor]:
     """
     Create dummy inputs values for given task.
 
@@ -21,6 +28,12 @@ def dummy_inputs_from_task(task: Task) -> List[Tensor]:
     ----------
     task: Task
         The task to generate dummy inputs for.
+    device: Optional[str]
+        The device to create the inputs on. None means deciding by the scope of each parameter ('global' on cuda
+        and 'host' on cpu).
+    seed: Optional[int]
+        When given, the inputs are generated on host with numpy using this seed, thus are reproducible and do
+        not require a gpu.
 
     Returns
     -------
@@ -28,6 +41,7 @@ def dummy_inputs_from_task(task: Task) -> List[Tensor]:
         The dummy input tensors.
     """
     inputs = []
+    rng = np.random.RandomState(seed) if seed is not None else None
     for idx, param in enumerate(task.parameters):
         param_type = param.data_type
 
@@ -42,23 +56,86 @@ def dummy_inputs_from_task(task: Task) -> List[Tensor]:
             'global': 'cuda',
             'host': 'cpu'
         }
-        device = scope2device[scope]
-        if dtype in ['float32', 'float16', 'bfloat16']:
-            x = randn(shape, dtype, device=device, layout=param_type.layout)
+        param_device = device if device is not None else scope2device[scope]
+        if rng is not None:
+            if dtype in ['float32', 'float16']:
+                array = rng.randn(*shape).astype(dtype)
+            elif dtype in ['int64', 'int32', 'int8', 'uint64', 'uint32', 'uint8']:
+                array = np.zeros(shape, dtype=dtype)
+            elif dtype == 'bool':
+                array = np.ones(shape, dtype=np.bool_)
+            else:
+                raise ValueError('Currently do not support generate random array for data type {}'.format(dtype))
+            x = from_numpy(array)
+            if param_device == 'cuda':
+                x = x.cuda()
+        elif dtype in ['float32', 'float16', 'bfloat16']:
+            x = randn(shape, dtype, device=param_device, layout=param_type.layout)
         elif dtype in ['int64', 'int32', 'int8', 'uint64', 'uint32', 'uint8']:
-            x = zeros(shape, dtype, device=device, layout=param_type.layout)
+            x = zeros(shape, dtype, device=param_device, layout=param_type.layout)
         elif dtype == 'bool':
-            x = ones(shape, dtype, device=device, layout=param_type.layout)
+            x = ones(shape, dtype, device=param_device, layout=param_type.layout)
         else:
             raise ValueError('Currently do not support generate random array for data type {}'.format(dtype))
         inputs.append(x)
     return inputs
 
 
-def resolve_ir_modules(ir_modules: List[IRModule], schedules: List[Schedule], output_dir: str, parallel: bool = True, verbose: bool = True) -> IRModule:
+def prune_ir_modules(ir_modules: List[IRModule], limits: Optional[ResourceLimits] = None, verbose: bool = False) -> List[int]:
+    """
+    Statically estimate the resource usage of each ir module and reject the ones that exceed the hardware limits,
+    before invoking any compiler.
+
+    Parameters
+    ----------
+    ir_modules: List[IRModule]
+        The ir modules to check. Each ir module should contain exactly one cuda kernel. The ir modules that do not
+        are always accepted.
+    limits: Optional[ResourceLimits]
+        The resource limits. None means the limits of the current device.
+    verbose: bool
+        Whether to print the number of rejected ir modules.
+
+    Returns
+    -------
+    ret: List[int]
+        The indices of accepted ir modules, ordered by estimated occupancy (resident thread blocks per SM) from high
+        to low. The estimation is conservative, thus when it rejects all the ir modules, all of them are returned
+        (ordered by the number of exceeded limits) and left to the compiler.
+    """
+    if limits is None:
+        limits = ResourceLimits.from_compute_capability()
+    accepted = []
+    occupancy = {}
+    num_violations = {}
+    for idx, ir_module in enumerate(ir_modules):
+        try:
+            usage = analyze_resource_usage(ir_module)
+        except ValueError:
+            accepted.append(idx)
+            occupancy[idx] = 0
+            continue
+        num_violations[idx] = len(usage.violations(limits))
+        if num_violations[idx] == 0:
+            accepted.append(idx)
+            occupancy[idx] = usage.resident_blocks(limits) * usage.block_size
+    if len(accepted) == 0:
+        warnings.warn('All {} candidates exceed the estimated resource limits, build all of them.'.format(len(ir_modules)))
+        return sorted(range(len(ir_modules)), key=lambda idx: num_violations[idx])
+    if verbose and len(accepted) < len(ir_modules):
+        print('Rejected {} of {} candidates that exceed the resource limits.'.format(len(ir_modules) - len(accepted), len(ir_modules)))
+    return sorted(accepted, key=lambda idx: -occupancy[idx])
+
+
+def resolve_ir_modules(ir_modules: List[IRModule], schedules: List[Schedule], output_dir: str, parallel: bool = True, verbose: bool = True, use_records: bool = True,
+                       top_k: Optional[int] = None, stabilize_gpu: bool = False, measurer: Optional[Measurer] = None,
+                       max_candidates: Optional[int] = None, max_seconds: Optional[float] = None) -> IRModule:
     """
     Resolve the ir modules of the same task by comparing the latency of each kernel.
 
+    The built candidates are measured with successive halving: a cheap first pass over all candidates, then more
+    repeats for the better ones, stopping early once the best one is statistically separated from the others.
+
     Parameters
     ----------
     ir_modules: List[IRModule]
@@ -71,6 +148,29 @@ def resolve_ir_modules(ir_modules: List[IRModule], schedules: List[Schedule], ou
         Whether to parallelize the building. Default True.
     verbose: bool
         Whether to show the progress of parallel building.
+    use_records: bool
+        Whether to consult the tuning database first. When the task has been tuned on the same target, the recorded
+        best schedule is used without building and measuring any candidate. The measured results are always
+        added to the tuning database.
+    top_k: Optional[int]
+        Only build and measure the top-k candidates ranked by the cost model. None means using the top_k of
+        current task context. The cost model is only used after it has been trained by previous measurements.
+        The best schedules of the most similar tuned tasks (see TuningDatabase.transfer) are always selected first.
+    stabilize_gpu: bool
+        Whether to wait until the gpu is not thermally throttled before measuring, when using the default measurer.
+    measurer: Optional[Measurer]
+        The measurer to measure the candidates. None means the measurer of current task context, or a
+        CudaMeasurer if the task context does not specify one.
+    max_candidates: Optional[int]
+        The maximum number of candidates to build and measure. None means the max_candidates of current task
+        context. The remaining candidates of the tuning budget of current task context also limit it.
+    max_seconds: Optional[float]
+        The maximum wall time in seconds of building and measuring. None means the max_seconds of current task
+        context. The deadline of the tuning budget of current task context also limits it.
+
+    When a budget runs out, the best candidate measured so far is returned and the tuning record is marked as
+    partial. The next resolving of the same task resumes from it: the measured candidates are not measured again.
+
     Returns
     -------
     ret: IRModule
@@ -84,32 +184,166 @@ def resolve_ir_modules(ir_modules: List[IRModule], schedules: List[Schedule], ou
         raise ValueError('The number of ir modules and schedules does not match.')
     if any(ir_module.task != ir_modules[0].task for ir_module in ir_modules):
         raise ValueError('Require all ir modules are from the same task.')
-    build_instances = [BuildInstance(ir_module=ir_module,
-                                     output_dir=os.path.join(output_dir, 'resolve', str(idx)),
-                                     keep_ir=False,
-                                     nvcc_keep=False,
-                                     verbose=False) for idx, ir_module in enumerate(ir_modules)]
-    compiled_funcs = batch_build_ir_modules(build_instances, parallel=parallel, verbose=verbose)
-    dummy_inputs = dummy_inputs_from_task(ir_modules[0].task)
+    task = ir_modules[0].task
+    ctx = TaskContext.current()
+    start_time = time.time()
+    if measurer is None:
+        measurer = ctx.measurer
+    if measurer is None:
+        measurer = CudaMeasurer(stabilize_gpu=stabilize_gpu)
+    fingerprint = task_fingerprint(task)
+    target = measurer.target()
+    if use_records:
+        best = tuning_database().best(fingerprint, target, include_partial=False)
+        if best is not None:
+            for ir_module, schedule in zip(ir_modules, schedules):
+                if schedule_keys(schedule) == best.keys:
+                    if verbose:
+                        print('Use the tuning record of task {} on {}.'.format(task.name, target))
+                    return ir_module
+    limits = measurer.resource_limits()
+    if limits is not None:
+        accepted = prune_ir_modules(ir_modules, limits, verbose=verbose)
+    else:
+        accepted = list(range(len(ir_modules)))
+    task_feats = task_features(task)
+    features = [extract_features(schedule_keys(s), s.derived_keys(), task_feats) for s in schedules]
+    model = cost_model(target)
+    top_k = top_k if top_k is not None else ctx.top_k
+    # warm start with the best schedules of the most similar tuned tasks, they are valid if they appear in
+    # the candidates of this task and pass the resource check
+    transfer_keys = tuning_database().transfer(task.name, target, task_feats) if use_records else []
+    transferred = [idx for keys in transfer_keys for idx in accepted if schedule_keys(schedules[idx]) == keys]
+    if verbose and len(transferred) > 0:
+        print('Transfer {} schedules from similar tasks.'.format(len(transferred)))
+    if model.trained():
+        ranked = [accepted[i] for i in model.rank([features[idx] for idx in accepted])]
+    else:
+        ranked = accepted
+    ordered = transferred + [idx for idx in ranked if idx not in transferred]
+    if top_k is not None and model.trained() and len(ordered) > top_k:
+        selected = ordered[:top_k]
+        if verbose:
+            print('Select top {} of {} candidates by transfer and cost model.'.format(top_k, len(accepted)))
+    elif top_k is not None and len(transferred) > 0:
+        # under a budget without a trained cost model, the transferred schedules are the final candidates
+        selected = transferred[:top_k]
+    else:
+        selected = ordered
+
+    # resume from the partial tunings of this task, the measured candidates are not measured again
+    resumed = {}
+    if use_records:
+        measured_latencies = tuning_database().measured(fingerprint, target)
+        for idx in selected:
+            key = json.dumps(schedule_keys(schedules[idx]))
+            if key in measured_latencies:
+                resumed[idx] = measured_latencies[key]
+        if verbose and len(resumed) > 0:
+            print('Resume {} measured candidates from previous tuning.'.format(len(resumed)))
+        selected = [idx for idx in selected if idx not in resumed]
+
+    # apply the tuning budgets of this task and the shared budget
+    budget = ctx.budget
+    max_candidates = max_candidates if max_candidates is not None else ctx.max_candidates
+    max_seconds = max_seconds if max_seconds is not None else ctx.max_seconds
+    candidate_limits = [max_candidates, budget.remaining_candidates() if budget else None]
+    candidate_limits = [v for v in candidate_limits if v is not None]
+    deadlines = [start_time + max_seconds if max_seconds is not None else None, budget.deadline() if budget else None]
+    deadlines = [v for v in deadlines if v is not None]
+    deadline = min(deadlines) if len(deadlines) > 0 else None
+    partial = False
+    if len(candidate_limits) > 0 and len(selected) > min(candidate_limits):
+        # always measure at least one candidate if there is no resumed one
+        num_candidates = max(min(candidate_limits), 0 if len(resumed) > 0 else 1)
+        if verbose:
+            print('Measure {} of {} candidates under the tuning budget.'.format(num_candidates, len(selected)))
+        selected = selected[:num_candidates]
+        partial = True
+
+    compiled_funcs = [None] * len(ir_modules)
+    build_failed = set()
+
+    def measure(idx: int, repeat: int) -> List[float]:
+        return measurer.measure(ir_modules[idx], compiled_funcs[idx], repeat)
+
+    def ready_candidates(indices: List[int]):
+        if not measurer.requires_build or len(indices) == 0:
+            yield from indices
+            return
+        # measure each candidate as soon as it is built, while the remaining ones are being built in background (if
+        # the measurer allows)
+        build_instances = [BuildInstance(ir_module=ir_modules[idx],
+                                         output_dir=os.path.join(output_dir, 'resolve', str(idx)),
+                                         keep_ir=False,
+                                         nvcc_keep=False,
+                                         verbose=False,
+                                         unroll_budget=PassContext.current().unroll_budget) for idx in indices]
+        built = iter_build_ir_modules(build_instances, parallel=parallel, verbose=verbose)
+        if not measurer.overlaps_build:
+            # finish all the builds (and stop the build workers) before measuring
+            built = list(built)
+        try:
+            for i, compiled_func in built:
+                if compiled_func:
+                    compiled_funcs[indices[i]] = compiled_func
+                    yield indices[i]
+                else:
+                    build_failed.add(indices[i])
+        finally:
+            # stop building the remaining candidates when the measuring stops at the deadline
+            if not isinstance(built, list):
+                built.close()
+
+    measurer.prepare(task)
+    samples = successive_halving(measure, ready_candidates(selected), verbose=verbose, deadline=deadline)
+    # all the selected candidates failed in building (e.g., only one is selected under a budget), try the next ranked
+    # ones, as many as selected each time, until one of them is built or the candidates run out
+    pending = [idx for idx in ordered if idx not in selected and idx not in resumed]
+    num_refill = max(len(selected), 1)
+    while len(samples) == 0 and len(resumed) == 0 and len(pending) > 0:
+        refill, pending = pending[:num_refill], pending[num_refill:]
+        if verbose:
+            print('All {} candidates failed in building, try the next {}.'.format(len(selected), len(refill)))
+        selected = selected + refill
+        samples = successive_halving(measure, ready_candidates(refill), verbose=verbose)
+    if len(samples) + len(build_failed) < len(selected):
+        partial = True
+    if budget is not None:
+        budget.consume(len(samples) + len(build_failed))
     best_latency = 1e30
     best_ir_module = None
     latencies = []
-    time.sleep(5.0)
-    i = 0
-    for ir_module, compiled_func in strict_zip(ir_modules, compiled_funcs):
-        # print(schedules[i])
-        i += 1
-        if compiled_func:
-            repeat_latency = compiled_func.profile(*dummy_inputs, warmup=5, number=10, repeat=3)
-            latency = float(np.median(repeat_latency))
+    for idx, ir_module in enumerate(ir_modules):
+        if idx in samples:
+            latency = float(np.median(samples[idx]))
+        elif idx in resumed:
+            latency = resumed[idx]
         else:
-            # this ir module failed in building, skip
+            # this ir module failed in building or was not built, skip
             latency = 1e30
-        # print(latency)
         latencies.append(latency)
         if best_latency > latency:
             best_latency = latency
             best_ir_module = ir_module
+    candidates = []
+    accepted, selected = set(accepted), set(selected)
+    for idx, (schedule, latency) in enumerate(zip(schedules, latencies)):
+        if idx in samples or idx in resumed:
+            status = 'ok'
+        elif idx in build_failed:
+            status = 'build_failed'
+        elif idx in accepted:
+            status = 'skipped'
+        else:
+            status = 'rejected'
+        candidates.append(TuningCandidate(schedule_keys(schedule), latency if status == 'ok' else None, status, [[name, value] for name, value in schedule.derived_keys()]))
+    tuning_database().add(TuningRecord(fingerprint, task.name, target, candidates, task_features=task_feats, partial=partial))
+    if verbose and partial:
+        print('The tuning budget of task {} ran out, use the best of {} measured candidates.'.format(task.name, len(samples) + len(resumed)))
+    # the resumed candidates have been used to update the model when they were measured
+    measured = list(samples.keys())
+    model.update([features[idx] for idx in measured], [latencies[idx] for idx in measured])
     if best_ir_module is None:
         raise ValueError('All ir modules are failed in building.')
 
@@ -121,6 +355,7 @@ def resolve_ir_modules(ir_modules: List[IRModule], schedules: List[Schedule], ou
         rows = sorted(rows, key=lambda v: v[-1])
         for row in rows:
             tb += row
+    os.makedirs(output_dir, exist_ok=True)
     with open(os.path.join(output_dir, 'summary.txt'), 'w') as f:
         f.write(str(tb))
     return best_ir_module
@@ -0,0 +1,114 @@
+from typing import List, Dict, Any, Callable, Sequence, Iterator, Tuple
+import inspect
+from collections import defaultdict
+
+from hidet.utils import Timer
+
+
+class ScheduleSpace:
+    """
+    A schedule space defined by axes, derived values and constraints.
+
+    - An axis is a named tunable parameter with a list of candidate values.
+    - A derived value is a named function of previously defined axes and derived values.
+    - A constraint is a predicate over axes and derived values that every valid schedule must satisfy.
+
+    The dependencies of a derived value or a constraint are given by the parameter names of its function. For
+    example, ``space.derive('block_k', lambda block_warps_k, warp_k: block_warps_k * warp_k)``.
+
+    The valid points are enumerated by depth-first search over the axes in their definition order. Each derived
+    value is computed and each constraint is checked as soon as all its dependencies are assigned, so a violated
+    constraint prunes the whole subtree of remaining axes instead of each point being constructed and rejected.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.axes: List[str] = []
+        self.candidates: Dict[str, List[Any]] = {}
+        # items of each level: level i is evaluated after the i-th axis is assigned, level 0 before any axis
+        self.level_items: Dict[int, List[tuple]] = defaultdict(list)
+        self.levels: Dict[str, int] = {}
+
+        # statistics of the last enumeration
+        self.num_visited = 0
+        self.num_points = 0
+        self.num_pruned: Dict[str, int] = defaultdict(int)
+        self.enumerate_seconds = 0.0
+
+    def _level_of(self, func: Callable) -> Tuple[List[str], int]:
+        names = list(inspect.signature(func).parameters.keys())
+        for name in names:
+            if name not in self.levels:
+                raise ValueError('Unknown name "{}" in schedule space {}, it should be defined before being used.'.format(name, self.name))
+        return names, max([self.levels[name] for name in names], default=0)
+
+    def axis(self, name: str, candidates: Sequence[Any]):
+        if name in self.levels:
+            raise ValueError('Name "{}" has been defined in schedule space {}.'.format(name, self.name))
+        self.axes.append(name)
+        self.candidates[name] = list(candidates)
+        self.levels[name] = len(self.axes)
+
+    def derive(self, name: str, func: Callable[..., Any]):
+        if name in self.levels:
+            raise ValueError('Name "{}" has been defined in schedule space {}.'.format(name, self.name))
+        names, level = self._level_of(func)
+        self.level_items[level].append(('derive', name, names, func))
+        self.levels[name] = level
+
+    def constraint(self, func: Callable[..., bool], msg: str):
+        names, level = self._level_of(func)
+        self.level_items[level].append(('constraint', msg, names, func))
+
+    def _evaluate(self, level: int, point: Dict[str, Any]) -> bool:
+        for kind, name, names, func in self.level_items[level]:
+            value = func(*[point[n] for n in names])
+            if kind == 'derive':
+                point[name] = value
+            elif not value:
+                self.num_pruned[name] += 1
+                return False
+        return True
+
+    def _search(self, level: int, point: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        self.num_visited += 1
+        if not self._evaluate(level, point):
+            return
+        if level == len(self.axes):
+            self.num_points += 1
+            yield dict(point)
+            return
+        name = self.axes[level]
+        for value in self.candidates[name]:
+            point[name] = value
+            yield from self._search(level + 1, point)
+
+    def enumerate(self) -> List[Dict[str, Any]]:
+        """
+        Enumerate all the valid points of the space.
+
+        Returns
+        -------
+        ret: List[Dict[str, Any]]
+            The valid points, each is a dict from the name of each axis and derived value to its value. The points
+            are ordered as nested loops over the axes in definition order, the first axis being the outermost.
+        """
+        self.num_visited = 0
+        self.num_points = 0
+        self.num_pruned.clear()
+        with Timer() as timer:
+            points = list(self._search(0, {}))
+        self.enumerate_seconds = timer.elapsed_seconds()
+        return points
+
+    def size(self) -> int:
+        size = 1
+        for name in self.axes:
+            size *= len(self.candidates[name])
+        return size
+
+    def report(self) -> str:
+        lines = ['Schedule space {}: {} valid points of {} in {:.3f} seconds ({} nodes visited).'.format(
+            self.name, self.num_points, self.size(), self.enumerate_seconds, self.num_visited)]
+        for msg, count in sorted(self.num_pruned.items(), key=lambda item: -item[1]):
+            lines.append('  {:>6} pruned by: {}'.format(count, msg))
+        return '\n'.join(lines)
@@ -249,12 +249,46 @@ class Tensor:
         # convert if this tensor is not in row major layout
         storage = self.contiguous().storage
 
-        # because numpy does not support bfloat16, we convert it into float32
+        array = storage.as_array(num_elements=prod(self.shape), dtype=self.dtype)
         if self.dtype == 'bfloat16':
-            return self.cast('float32').numpy()
-        else:
-            array = storage.as_array(num_elements=prod(self.shape), dtype=self.dtype)
-            return array.reshape(self.shape)
+            # because numpy does not support bfloat16, we convert it into float32, whose upper 16 bits are bfloat16
+            array = (array.astype(np.uint32) << 16).view(np.float32)
+        return array.reshape(self.shape)
+
+    @property
+    def __array_interface__(self):
+        # numpy (np.asarray) views the memory of a cpu tensor without copying, see
+        # https://numpy.org/doc/stable/reference/arrays.interface.html
+        if self.device != 'cpu' or self.storage is None:
+            raise TypeError('Can only view a cpu tensor with storage as numpy array, got {}.'.format(self.signature()))
+        if not isinstance(self.layout, RowMajorLayout):
+            raise TypeError('Can only view a tensor in row major layout as numpy array, please use .contiguous() first.')
+        if self.dtype not in dtype2numpy:
+            raise TypeError('Numpy does not support data type {}, please use .numpy() to convert.'.format(self.dtype))
+        return {
+            'shape': tuple(self.shape),
+            'typestr': np.dtype(dtype2numpy[self.dtype]).str,
+            'data': (self.storage.addr, False),
+            'version': 3
+        }
+
+    def __dlpack__(self, stream=None):
+        from .dlpack import to_dlpack
+        return to_dlpack(self)
+
+    def __dlpack_device__(self) -> Tuple[int, int]:
+        from .dlpack import kDLCPU, kDLCUDA
+        return (kDLCPU if self.device == 'cpu' else kDLCUDA), 0
+
+
+dtype2numpy = {
+    'float32': np.float32,
+    'float16': np.float16,
+    'int32': np.int32,
+    'int64': np.int64,
+    'uint8': np.uint8,
+    'bool': np.bool_
+}
 
 
 def dtype_bytes(dtype: str):
@@ -282,7 +316,11 @@ def symbol(shape: Sequence[int], dtype: str = 'float32', device: str = 'cuda', l
 
 def zeros(shape: Sequence[int], dtype: str = 'float32', device: str = 'cuda', layout: Optional[DataLayout] = None) -> Tensor:
     tensor = empty(shape, dtype, device, layout)
-    cuda.memset_async(tensor.storage.addr, tensor.nbytes, value=0)
+    if device == 'cpu':
+        # the cpu memory may not be accessible by cuda (see hidet.runtime.storage.CpuStorageDevice)
+        ctypes.memset(tensor.storage.addr, 0, tensor.nbytes)
+    else:
+        cuda.memset_async(tensor.storage.addr, tensor.nbytes, value=0)
     return tensor
 
 
@@ -304,14 +342,25 @@ def ones(shape: Sequence[int], dtype: str = 'float32', device: str = 'cuda', lay
 
 def full(shape: Sequence[int], fill_value, dtype: str = 'float32', device: str = 'cuda', layout: Optional[DataLayout] = None) -> Tensor:
     tensor = empty(shape, dtype, device, layout)
-    cuda_kernels.fill_value(tensor.storage.addr, tensor.nbytes, value=fill_value, dtype=dtype)
+    if device == 'cpu':
+        array = tensor.storage.as_array(num_elements=prod(tensor.shape), dtype=dtype)
+        if dtype == 'bfloat16':
+            # the upper 16 bits of float32
+            fill_value = np.array(fill_value, dtype=np.float32).view(np.uint32) >> 16
+        array[:] = fill_value
+    else:
+        cuda_kernels.fill_value(tensor.storage.addr, tensor.nbytes, value=fill_value, dtype=dtype)
     return tensor
 
 
 def randn(shape: Sequence[int], dtype: str = 'float32', mean: float = 0.0, stddev: float = 1.0, device: str = 'cuda', layout: Optional[DataLayout] = None) -> Tensor:
     tensor = empty(shape, dtype, device, layout)
     if dtype == 'float32':
-        cuda.generate_normal(tensor.storage.addr, num_elements=prod(tensor.shape), mean=mean, stddev=stddev)
+        if device == 'cpu':
+            array = tensor.storage.as_array(num_elements=prod(tensor.shape), dtype=dtype)
+            array[:] = np.random.normal(mean, stddev, size=array.shape)
+        else:
+            cuda.generate_normal(tensor.storage.addr, num_elements=prod(tensor.shape), mean=mean, stddev=stddev)
     else:
         float32_tensor = randn_like(tensor, dtype='float32')
         return float32_tensor.cast(dtype=dtype)
@@ -357,26 +406,50 @@ def void_pointer_to_uint64(p):
 
 
 def from_numpy(array: np.ndarray) -> Tensor:
-    dtype_convert = {
-        np.dtype(np.float32): 'float32',
-        np.dtype(np.int64): 'int64',
-        np.dtype(np.int32): 'int32',
-        np.dtype(np.float16): 'float16',
-        np.dtype(np.bool): 'bool',
-        np.dtype(np.uint8): 'uint8'
-    }
-    if array.dtype not in dtype_convert:
+    """
+    Create a cpu tensor that shares the memory of the numpy array without copying. The array is kept alive as long as
+    the tensor. An array that is not c-contiguous is copied into a contiguous one first, and so is a read-only array
+    (e.g., an array from np.frombuffer on bytes, or a broadcast view), because the kernels and in-place operators may
+    write to the memory of the tensor.
+
+    Parameters
+    ----------
+    array: np.ndarray
+        The numpy array.
+
+    Returns
+    -------
+    ret: Tensor
+        The cpu tensor in row major layout.
+    """
+    numpy2dtype = {np.dtype(v): k for k, v in dtype2numpy.items()}
+    if array.dtype not in numpy2dtype:
         raise NotImplementedError("Do not support convert np.ndarray with data type '{}'.".format(array.dtype))
-    tensor = empty(shape=array.shape, dtype=dtype_convert[array.dtype], device='cpu')
-    cuda.memcpy_async(src_addr=void_pointer_to_uint64(array.ctypes.data_as(ctypes.c_void_p)),
-                      dst_addr=tensor.storage.addr,
-                      num_bytes=tensor.nbytes,
-                      kind=cuda.HostToHost)
-    cuda.device_synchronize()
-    return tensor
+    array = np.ascontiguousarray(array)
+    if not array.flags.writeable:
+        array = array.copy()
+    storage = Storage.wrap(device='cpu', addr=array.ctypes.data, num_bytes=array.nbytes, owner=array)
+    return Tensor(shape=list(array.shape), dtype=numpy2dtype[array.dtype], device='cpu', storage=storage)
 
 
 def array(obj: Union[List, Tuple, np.ndarray, Tensor]) -> Tensor:
+    """
+    Create a tensor from a list, tuple, numpy array or tensor.
+
+    Note that a numpy array is not copied any more: the returned tensor shares the memory of the (c-contiguous and
+    writable) array, as in from_numpy, so modifications of one are visible in the other. Use array(ndarray.copy())
+    to get a tensor that owns its memory.
+
+    Parameters
+    ----------
+    obj: Union[List, Tuple, np.ndarray, Tensor]
+        The data of the tensor. A tensor is returned as is.
+
+    Returns
+    -------
+    ret: Tensor
+        The created tensor.
+    """
     if isinstance(obj, np.ndarray):
         return from_numpy(obj)
     elif isinstance(obj, Tensor):
@@ -16,11 +16,20 @@ class Conv2dResolveRule(ResolveRule):
         assert isinstance(op, Conv2dOp)
         stride = ops.utils.normalize_stride(op.attrs['stride'])
         groups = op.attrs['groups']
-        if groups != 1:
-            return None
         data, weight = op.inputs
         kernel_size = weight.shape[2:]
-        if self.enable_winograd and tuple(stride) == (1, 1) and tuple(kernel_size) == (3, 3):
+        out_group_channels = weight.shape[0] // groups
+        if groups != 1:
+            if data.device != 'cpu':
+                # the grouped gemm is only profitable with the cpu schedules, keep the direct convolution on cuda
+                return None
+            if weight.shape[1] == 1 or out_group_channels < 8:
+                # depthwise (or nearly depthwise) convolution, where the gemm of each group is too small to be
+                # efficient, use the direct convolution
+                return None
+            # implicit gemm algorithm for each group
+            return [ops.conv2d_gemm(data, weight, stride, groups)]
+        if self.enable_winograd and data.device == 'cuda' and tuple(stride) == (1, 1) and tuple(kernel_size) == (3, 3):
             # winograd algorithm
             out = ops.conv2d_winograd(data, weight)
         else:
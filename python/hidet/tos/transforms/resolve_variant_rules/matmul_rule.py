@@ -22,6 +22,9 @@ class MatmulResolveRule(ResolveRule):
         assert isinstance(op, MatmulOp)
         a, b = op.inputs
         if op.attrs['algo'] == 'default':
+            if a.device == 'cpu':
+                # the cpu schedule parallelizes the blocks of the output, splitting k is not needed
+                return [matmul(a, b, 'direct', mma=op.attrs['mma'])]
             parallel_k = PassContext.current().configs['parallel_k']
             if parallel_k == 'disabled':
                 return [matmul(a, b, 'direct', mma=op.attrs['mma'])]
@@ -25,6 +25,7 @@ from .normalize_const_tensor import normalize_const_tensor_pass
 
 
 def lower(ir_module: IRModule) -> IRModule:
+    ctx = PassContext.current()
     transforms = [
         # necessary passes
         flatten_tensor_slice_pass(),
@@ -55,8 +56,10 @@ def lower(ir_module: IRModule) -> IRModule:
 
         # necessary pass
     ]
+    if ctx.unroll_budget is not None:
+        # explicitly unroll the loops within the code size budget
+        transforms.append(explicit_unroll_for_stmt_pass(unroll_budget=ctx.unroll_budget))
 
-    ctx = PassContext.current()
     for instrument in ctx.instruments:
         instrument.before_all_passes(ir_module)
     for transform in transforms:
@@ -8,9 +8,13 @@ from .instruments import PassInstrument
 class PassContext:
     stack: List['PassContext'] = []
 
-    def __init__(self, instruments: Optional[List[PassInstrument]] = None, verbose: bool = False):
-        self.instruments = instruments
+    def __init__(self, instruments: Optional[List[PassInstrument]] = None, verbose: bool = False,
+                 unroll_budget: Optional[int] = None):
+        self.instruments = instruments if instruments is not None else []
         self.verbose = verbose
+        # the code size budget (estimated number of statements per function) of explicit loop unrolling, None means
+        # lower does not unroll loops explicitly and leaves the unroll hints to the backend compiler
+        self.unroll_budget = unroll_budget
 
     @classmethod
     def current(cls):
@@ -74,7 +74,7 @@ class BuildLetStmtRewriter(StmtExprRewriter):
         with StmtContext(self):
             loop_var = self.visit_expr(stmt.loop_var)
             extent = self.visit_expr(stmt.extent)
-            with self.sb.for_loop(loop_var, extent, unroll=stmt.unroll):
+            with self.sb.for_loop(loop_var, extent, unroll=stmt.unroll, parallel=stmt.parallel, vectorize=stmt.vectorize):
                 self.visit(stmt.body)
 
     def visit_IfStmt(self, stmt: IfStmt):
@@ -125,7 +125,7 @@ class FuncStmtExprRewriterWithScope(FuncStmtExprRewriter):
             self.visit(stmt.extent)
             scope.declare(stmt.loop_var)
             body = scope.wrap(self.visit(stmt.body))
-            return ForStmt(stmt.loop_var, stmt.extent, stmt.unroll, body)
+            return ForStmt(stmt.loop_var, stmt.extent, stmt.unroll, body, stmt.parallel, stmt.vectorize)
 
     def visit_LetStmt(self, stmt: LetStmt):
         with self.new_scope(stmt) as scope:
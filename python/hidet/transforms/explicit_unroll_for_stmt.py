@@ -1,39 +1,221 @@
-from hidet.ir.expr import Constant, convert
-from hidet.ir.stmt import Stmt, ForStmt, SeqStmt
-from hidet.ir.functors import StmtRewriter, rewrite, clone
-from hidet.transforms.base import FunctionBodyPass
+from typing import Dict, List, Optional, Tuple
+from hidet.ir.expr import Var, Constant, convert
+from hidet.ir.func import Function
+from hidet.ir.stmt import Stmt, ForStmt, SeqStmt, LetStmt, IfStmt
+from hidet.ir.functors import StmtVisitor, StmtRewriter, rewrite, clone
+from hidet.transforms.base import FunctionBodyPass, PassContext
 from hidet.transforms.rule_based_simplifier import ConstExprSimplifier
 
 
+class StmtCounter(StmtVisitor):
+    """
+    Estimate the code size of a statement by the number of statements it would generate in the source code.
+    Each leaf statement counts one, a for loop counts one plus its body (the body only appears once in the
+    source code), and a let statement counts one for each bound variable.
+    """
+    def __init__(self):
+        super().__init__(use_memo=False)
+
+    def count(self, stmt: Stmt) -> int:
+        return self.visit(stmt)
+
+    def visit(self, node):
+        if node is None:
+            return 0
+        if isinstance(node, Stmt):
+            return StmtVisitor.visit(self, node)
+        return 0
+
+    def visit_EvaluateStmt(self, stmt):
+        return 1
+
+    def visit_BufferStoreStmt(self, stmt):
+        return 1
+
+    def visit_AssignStmt(self, stmt):
+        return 1
+
+    def visit_ReturnStmt(self, stmt):
+        return 1
+
+    def visit_AssertStmt(self, stmt):
+        return 1
+
+    def visit_AsmStmt(self, stmt):
+        return 1
+
+    def visit_BlackBoxStmt(self, stmt):
+        return 1
+
+    def visit_LetStmt(self, stmt: LetStmt):
+        return len(stmt.bind_vars) + self.visit(stmt.body)
+
+    def visit_ForStmt(self, stmt: ForStmt):
+        return 1 + self.visit(stmt.body)
+
+    def visit_IfStmt(self, stmt: IfStmt):
+        return 1 + self.visit(stmt.then_body) + self.visit(stmt.else_body)
+
+    def visit_SeqStmt(self, stmt: SeqStmt):
+        return sum(self.visit(s) for s in stmt.seq)
+
+
+def count_stmts(stmt: Stmt) -> int:
+    """
+    Estimate the number of statements in the generated source code of given statement.
+
+    Parameters
+    ----------
+    stmt: Stmt
+        The statement to estimate.
+
+    Returns
+    -------
+    ret: int
+        The estimated number of statements.
+    """
+    return StmtCounter().count(stmt)
+
+
 class ExplicitUnrollForStmtRewriter(StmtRewriter):
-    _unroll_threshold = 16
+    """
+    Unroll the for loops with constant extent under a code size budget.
 
-    def __init__(self):
+    The loops are processed from the innermost to the outermost. For each loop with constant extent, we try
+    the following in order:
+        1. If the extent does not exceed unroll_threshold and fully unrolling it keeps the estimated number of
+           statements of the function within unroll_budget, fully unroll it.
+        2. Otherwise, find the largest factor of the extent whose partial unrolling fits the budget, and unroll the
+           loop by that factor.
+        3. Otherwise, keep the loop and leave a '#pragma unroll' hint to the backend compiler.
+    The loops longer than unroll_threshold are not unrolled (unless they have an integer unroll hint), thus the budget
+    only caps the unrolling.
+    Loops with unroll=False are never unrolled, and loops with an integer unroll are unrolled by that factor
+    (if it fits the budget).
+    """
+    def __init__(self, unroll_threshold: int = 16, unroll_budget: Optional[int] = None):
         super().__init__()
+        self.unroll_threshold = unroll_threshold
+        self.unroll_budget = unroll_budget
         self.const_expr_simplifier = ConstExprSimplifier()
+        self.counter = StmtCounter()
+        self.num_stmts = 0
+        self.num_full_unrolled = 0
+        self.num_partial_unrolled = 0
+        self.num_kept = 0
+
+    def rewrite(self, stmt: Stmt) -> Stmt:
+        self.num_stmts = self.counter.count(stmt)
+        return self(stmt)
+
+    def fit_budget(self, increased_stmts: int) -> bool:
+        return self.unroll_budget is None or self.num_stmts + increased_stmts <= self.unroll_budget
 
     def visit_ForStmt(self, stmt: ForStmt):
         extent = self.const_expr_simplifier(self.visit_expr(stmt.extent))
         body = self(stmt.body)
-        if isinstance(extent, Constant) and isinstance(extent.value, int) and extent.value <= self._unroll_threshold:
-            unrolled_body = []
-            for i in range(extent.value):
-                unrolled_body.append(clone(rewrite(body, {stmt.loop_var: convert(i)})))
-            return SeqStmt(seq=unrolled_body)
-        else:
-            if extent is stmt.extent and body is stmt.body:
-                return stmt
+        if isinstance(extent, Constant) and isinstance(extent.value, int) and stmt.unroll is not False and not (stmt.parallel or stmt.vectorize):
+            n = extent.value
+            body_stmts = self.counter.count(body)
+            if isinstance(stmt.unroll, int) and not isinstance(stmt.unroll, bool):
+                factors = [stmt.unroll] if 1 < stmt.unroll <= n and n % stmt.unroll == 0 else []
+            elif n <= self.unroll_threshold:
+                # the budget only shrinks the unrolling of the loops that would be unrolled without it
+                factors = [f for f in range(n, 1, -1) if n % f == 0]
             else:
-                return ForStmt(stmt.loop_var, extent, stmt.unroll, body)
+                factors = []
+            for factor in factors:
+                # the loop statement itself disappears when fully unrolled
+                increased = (factor - 1) * body_stmts - (1 if factor == n else 0)
+                if self.fit_budget(increased):
+                    self.num_stmts += increased
+                    if factor == n:
+                        self.num_full_unrolled += 1
+                        return self.unroll(stmt.loop_var, body, factor)
+                    else:
+                        self.num_partial_unrolled += 1
+                        return self.partial_unroll(stmt.loop_var, n, body, factor)
+            if len(factors) > 0 and stmt.unroll is None:
+                # exceeded the budget, keep the loop and let the backend compiler decide
+                self.num_kept += 1
+                return ForStmt(stmt.loop_var, extent, True, body, stmt.parallel, stmt.vectorize)
+        if extent is stmt.extent and body is stmt.body:
+            return stmt
+        else:
+            return ForStmt(stmt.loop_var, extent, stmt.unroll, body, stmt.parallel, stmt.vectorize)
+
+    @staticmethod
+    def unroll(loop_var: Var, body: Stmt, extent: int) -> Stmt:
+        unrolled_body = []
+        for i in range(extent):
+            unrolled_body.append(clone(rewrite(body, {loop_var: convert(i)})))
+        return SeqStmt(seq=unrolled_body)
+
+    @staticmethod
+    def partial_unroll(loop_var: Var, extent: int, body: Stmt, factor: int) -> Stmt:
+        outer = Var(loop_var.hint + '_o' if loop_var.hint else None, loop_var.type)
+        unrolled_body = []
+        for i in range(factor):
+            unrolled_body.append(clone(rewrite(body, {loop_var: outer * factor + i})))
+        return ForStmt(outer, extent // factor, False, SeqStmt(seq=unrolled_body))
 
 
 class ExplicitUnrollForStmtPass(FunctionBodyPass):
+    def __init__(self, unroll_threshold: int = 16, unroll_budget: Optional[int] = None):
+        super().__init__()
+        self.unroll_threshold = unroll_threshold
+        self.unroll_budget = unroll_budget
+        # function name -> (number of statements before, number of statements after)
+        self.code_size: Dict[str, Tuple[int, int]] = {}
+        # the number of loops fully unrolled, partially unrolled and kept (over budget) in all functions
+        self.unroll_counts: Dict[str, int] = {'full': 0, 'partial': 0, 'kept': 0}
+
+    def process_func(self, func: Function) -> Function:
+        before = count_stmts(func.body)
+        func = FunctionBodyPass.process_func(self, func)
+        self.code_size[func.name] = (before, count_stmts(func.body))
+        if PassContext.current().verbose:
+            print('{}: {} statements before unrolling, {} after (budget {})'.format(
+                func.name, before, self.code_size[func.name][1], self.unroll_budget))
+        return func
+
     def process_body(self, stmt: Stmt) -> Stmt:
-        rewriter = ExplicitUnrollForStmtRewriter()
-        ret = rewriter(stmt)
-        # print(ret)
-        return ret
+        rewriter = ExplicitUnrollForStmtRewriter(self.unroll_threshold, self.unroll_budget)
+        stmt = rewriter.rewrite(stmt)
+        self.unroll_counts['full'] += rewriter.num_full_unrolled
+        self.unroll_counts['partial'] += rewriter.num_partial_unrolled
+        self.unroll_counts['kept'] += rewriter.num_kept
+        return stmt
+
+    def report(self) -> List[str]:
+        lines = []
+        for name, (before, after) in self.code_size.items():
+            lines.append('{:>40}: {:>8} -> {:>8} statements'.format(name, before, after))
+        return lines
+
+
+def explicit_unroll_for_stmt_pass(unroll_threshold: int = 16, unroll_budget: Optional[int] = None):
+    """
+    Explicitly unroll the for loops with constant extent.
+
+    Parameters
+    ----------
+    unroll_threshold: int
+        The maximum number of iterations of a loop to unroll explicitly.
+    unroll_budget: Optional[int]
+        The maximum estimated number of statements of each function after unrolling. None means no limit, which
+        fully unrolls every loop whose extent does not exceed unroll_threshold. The lower pipeline only runs this
+        pass when PassContext.unroll_budget is set.
 
+    Returns
+    -------
+    ret: ExplicitUnrollForStmtPass
+        The pass.
 
-def explicit_unroll_for_stmt_pass():
-    return ExplicitUnrollForStmtPass()
+    Notes
+    -----
+    Even without a budget, the pass respects the unroll hints of the loops, which the earlier version ignored: a loop
+    with unroll=False (and a parallel or vectorized loop) is never unrolled, and a loop with an integer unroll is
+    partially unrolled by that factor instead of fully unrolled.
+    """
+    return ExplicitUnrollForStmtPass(unroll_threshold, unroll_budget)
@@ -1,5 +1,6 @@
 from . import doc
 from . import cuda
+from . import cpu
 from . import namer
 from . import py
 from . import netron
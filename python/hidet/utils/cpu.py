@@ -0,0 +1,84 @@
+import os
+import ctypes
+import platform
+import warnings
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+# used when the cache hierarchy can not be queried from the operating system
+_default_cache_bytes = {
+    1: 32 * 1024,
+    2: 1024 * 1024,
+    3: 8 * 1024 * 1024
+}
+
+
+@lru_cache()
+def query_num_cores() -> int:
+    """
+    Get the number of logical cores available to this process, which is the default number of openmp threads.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _parse_size(text: str) -> int:
+    text = text.strip().upper()
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text[-1] in units:
+        return int(text[:-1]) * units[text[-1]]
+    return int(text)
+
+
+@lru_cache()
+def _query_caches() -> Dict[int, int]:
+    caches = {}
+    root = '/sys/devices/system/cpu/cpu0/cache'
+    if platform.system() != 'Linux' or not os.path.isdir(root):
+        return caches
+    for index in os.listdir(root):
+        path = os.path.join(root, index)
+        try:
+            with open(os.path.join(path, 'level')) as f:
+                level = int(f.read())
+            with open(os.path.join(path, 'type')) as f:
+                cache_type = f.read().strip()
+            with open(os.path.join(path, 'size')) as f:
+                size = _parse_size(f.read())
+        except (OSError, ValueError, IndexError):
+            continue
+        if cache_type == 'Instruction':
+            continue
+        caches[level] = size
+    return caches
+
+
+def query_cache_bytes(level: int) -> int:
+    """
+    Get the size of the data cache in bytes of given level (1, 2 or 3) of a core.
+    """
+    return _query_caches().get(level, _default_cache_bytes[level])
+
+
+@lru_cache()
+def _openmp_library() -> Optional[ctypes.CDLL]:
+    # the kernels are linked against libgomp, loading it again gives the same instance of openmp runtime
+    for name in ['libgomp.so.1', 'libgomp.so']:
+        try:
+            return ctypes.CDLL(name)
+        except OSError:
+            continue
+    return None
+
+
+def set_omp_num_threads(num_threads: int):
+    """
+    Set the number of openmp threads used by the parallel loops of the kernels launched from the calling thread.
+    """
+    lib = _openmp_library()
+    if lib is None:
+        warnings.warn('Can not find the openmp runtime library, ignore setting the number of threads.')
+        return
+    lib.omp_set_num_threads(ctypes.c_int(num_threads))
@@ -1,4 +1,5 @@
 import os
+import time
 import subprocess
 from functools import lru_cache
 from subprocess import PIPE
@@ -234,6 +235,40 @@ def turn_on_persistent_mode():
         subprocess.run(command.split(), check=True)
 
 
+def wait_for_stable_gpu(max_temperature: Optional[int] = None, timeout: float = 30.0, interval: float = 0.5) -> bool:
+    """
+    Wait until the gpu is not thermally throttled (and not hotter than max_temperature, if given).
+
+    Parameters
+    ----------
+    max_temperature: Optional[int]
+        The maximum temperature in degrees Celsius. None means only checking the throttle reasons.
+    timeout: float
+        The maximum waiting time in seconds.
+    interval: float
+        The polling interval in seconds.
+
+    Returns
+    -------
+    ret: bool
+        True if the gpu is stable, False if timeout or nvidia-smi is not available.
+    """
+    thermal_reasons = ['sw_thermal_slowdown', 'hw_thermal_slowdown', 'hw_slowdown']
+    start = time.time()
+    while True:
+        try:
+            reasons = query_clocks_throttle_reason().split('/')
+            temperature = query_gpu_temperature()
+        except (OSError, subprocess.CalledProcessError, ValueError, NotImplementedError):
+            return False
+        throttled = any(reason in thermal_reasons for reason in reasons)
+        if not throttled and (max_temperature is None or temperature <= max_temperature):
+            return True
+        if time.time() - start > timeout:
+            return False
+        time.sleep(interval)
+
+
 class BenchmarkContext:
     def __init__(self, lock_clock=True):
         self.lock_clock = lock_clock
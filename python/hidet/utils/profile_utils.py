@@ -24,7 +24,8 @@ class TraceEvent:
             'ts': self.time_stamp / 1000.0,
             'pid': self.pid,
             'tid': self.tid,
-            'args': {k: str(v) for k, v in self.args.items()}
+            # the values of counter events are plotted, thus should be numbers
+            'args': self.args if self.event_type == 'C' else {k: str(v) for k, v in self.args.items()}
         }
         return event
 
@@ -56,22 +57,23 @@ class CudaTraceEvent(TraceEvent):
 
 
 class TraceContext:
-    def __init__(self, tracer, name, category, args, trace_cuda=False):
+    def __init__(self, tracer, name, category, args, trace_cuda=False, tid=0):
         self.tracer: Tracer = tracer
         self.name = name
         self.category = category
         self.args = args
         self.trace_cuda = trace_cuda
+        self.tid = tid
 
     def __enter__(self):
-        self.tracer.events.append(CpuTraceEvent(self.name, self.category, 'B', 0, self.args))
+        self.tracer.events.append(CpuTraceEvent(self.name, self.category, 'B', self.tid, self.args))
         if self.trace_cuda:
             self.tracer.events.append(CudaTraceEvent(self.name, self.category, 'B', 1, self.args))
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.trace_cuda:
             self.tracer.events.append(CudaTraceEvent(self.name, self.category, 'E', 1, self.args))
-        self.tracer.events.append(CpuTraceEvent(self.name, self.category, 'E', 0, self.args))
+        self.tracer.events.append(CpuTraceEvent(self.name, self.category, 'E', self.tid, self.args))
 
 
 class Tracer:
@@ -80,8 +82,7 @@ class Tracer:
         self.tracing: bool = False
 
     def export(self) -> Dict:
-        from hidet.ffi.cuda_api import cuda
-        cuda.device_synchronize()  # sync cuda events in trace
+        self.synchronize()
         ret = {
             'traceEvents': [event.export() for event in self.events],
             'displayTimeUnit': 'ns'
@@ -93,18 +94,28 @@ class Tracer:
         json.dump(self.export(), f)
 
     def clear(self):
-        from hidet.ffi.cuda_api import cuda
-        cuda.device_synchronize()  # sync cuda events in trace
+        self.synchronize()
         self.events.clear()
 
+    def synchronize(self):
+        # sync cuda events in trace, there is no need to sync (and there may be no cuda device) for cpu events only
+        if any(isinstance(event, CudaTraceEvent) for event in self.events):
+            from hidet.ffi.cuda_api import cuda
+            cuda.device_synchronize()
+
     def turn_on(self, turn_on=True):
         self.tracing = turn_on
 
-    def profile(self, name: str, category: str = 'python', args: Optional[Dict[str, Any]] = None, trace_cuda=False) -> ContextManager:
+    def profile(self, name: str, category: str = 'python', args: Optional[Dict[str, Any]] = None, trace_cuda=False, tid=0) -> ContextManager:
         if self.tracing:
-            return TraceContext(self, name, category, args, trace_cuda)
+            return TraceContext(self, name, category, args, trace_cuda, tid)
         else:
             return nullcontext()
 
+    def counter(self, name: str, values: Dict[str, float], category: str = 'memory', tid=0):
+        # a counter track, e.g., the memory usage of a memory pool
+        if self.tracing:
+            self.events.append(CpuTraceEvent(name, category, 'C', tid, values))
+
 
 tracer = Tracer()
@@ -0,0 +1,51 @@
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <cerrno>
+#include <sys/mman.h>
+#include <hidet/common.h>
+#include <hidet/logging.h>
+
+DLL uint64_t hidet_cpu_malloc_aligned(uint64_t bytes, uint64_t alignment) {
+    API_BEGIN();
+    void *ptr = nullptr;
+    int status = posix_memalign(&ptr, alignment, bytes);
+    if(status != 0) {
+        if(status == ENOMEM) {
+            // out of memory
+            return 0;
+        }
+        throw HidetException(__FILE__, __LINE__, std::string("posix_memalign failed: ") + strerror(status));
+    }
+    return reinterpret_cast<uint64_t>(ptr);
+    API_END(0);
+}
+
+DLL void hidet_cpu_free_aligned(uint64_t addr) {
+    API_BEGIN();
+    free(reinterpret_cast<void*>(addr));
+    API_END();
+}
+
+DLL uint64_t hidet_cpu_mmap(uint64_t bytes, int huge_page) {
+    API_BEGIN();
+    void *ptr = mmap(nullptr, bytes, PROT_READ | PROT_WRITE, MAP_PRIVATE | MAP_ANONYMOUS, -1, 0);
+    if(ptr == MAP_FAILED) {
+        // out of memory
+        return 0;
+    }
+    if(huge_page) {
+        // transparent huge pages, ignored when the kernel does not support it
+        madvise(ptr, bytes, MADV_HUGEPAGE);
+    }
+    return reinterpret_cast<uint64_t>(ptr);
+    API_END(0);
+}
+
+DLL void hidet_cpu_munmap(uint64_t addr, uint64_t bytes) {
+    API_BEGIN();
+    if(munmap(reinterpret_cast<void*>(addr), bytes) != 0) {
+        throw HidetException(__FILE__, __LINE__, std::string("munmap failed: ") + strerror(errno));
+    }
+    API_END();
+}
@@ -249,3 +249,16 @@ DLL uint64_t hidet_cuda_get_device_property(uint64_t device_id, const char *prop
     }
     API_END(0);
 }
+
+DLL int hidet_cuda_device_count() {
+    API_BEGIN();
+    int count = 0;
+    cudaError_t status = cudaGetDeviceCount(&count);
+    if(status != cudaSuccess) {
+        // no driver or no device, e.g., on a cpu-only machine
+        cudaGetLastError();
+        return 0;
+    }
+    return count;
+    API_END(0);
+}
@@ -13,6 +13,14 @@ DLL void CallPackedFunc(PackedFunc func, void** args) {
     f(func.num_args, func.arg_types, args);
 }
 
+// Call a sequence of packed functions, where args[i] is the argument array of funcs[i]. It is used to run a whole
+// flow graph in a single call from python (see hidet.runtime.execution_plan).
+DLL void CallPackedFuncs(int num_funcs, PackedFunc* funcs, void*** args) {
+    for(int i = 0; i < num_funcs; i++) {
+        CallPackedFunc(funcs[i], args[i]);
+    }
+}
+
 DLL void ProfilePackedFunc(PackedFunc func, void** args, int warmup, int number, int repeat, float* results) {
     cudaEvent_t start, end;
     CUDA_CALL(cudaEventCreate(&start));
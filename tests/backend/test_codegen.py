@@ -0,0 +1,33 @@
+from hidet.ir.expr import var, scalar_var, tensor_var, convert
+from hidet.ir.stmt import ForStmt, AssignStmt, BufferStoreStmt, SeqStmt
+from hidet.ir.func import Function, IRModule
+from hidet.ir.dialects.lowlevel import VoidType
+from hidet.backend.codegen import codegen
+
+
+def parallel_pragma(body, local_vars, prologue=None):
+    # generate a host kernel with `prologue; for i in parallel(8): body(i)` and return the pragma of the loop
+    i = var('i')
+    loop = ForStmt(i, convert(8), body=body(i), parallel=True)
+    func = Function('kernel', params=[], body=SeqStmt([prologue, loop]) if prologue else loop, ret_type=VoidType(),
+                    kind='host_kernel', local_vars=local_vars)
+    source = codegen(IRModule(funcs={func.name: func}))
+    return [line.strip() for line in source.split('\n') if line.strip().startswith('#pragma omp parallel')][0]
+
+
+def test_loop_only_locals_are_private():
+    acc = scalar_var('acc')
+    buf = tensor_var('buf', shape=[4], scope='register')
+    pragma = parallel_pragma(lambda i: SeqStmt([BufferStoreStmt(buf, [0], convert(1.0)), AssignStmt(acc, acc + buf[0])]),
+                             local_vars=[acc, buf])
+    assert 'private(acc, buf)' in pragma and 'firstprivate' not in pragma
+
+
+def test_values_before_loop_are_firstprivate():
+    # acc and buf are initialized before the loop and read in the loop body
+    acc, t = scalar_var('acc'), scalar_var('t')
+    buf = tensor_var('buf', shape=[4], scope='register')
+    prologue = SeqStmt([AssignStmt(acc, convert(1.0)), AssignStmt(t, convert(2.0)), BufferStoreStmt(buf, [0], convert(3.0))])
+    pragma = parallel_pragma(lambda i: SeqStmt([AssignStmt(t, acc * 2.0), AssignStmt(acc, acc + t + buf[0])]),
+                             local_vars=[acc, t, buf], prologue=prologue)
+    assert ' private(t)' in pragma and 'firstprivate(acc, buf)' in pragma
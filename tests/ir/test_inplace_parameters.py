@@ -0,0 +1,36 @@
+import hidet
+from hidet.tos import ops
+from hidet.ir.task import inplace_parameters
+
+
+def symbol(*shape):
+    return hidet.symbol(list(shape), device='cpu')
+
+
+def inplace_inputs(y):
+    # the indices of the inputs of the operator producing y, whose memory can be reused by y
+    params = inplace_parameters(y.op.task)
+    return [i for i, param in enumerate(y.op.task.parameters[:len(y.op.inputs)]) if param in params], y.op.inplace_inputs()
+
+
+def test_elementwise():
+    assert inplace_inputs(ops.relu(symbol(4, 8))) == ([0], [0])
+    assert inplace_inputs(ops.add(symbol(4, 8), symbol(4, 8))) == ([0, 1], [0, 1])
+
+
+def test_broadcast():
+    # only the input with the same shape as the output can be reused
+    assert inplace_inputs(ops.add(symbol(4, 8), symbol(1, 8))) == ([0], [0])
+    assert inplace_inputs(ops.add(symbol(8), symbol(4, 8))) == ([1], [1])
+
+
+def test_not_elementwise():
+    # the inputs are read at other indices than the output element being computed
+    assert inplace_inputs(ops.transpose(symbol(8, 8), [1, 0])) == ([], [])
+    assert inplace_inputs(ops.matmul(symbol(8, 8), symbol(8, 8))) == ([], [])
+    assert inplace_inputs(ops.softmax(symbol(4, 8), axis=1)) == ([], [])
+
+
+def test_same_tensor_passed_twice():
+    x = symbol(4, 8)
+    assert inplace_inputs(ops.add(x, x))[1] == [0, 1]
@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+import pytest
+import hidet
+from hidet.runtime.storage import StorageDevice, CachingMemoryPool
+from hidet.runtime.cuda_stream import CudaStream
+
+
+class FakeDevice(StorageDevice):
+    # hands out fake addresses (the pool never touches the memory), named 'cuda' so that the pool uses streams
+    def __init__(self):
+        super().__init__()
+        self.next_addr = 1 << 20
+        self.segments = {}
+
+    def name(self):
+        return 'cuda'
+
+    def allocate(self, nbytes) -> int:
+        if self.froze:
+            raise MemoryError('Should not allocate when the device is frozen.')
+        addr = self.next_addr
+        self.next_addr += nbytes + (1 << 20)
+        self.segments[addr] = nbytes
+        return addr
+
+    def free(self, addr):
+        if self.froze:
+            raise MemoryError('Should not free when the device is frozen.')
+        del self.segments[addr]
+
+    def allocated_memory(self) -> int:
+        return sum(self.segments.values())
+
+    def peak_allocated_memory(self) -> int:
+        return self.allocated_memory()
+
+    def free_memory(self) -> int:
+        return 0
+
+    def total_memory(self) -> int:
+        return 0
+
+
+@pytest.fixture
+def pool():
+    return CachingMemoryPool(FakeDevice(), block_size=512)
+
+
+def test_split_and_coalesce(pool):
+    a = pool.allocate(1000)
+    b = pool.allocate(3000)
+    c = pool.allocate(512)
+    # the small requests are split from the same 2 MiB segment
+    assert len(pool.storage_device.segments) == 1
+    assert a.num_bytes == 1024 and b.num_bytes == 3072
+    assert b.addr == a.addr + 1024 and c.addr == b.addr + 3072
+    del b
+    # the freed block in the middle is reused by a request that fits it
+    d = pool.allocate(2048)
+    assert d.addr == a.addr + 1024
+    del a, c, d
+    # all the blocks are coalesced back to the whole segment
+    assert pool.largest_free_block() == CachingMemoryPool.small_segment_size
+    assert pool.release_free_segments() == 1
+    assert len(pool.storage_device.segments) == 0
+
+
+def test_large_blocks(pool):
+    a = pool.allocate(4 * 1024 ** 2)
+    # served from the remaining 16 MiB of the 20 MiB segment
+    b = pool.allocate(12 * 1024 ** 2)
+    # exceeds the remaining 4 MiB, and a huge request gets a segment of its own
+    c = pool.allocate(18 * 1024 ** 2)
+    assert sorted(pool.storage_device.segments.values()) == [18 * 1024 ** 2, CachingMemoryPool.large_segment_size]
+    assert b.addr == a.addr + 4 * 1024 ** 2
+    del a, b, c
+    assert pool.release_free_segments() == 2
+
+
+def test_reuse_across_streams(pool, monkeypatch):
+    monkeypatch.setattr(CudaStream, 'stack', [])
+    a = pool.allocate(1024)
+    addr = a.addr
+    del a
+    # a block freed on the default stream is not reused by another stream without synchronization
+    CudaStream.stack.append(SimpleNamespace(handle=1))
+    b = pool.allocate(1024)
+    assert b.addr != addr
+    del b
+    CudaStream.stack.pop()
+    c = pool.allocate(1024)
+    assert c.addr == addr
+
+
+def test_capture_with_pinned_stream(pool, monkeypatch):
+    # the steps of CudaGraph: warm up on the default stream, freeze the device and capture on another stream
+    monkeypatch.setattr(CudaStream, 'stack', [])
+    pool.pin_stream(0)
+
+    def run():
+        x = pool.allocate(4096)
+        y = pool.allocate(2 * 1024 ** 2)
+        z = pool.allocate(4096)
+        del x
+        return y, z
+
+    for _ in range(2):
+        run()
+    pool.storage_device.freeze(True)
+    CudaStream.stack.append(SimpleNamespace(handle=1))
+    try:
+        run()
+    finally:
+        CudaStream.stack.pop()
+        pool.storage_device.freeze(False)
+
+
+@pytest.mark.skipif(hidet.ffi.cuda.device_count() == 0, reason='requires a cuda device')
+def test_cuda_graph():
+    x = hidet.symbol([2, 16], device='cuda')
+    y = hidet.tos.ops.relu(x.unsqueeze(0).squeeze(0)) + 1.0
+    graph = hidet.trace_from(y, inputs=[x])
+    cuda_graph = graph.cuda_graph()
+    data = hidet.randn([2, 16], device='cuda')
+    outputs = cuda_graph.run_with_inputs([data])
+    expected = graph(data)
+    assert abs(outputs[0].cpu().numpy() - expected.cpu().numpy()).max() < 1e-6
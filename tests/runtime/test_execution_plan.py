@@ -0,0 +1,18 @@
+import shutil
+import numpy as np
+import pytest
+import hidet
+from hidet.tos import ops
+from hidet.runtime.execution_plan import create_execution_plan
+
+
+@pytest.mark.skipif(shutil.which('nvcc') is None, reason='requires nvcc to build the kernels')
+def test_input_signature_check():
+    x = hidet.symbol([2, 3], device='cpu')
+    plan = create_execution_plan(hidet.trace_from(ops.relu(x), x))
+    data = np.random.randn(2, 3).astype(np.float32)
+    np.testing.assert_allclose(plan(hidet.array(data.copy())).numpy(), np.maximum(data, 0.0))
+    for mismatched in [hidet.symbol([3, 2], device='cpu'), hidet.symbol([2, 3], dtype='int32', device='cpu'),
+                       hidet.symbol([2, 3], device='cuda')]:
+        with pytest.raises(ValueError):
+            plan(mismatched)
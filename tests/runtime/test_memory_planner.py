@@ -0,0 +1,53 @@
+import random
+import pytest
+import hidet
+from hidet.tos import ops
+from hidet.runtime.memory_planner import TensorLifetime, analyze_lifetimes, assign_offsets
+
+
+def random_lifetimes(num_tensors, num_nodes, seed):
+    rng = random.Random(seed)
+    lifetimes = []
+    for _ in range(num_tensors):
+        start = rng.randrange(num_nodes)
+        end = rng.randrange(start, num_nodes)
+        lifetimes.append(TensorLifetime(tensor=None, start=start, end=end, nbytes=rng.randrange(1, 64) * 256))
+    return lifetimes
+
+
+@pytest.mark.parametrize('policy', ['greedy_by_size', 'best_fit'])
+@pytest.mark.parametrize('seed', range(8))
+def test_assign_offsets_no_overlap(policy, seed):
+    lifetimes = random_lifetimes(num_tensors=40, num_nodes=20, seed=seed)
+    arena_size = assign_offsets(lifetimes, policy)
+    for i, a in enumerate(lifetimes):
+        assert a.offset >= 0 and a.offset + a.nbytes <= arena_size
+        for b in lifetimes[i + 1:]:
+            if a.overlap(b):
+                # the tensors alive at the same time do not share memory
+                assert a.offset + a.nbytes <= b.offset or b.offset + b.nbytes <= a.offset
+    # the arena is no larger than the total size, and no smaller than the live tensors of any node
+    assert arena_size <= sum(v.nbytes for v in lifetimes)
+    for idx in range(20):
+        assert arena_size >= sum(v.nbytes for v in lifetimes if v.start <= idx <= v.end)
+
+
+def test_assign_offsets_reuse():
+    # the tensors with disjoint lifetimes share the memory
+    lifetimes = [TensorLifetime(None, 0, 1, 1024), TensorLifetime(None, 1, 2, 1024), TensorLifetime(None, 2, 3, 1024)]
+    assert assign_offsets(lifetimes, 'greedy_by_size') == 2048
+    assert lifetimes[0].offset == lifetimes[2].offset != lifetimes[1].offset
+
+
+def test_analyze_lifetimes_inplace():
+    x = hidet.symbol([4, 8], device='cpu')
+    y = ops.relu(x)
+    z = ops.add(y, y)
+    w = ops.matmul(ops.relu(z), x.transpose([1, 0]))
+    graph = hidet.trace_from(w, x)
+    graph.update_nodes()
+    lifetimes = analyze_lifetimes(graph, alignment=256)
+    shared = [v for v in lifetimes if len(v.tensors) > 1]
+    # the outputs of add and the second relu are written in place, the input of the graph is never written
+    assert len(shared) == 1 and len(shared[0].tensors) == 3
+    assert all(t is not x for v in lifetimes for t in v.tensors)
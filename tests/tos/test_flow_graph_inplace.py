@@ -0,0 +1,40 @@
+import shutil
+import numpy as np
+import pytest
+import hidet
+from hidet.tos import ops
+
+pytestmark = pytest.mark.skipif(shutil.which('nvcc') is None, reason='requires nvcc to build the kernels')
+
+
+def run(graph, *arrays):
+    inputs = [hidet.array(array.copy()) for array in arrays]
+    outputs = graph(*inputs)
+    # the graph inputs are never written
+    for tensor, array in zip(inputs, arrays):
+        np.testing.assert_array_equal(tensor.numpy(), array)
+    return outputs.numpy()
+
+
+def test_chain_inplace():
+    x = hidet.symbol([4, 8], device='cpu')
+    graph = hidet.trace_from(ops.add(ops.relu(ops.neg(x)), 1.0), x)
+    data = np.random.randn(4, 8).astype(np.float32)
+    np.testing.assert_allclose(run(graph, data), np.maximum(-data, 0.0) + 1.0)
+
+
+def test_view_of_graph_input():
+    # the squeezed view shares the storage of the graph input
+    x = hidet.symbol([1, 4, 8], device='cpu')
+    graph = hidet.trace_from(ops.relu(ops.squeeze(x, 0)), x)
+    data = np.random.randn(1, 4, 8).astype(np.float32)
+    np.testing.assert_allclose(run(graph, data), np.maximum(data[0], 0.0))
+
+
+def test_view_of_live_intermediate():
+    # the view dies at neg, but the tensor it views is still used by the add
+    x = hidet.symbol([1, 4, 8], device='cpu')
+    a = ops.relu(x)
+    graph = hidet.trace_from(ops.add(ops.neg(ops.squeeze(a, 0)), ops.squeeze(a, 0)), x)
+    data = np.random.randn(1, 4, 8).astype(np.float32)
+    np.testing.assert_allclose(run(graph, data), np.zeros([4, 8], dtype=np.float32))
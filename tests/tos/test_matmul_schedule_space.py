@@ -0,0 +1,45 @@
+import itertools
+import pytest
+import hidet
+from hidet.tos.ops.schedules.common import NotSupportedError
+from hidet.tos.ops.schedules.space import ScheduleSpace
+from hidet.tos.ops.schedules.cuda.matmul import bmm, bmm_wb
+
+
+def exhaustive_schedules(module, space_level):
+    # construct the schedules of all points in the space, and keep the ones that pass the checks in __init__
+    space = module.MatmulSchedule.space(space_level)
+    schedules = []
+    for values in itertools.product(*[space.candidates[name] for name in space.axes]):
+        point = dict(zip(space.axes, values))
+        try:
+            schedules.append(module.MatmulSchedule(
+                block_warps_k=point['k_config'][0],
+                warp_k=point['k_config'][1],
+                block_warps=point['block_warps'],
+                warp_outer=point['warp_outer'],
+                atom_layout=point['atom'][1],
+                atom_layout_name=point['atom'][0],
+                warp_inner=point['warp_inner']
+            ))
+        except NotSupportedError:
+            pass
+    return schedules
+
+
+@pytest.mark.skipif(hidet.ffi.cuda.device_count() == 0, reason='requires a cuda device')
+@pytest.mark.parametrize('module', [bmm, bmm_wb])
+@pytest.mark.parametrize('space_level', [1, 2])
+def test_space_matches_schedule_checks(module, space_level):
+    expected = sorted(str(sch) for sch in exhaustive_schedules(module, space_level))
+    actual = sorted(str(sch) for sch in module.MatmulSchedule.schedules(space_level))
+    assert len(actual) > 0 and actual == expected
+
+
+@pytest.mark.skipif(hidet.ffi.cuda.device_count() == 0, reason='requires a cuda device')
+def test_points_rejected_by_schedule_checks_are_skipped(monkeypatch):
+    # without the declarative constraints, the schedule checks alone must filter the points
+    expected = sorted(str(sch) for sch in exhaustive_schedules(bmm, 1))
+    monkeypatch.setattr(ScheduleSpace, 'constraint', lambda self, func, msg: None)
+    actual = sorted(str(sch) for sch in bmm.MatmulSchedule.schedules(1))
+    assert actual == expected
@@ -0,0 +1,48 @@
+import shutil
+import numpy as np
+import pytest
+import hidet
+from hidet.tos import ops
+from hidet.tos.ops.definitions import NormalizeOp
+
+requires_nvcc = pytest.mark.skipif(shutil.which('nvcc') is None, reason='requires nvcc to build the kernels')
+
+
+def np_softmax(x: np.ndarray, axis: int) -> np.ndarray:
+    e = np.exp(x - x.max(axis=axis, keepdims=True))
+    return e / e.sum(axis=axis, keepdims=True)
+
+
+def np_normalize(x: np.ndarray, dims, epsilon: float = 1e-5) -> np.ndarray:
+    dims = tuple(dims)
+    x = x - x.mean(axis=dims, keepdims=True)
+    return x / np.sqrt(np.square(x).mean(axis=dims, keepdims=True) + epsilon)
+
+
+def test_normalize_operator_cpu():
+    graph = hidet.trace_from(ops.layer_norm(hidet.symbol([2, 8, 16], device='cpu')))
+    assert [type(op) for op in graph.nodes] == [NormalizeOp]
+
+
+@pytest.mark.skipif(hidet.ffi.cuda.device_count() == 0, reason='requires a cuda device')
+def test_normalize_operator_cuda():
+    # NormalizeOp only has a cpu schedule, the cuda graphs use the reduce operators
+    graph = hidet.trace_from(ops.layer_norm(hidet.symbol([2, 8, 16], device='cuda')))
+    assert not any(isinstance(op, NormalizeOp) for op in graph.nodes)
+
+
+@requires_nvcc
+@pytest.mark.parametrize('shape, axis', [([4, 33], 1), ([4, 33], 0), ([2, 7, 5, 9], 1), ([3, 130], 1)])
+def test_softmax_cpu(shape, axis):
+    x = np.random.randn(*shape).astype(np.float32) * 4.0
+    y = ops.softmax(hidet.array(x.copy()), axis=axis)
+    np.testing.assert_allclose(y.numpy(), np_softmax(x, axis), rtol=1e-5, atol=1e-6)
+
+
+@requires_nvcc
+@pytest.mark.parametrize('shape, dims', [([4, 33], [1]), ([2, 8, 31], [2]), ([2, 3, 5, 7], [2, 3]), ([2, 6, 65], [1, 2])])
+def test_normalize_cpu(shape, dims):
+    # a large mean checks the numerical stability of the single-pass variance
+    x = np.random.randn(*shape).astype(np.float32) + 100.0
+    y = ops.normalize(hidet.array(x.copy()), dims)
+    np.testing.assert_allclose(y.numpy(), np_normalize(x.astype(np.float64), dims), rtol=1e-3, atol=1e-3)
@@ -0,0 +1,13 @@
+import pytest
+from hidet.tos.ops.definitions.matmul.parallel_k_matmul import predefined_rules, parallel_k_nparts
+
+
+@pytest.mark.parametrize('shape', list(predefined_rules))
+def test_predefined_rules(shape):
+    # the measured factors are used as is, regardless of the analytical model
+    assert parallel_k_nparts(*shape, num_sms=82, use_records=False) == predefined_rules[shape]
+
+
+def test_small_k_and_matrix_vector():
+    assert parallel_k_nparts(1, 128, 128, 256, num_sms=82, use_records=False) == 1
+    assert parallel_k_nparts(1, 1, 1024, 4096, num_sms=82, use_records=False) == 16
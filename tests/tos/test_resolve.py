@@ -0,0 +1,78 @@
+import os
+import itertools
+import pytest
+import hidet
+from hidet.tos.ops.schedules import resolve
+from hidet.tos.ops.schedules.measure import Measurer
+from hidet.tos.ops.schedules import records
+from hidet.tos.ops.schedules.cpu.matmul import MatmulCpuSchedule, batched_matmul_cpu_with_given_schedule
+
+_targets = itertools.count()
+
+
+class FakeMeasurer(Measurer):
+    # the latency of a candidate is its index, each test uses its own target to avoid sharing the cost model
+    def __init__(self):
+        self.name = 'fake {}'.format(next(_targets))
+
+    def target(self) -> str:
+        return self.name
+
+    def measure(self, ir_module, compiled_func, repeat):
+        return [float(compiled_func())] * repeat
+
+
+@pytest.fixture
+def candidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(records, '_tuning_database', records.TuningDatabase(str(tmp_path / 'records.jsonl')))
+    failed = set()
+
+    def fake_build(build_instances, parallel=True, verbose=False):
+        # the output dir of each build instance ends with the index of its candidate
+        for i, instance in enumerate(build_instances):
+            idx = int(os.path.basename(instance.output_dir))
+            yield i, None if idx in failed else (lambda idx=idx: idx)
+
+    monkeypatch.setattr(resolve, 'iter_build_ir_modules', fake_build)
+    x = hidet.symbol([1, 64, 64], device='cpu')
+    task = hidet.tos.ops.matmul(x, x).op.task
+    schedules = MatmulCpuSchedule.schedules(task, space_level=2)[:4]
+    ir_modules = [batched_matmul_cpu_with_given_schedule(task, s) for s in schedules]
+    return ir_modules, schedules, failed, str(tmp_path)
+
+
+def test_best_candidate(candidates):
+    ir_modules, schedules, failed, out_dir = candidates
+    failed.update([0])
+    best = resolve.resolve_ir_modules(ir_modules, schedules, out_dir, verbose=False, measurer=FakeMeasurer())
+    assert best is ir_modules[1]
+
+
+def test_refill_after_build_failure(candidates):
+    ir_modules, schedules, failed, out_dir = candidates
+    failed.update([0, 1])
+    # only one candidate is selected under the budget, the next ones are tried after it fails to build
+    best = resolve.resolve_ir_modules(ir_modules, schedules, out_dir, verbose=False, measurer=FakeMeasurer(), max_candidates=1)
+    assert best is ir_modules[2]
+
+
+def test_all_failed(candidates):
+    ir_modules, schedules, failed, out_dir = candidates
+    failed.update(range(len(ir_modules)))
+    with pytest.raises(ValueError):
+        resolve.resolve_ir_modules(ir_modules, schedules, out_dir, verbose=False, measurer=FakeMeasurer(), max_candidates=1)
+
+
+@pytest.mark.skipif(hidet.ffi.cuda.device_count() == 0, reason='requires a cuda device')
+def test_prune_fallback():
+    from hidet.ir.analyzers import ResourceLimits
+    from hidet.tos.ops.definitions.utils import input_like
+    from hidet.tos.ops.definitions.matmul.matmul import MatmulTask
+    from hidet.tos.ops.schedules.cuda.matmul.bmm import MatmulSchedule, batched_matmul_cuda_with_given_schedule
+    a = hidet.symbol([1, 256, 256], device='cuda')
+    task = MatmulTask(input_like(a, 'a'), input_like(a, 'b'))
+    ir_modules = [batched_matmul_cuda_with_given_schedule(task, s) for s in MatmulSchedule.schedules(space_level=1)[:3]]
+    assert len(resolve.prune_ir_modules(ir_modules, ResourceLimits.from_compute_capability((8, 6)))) == 3
+    # the limits that no kernel can satisfy, all the candidates are kept instead of failing the resolving
+    with pytest.warns(UserWarning):
+        assert sorted(resolve.prune_ir_modules(ir_modules, ResourceLimits(1, 1, 1, 1, 1))) == [0, 1, 2]
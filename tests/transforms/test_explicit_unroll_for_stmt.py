@@ -0,0 +1,55 @@
+from hidet.ir.expr import var, convert
+from hidet.ir.stmt import ForStmt, AssignStmt, SeqStmt
+from hidet.transforms.explicit_unroll_for_stmt import ExplicitUnrollForStmtRewriter, count_stmts
+
+
+def loop_nest(extents, unroll=None):
+    # for i0 in range(e0): for i1 in range(e1): ... acc = acc + i0 + i1 + ...
+    acc = var('acc')
+    loop_vars = [var('i{}'.format(i)) for i in range(len(extents))]
+    stmt = AssignStmt(acc, acc + sum(loop_vars[1:], loop_vars[0]))
+    for v, extent in reversed(list(zip(loop_vars, extents))):
+        stmt = ForStmt(v, convert(extent), unroll, stmt)
+    return stmt
+
+
+def unroll(stmt, budget=None, threshold=16):
+    rewriter = ExplicitUnrollForStmtRewriter(unroll_threshold=threshold, unroll_budget=budget)
+    return rewriter.rewrite(stmt), rewriter
+
+
+def test_full_unroll_without_budget():
+    stmt, rewriter = unroll(loop_nest([4, 8]))
+    assert isinstance(stmt, SeqStmt) and count_stmts(stmt) == 32
+    assert rewriter.num_full_unrolled == 2
+
+
+def test_long_loops_are_not_unrolled():
+    # loops longer than the threshold are kept with or without a budget
+    for budget in [None, 10000]:
+        stmt, rewriter = unroll(loop_nest([64, 32]), budget=budget)
+        assert isinstance(stmt, ForStmt) and isinstance(stmt.body, ForStmt)
+        assert rewriter.num_full_unrolled == rewriter.num_partial_unrolled == 0
+
+
+def test_budget_caps_unrolling():
+    for extents in [[4, 8], [64, 16], [12, 12, 12]]:
+        unbounded = count_stmts(unroll(loop_nest(extents))[0])
+        for budget in [1, 10, 50, 200]:
+            stmt, _ = unroll(loop_nest(extents), budget=budget)
+            assert count_stmts(stmt) <= max(unbounded, budget)
+            assert count_stmts(stmt) <= max(count_stmts(loop_nest(extents)), budget)
+
+
+def test_partial_unroll_within_budget():
+    # fully unrolling both loops needs 64 statements, the budget only allows partially unrolling the outer one
+    stmt, rewriter = unroll(loop_nest([8, 8]), budget=20)
+    assert count_stmts(stmt) <= 20
+    assert rewriter.num_full_unrolled == 1 and rewriter.num_partial_unrolled == 1
+
+
+def test_unroll_hints():
+    stmt, _ = unroll(loop_nest([4], unroll=False))
+    assert isinstance(stmt, ForStmt)
+    stmt, rewriter = unroll(loop_nest([64], unroll=4))
+    assert isinstance(stmt, ForStmt) and int(stmt.extent) == 16 and rewriter.num_partial_unrolled == 1